@@ -1,5 +1,13 @@
-from specs import ROWS, COLS
-from game import ConnectFour
+from transposition import TranspositionTable, DEFAULT_SIZE, EXACT, LOWER_BOUND, UPPER_BOUND
+from instrumentation import SearchStats, trace_search
+from search import SearchBudget, SearchInfo, SearchTimeout, CHECK_INTERVAL, WIN_SCORE, ASPIRATION_WINDOW
+from ordering import MoveOrdering, ORDERINGS
+from position_store import PositionStore
+from threats import threat_moves, WIN
+from tablebase import Tablebase
+
+
+SEARCH_MODES = ('alphabeta', 'pvs')
 
 
 class AlphaBetaAiBot:
@@ -8,43 +16,363 @@ class AlphaBetaAiBot:
 
     Parameters:
         max_depth (int): The maximum depth to search in the Alpha-Beta Pruning algorithm.
+        tt_size (int): The number of slots in the transposition table, 0 to search without one.
+        tt_size_mb (float): Memory budget of the transposition table in megabytes, used instead of `tt_size`.
+        time_limit_ms (float): Time budget per move. When set, the search deepens iteratively up to `max_depth`.
+        node_limit (int): Node budget per move, also enabling iterative deepening.
+        move_ordering (MoveOrdering): The order in which columns are searched, center-first with all heuristics by default.
+        collect_stats (bool): Whether to collect the SearchStats of every move, which slows the search down.
+        on_node (callable): Called as `on_node(game, ply, depth, score, move)` after every searched node.
+        position_store (PositionStore or str): Results of positions searched offline or by other processes, or the path of their file.
+        record_positions (bool): Whether to append the result of every completed search to `position_store`.
+        threats (bool): Whether to play immediate wins at once, only search forced blocks and skip moves letting the opponent win, see `threats.threat_moves`.
+        search_mode (str): 'alphabeta' to search every move with the node's window, or 'pvs' for a principal variation
+            search: null windows after the first move and an aspiration window at the root.
+        tablebase (Tablebase or str): Exact results of endgame positions, or the path of their file, probed below the root.
 
     Attributes:
         max_depth (int): The maximum depth to search in the Alpha-Beta Pruning algorithm.
+        transposition_table (TranspositionTable or None): Results of positions already searched, kept between moves.
+        time_limit_ms (float or None): Time budget per move.
+        node_limit (int or None): Node budget per move.
+        move_ordering (MoveOrdering): The order in which columns are searched.
+        nodes (int): The number of nodes visited by the current or last search.
+        last_search (SearchInfo or None): Depth, nodes and time of the last choose_move call.
+        collect_stats (bool): Whether to collect the SearchStats of every move.
+        on_node (callable or None): Called after every searched node.
+        stats (SearchStats or None): Counters and timings of the last choose_move call, when collected.
+        stop_event (threading.Event or None): Set from another thread to stop the current search early.
+        current_depth (int): The depth of the search or iteration in progress, for progress reports.
+        position_store (PositionStore or None): Looked up before searching, the stored move is played if it was searched deep enough.
+        record_positions (bool): Whether to append the result of every completed search to `position_store`.
+        threats (bool): Whether the columns searched are narrowed down by the immediate threats of both players.
+        search_mode (str): 'alphabeta' or 'pvs', see `alphabeta`.
+        tablebase (Tablebase or None): Gives the exact score of the positions it holds instead of searching them.
 
     Methods:
         choose_move(game): Chooses the optimal move for the AI player.
+        analyze(game): Scores every legal column of a position.
+        score_columns(game, columns, depth, previous): Searches the given columns of a position to the same depth.
+        aspiration_search(game, depth, expected, maximizing_player): Searches within a window around an expected score.
+        iterative_deepening(game, budget): Searches one ply deeper at a time until the budget runs out.
+        principal_variation(game, move, depth): Collects the best line found by the last search.
         alphabeta(game, depth, alpha, beta, maximizing_player): Implements the Alpha-Beta Pruning algorithm.
+        store(table, key, depth, score, move, window): Saves a search result in the transposition table.
         evaluate(game): Evaluates the current state of the game.
         get_new_game_state(game, col, player): Creates a new game state after making a move.
     """
 
-    def __init__(self, max_depth=7):
+    def __init__(self, max_depth=7, tt_size=DEFAULT_SIZE, tt_size_mb=None, time_limit_ms=None, node_limit=None,
+                 move_ordering=None, collect_stats=False, on_node=None, position_store=None, record_positions=False,
+                 threats=False, search_mode='alphabeta', tablebase=None):
         """
         Initialize the AlphaBetaAiBot.
 
         Parameters:
             max_depth (int): The maximum depth to search in the Alpha-Beta Pruning algorithm.
+            tt_size (int): The number of slots in the transposition table, 0 to search without one.
+            tt_size_mb (float): Memory budget of the transposition table in megabytes, used instead of `tt_size`.
+            time_limit_ms (float): Time budget per move. When set, the search deepens iteratively up to `max_depth`.
+            node_limit (int): Node budget per move, also enabling iterative deepening.
+            move_ordering (MoveOrdering): The order in which columns are searched, center-first with all heuristics by default.
+            collect_stats (bool): Whether to collect the SearchStats of every move, which slows the search down.
+            on_node (callable): Called as `on_node(game, ply, depth, score, move)` after every searched node.
+            position_store (PositionStore or str): Results of positions searched offline or by other processes, or the path of their file.
+            record_positions (bool): Whether to append the result of every completed search to `position_store`.
+            threats (bool): Whether to play immediate wins at once, only search forced blocks and skip moves letting the opponent win, see `threats.threat_moves`.
+            search_mode (str): 'alphabeta' to search every move with the node's window, or 'pvs' for a principal variation
+                search: null windows after the first move and an aspiration window at the root.
+            tablebase (Tablebase or str): Exact results of endgame positions, or the path of their file, probed below the root.
+
+        Raises:
+            ValueError: If the search mode is unknown.
         """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {search_mode!r}, expected one of {', '.join(SEARCH_MODES)}.")
+
         self.max_depth = max_depth
+        self.time_limit_ms = time_limit_ms
+        self.node_limit = node_limit
+        self.move_ordering = move_ordering if move_ordering is not None else MoveOrdering()
+        self.nodes = 0
+        self.budget = None
+        self.pv_moves = {}
+        self.last_search = None
+        self.collect_stats = collect_stats
+        self.on_node = on_node
+        self.stats = None
+        self.stop_event = None
+        self.current_depth = 0
+        self.position_store = PositionStore(position_store) if isinstance(position_store, str) else position_store
+        self.record_positions = record_positions
+        self.threats = threats
+        self.search_mode = search_mode
+        self.tablebase = Tablebase(tablebase) if isinstance(tablebase, str) else tablebase
+
+        if tt_size or tt_size_mb:
+            self.transposition_table = TranspositionTable(tt_size, tt_size_mb)
+        else:
+            self.transposition_table = None
 
     def choose_move(self, game):
         """
         Chooses the optimal move for the AI player using the Alpha-Beta Pruning algorithm.
 
+        The search plays and takes back moves on `game` in place, leaving it unchanged on return.
+        'O' is the maximizing player, so the move is chosen for whichever side is to move.
+        With a time or node budget, or a `stop_event` to stop it with, the search deepens iteratively
+        on a copy of the game and returns the move of the deepest completed iteration.
+        Either way the report is stored in `last_search`, and the statistics in `stats` when they are collected.
+        A position that is its own mirror image, such as the empty board, only has half of its moves searched at the root.
+        A position found in `position_store` at `max_depth` or deeper is not searched at all: the stored move
+        is returned with zero nodes in the report, and empty statistics when they are collected.
+
         Parameters:
             game (ConnectFour): The current state of the Connect Four game.
 
         Returns:
             int: The chosen column for the next move.
         """
-        _, move = self.alphabeta(game, self.max_depth, float('-inf'), float('inf'), True)
+        self.nodes = 0
+        self.move_ordering.resize(game.rows, game.cols)
+        self.move_ordering.clear()
+        budget = SearchBudget(self.time_limit_ms, self.node_limit, self.stop_event)
+        position = game.copy() if self.record_positions else None
+
+        if self.position_store is not None:
+            entry = self.position_store.lookup(game)
+            if entry is not None:
+                score, depth, move = entry
+                if depth >= self.max_depth and move is not None and game.is_valid_move(move):
+                    self.last_search = SearchInfo(move, score, depth, 0, budget.elapsed_ms())
+                    if self.collect_stats:
+                        self.stats = SearchStats()  # Nothing was searched
+                    return move
+
+        if self.time_limit_ms is None and self.node_limit is None and self.stop_event is None:
+            self.current_depth = self.max_depth
+            with trace_search(self, game, 'alphabeta'):
+                if self.search_mode == 'pvs':
+                    # The score seldom moves far from one move to the next, so the last one is the expected one
+                    expected = self.last_search.score if self.last_search is not None else None
+                    score, move = self.aspiration_search(game, self.max_depth, expected, game.turn == 1)
+                else:
+                    score, move = self.alphabeta(game, self.max_depth, float('-inf'), float('inf'), game.turn == 1)
+            depth = self.max_depth
+        else:
+            game = game.copy()
+            with trace_search(self, game, 'alphabeta'):
+                score, move, depth = self.iterative_deepening(game, budget)
+
+        self.last_search = SearchInfo(move, score, depth, self.nodes, budget.elapsed_ms())
+        if self.record_positions and self.position_store is not None and depth > 0 and not budget.stopped:
+            self.position_store.record(position, score, depth, move)
         return move
 
+    def analyze(self, game):
+        """
+        Scores every legal column of a position in one search.
+
+        Unlike `choose_move`, no column is cut off by a better sibling, so every score is exact.
+        Each column is searched within an aspiration window around the score expected for it, that
+        of the previous column or, when deepening iteratively, its own score one ply shallower, and
+        searched again with a wider window only if its score falls outside. The transposition table
+        and the move ordering are shared by all the columns.
+        With a time or node budget, or a `stop_event`, the search deepens iteratively and returns
+        the scores of the deepest completed iteration. The best column is reported in `last_search`.
+
+        Parameters:
+            game (ConnectFour): The position, which is not modified.
+
+        Returns:
+            list: The score of every column, positive when good for 'O', None for full columns
+            or if no iteration completed.
+        """
+        self.nodes = 0
+        self.move_ordering.resize(game.rows, game.cols)
+        self.move_ordering.clear()
+        budget = SearchBudget(self.time_limit_ms, self.node_limit, self.stop_event)
+        game = game.copy()
+        maximizing_player = game.turn == 1
+
+        columns = [] if game.is_terminal else [col for col in self.move_ordering.static_order if game.is_valid_move(col)]
+        symmetric = game.is_symmetric
+        if symmetric:
+            # Mirror columns score the same, so only one of each pair is searched
+            columns = [col for col in columns if col <= game.cols - 1 - col]
+
+        with trace_search(self, game, 'alphabeta'):
+            if self.time_limit_ms is None and self.node_limit is None and self.stop_event is None:
+                self.current_depth = self.max_depth
+                scores = self.score_columns(game, columns, self.max_depth)
+                depth = self.max_depth if columns else 0
+            else:
+                scores, depth = [None] * game.cols, 0
+                self.budget = budget
+                try:
+                    for iteration in range(1, min(self.max_depth, game.rows * game.cols - game.move_count) + 1):
+                        self.current_depth = iteration
+                        scores = self.score_columns(game, columns, iteration, scores)
+                        depth = iteration
+                        # Best columns first next time, their scores being the first expected ones
+                        columns.sort(key=scores.__getitem__, reverse=maximizing_player)
+                except SearchTimeout:
+                    pass
+                finally:
+                    self.budget = None
+
+        if symmetric:
+            for col in columns:
+                scores[game.cols - 1 - col] = scores[col]
+
+        move, score = None, None
+        for col in self.move_ordering.static_order:
+            if scores[col] is not None and (score is None or (scores[col] > score if maximizing_player else scores[col] < score)):
+                move, score = col, scores[col]
+        self.last_search = SearchInfo(move, score, depth, self.nodes, budget.elapsed_ms())
+        return scores
+
+    def score_columns(self, game, columns, depth, previous=None):
+        """
+        Searches every given column of a position to the same depth, counting the column played.
+
+        Parameters:
+            game (ConnectFour): The position, played on and restored in place.
+            columns (list): The legal columns to score, in search order.
+            depth (int): The search depth.
+            previous (list or None): Scores of a shallower search, the expected scores of the columns.
+                Without them a column is expected to score like the one searched before it.
+
+        Returns:
+            list: The exact score of every column searched, None for the others.
+        """
+        scores = [None] * game.cols
+        expected = None
+        maximizing_player = game.turn == 1
+        for col in columns:
+            if previous is not None:
+                expected = previous[col]
+            game.play(col)
+            scores[col], _ = self.aspiration_search(game, depth - 1, expected, not maximizing_player)
+            game.undo(col)
+            expected = scores[col]
+        return scores
+
+    def aspiration_search(self, game, depth, expected, maximizing_player):
+        """
+        Searches a position within a narrow window around its expected score, widening it to the side it failed on.
+
+        Parameters:
+            game (ConnectFour): The position to search.
+            depth (int): The search depth.
+            expected (int or None): The expected score, None to search with a full window at once.
+            maximizing_player (bool): Whether 'O' is to move.
+
+        Returns:
+            tuple: The exact score of the position at this depth and the best move.
+        """
+        if expected is None or abs(expected) >= WIN_SCORE:
+            alpha, beta = float('-inf'), float('inf')
+        else:
+            alpha, beta = expected - ASPIRATION_WINDOW, expected + ASPIRATION_WINDOW
+
+        while True:
+            score, move = self.alphabeta(game, depth, alpha, beta, maximizing_player)
+            if score <= alpha:
+                alpha = float('-inf')
+            elif score >= beta:
+                beta = float('inf')
+            else:
+                return score, move
+
+    def iterative_deepening(self, game, budget):
+        """
+        Searches one ply deeper at a time until `max_depth` is reached or the budget runs out.
+
+        The best line of every completed iteration is searched first by the next one. In 'pvs' mode every
+        iteration from the third searches within an aspiration window around the score of the iteration two
+        plies shallower: the evaluation favours the side making the last move, so scores swing between odd
+        and even depths and the iteration right before is a poorer guess.
+        An iteration interrupted by the budget is thrown away, which may leave `game` with moves played.
+
+        Parameters:
+            game (ConnectFour): The state to search, usually a copy of the game.
+            budget (SearchBudget): The time and node limits of the search.
+
+        Returns:
+            tuple: The score, the chosen column and the deepest completed depth.
+        """
+        maximizing_player = game.turn == 1
+        max_depth = min(self.max_depth, game.rows * game.cols - game.move_count)
+        score, move, completed_depth = None, None, 0
+        iteration_scores = []
+
+        self.budget = budget
+        try:
+            for depth in range(1, max_depth + 1):
+                self.current_depth = depth
+                if self.search_mode == 'pvs':
+                    expected = iteration_scores[-2] if len(iteration_scores) >= 2 else None
+                    score, move = self.aspiration_search(game, depth, expected, maximizing_player)
+                    iteration_scores.append(score)
+                else:
+                    score, move = self.alphabeta(game, depth, float('-inf'), float('inf'), maximizing_player)
+                completed_depth = depth
+
+                # A forced result will not change by searching deeper
+                if abs(score) >= WIN_SCORE:
+                    break
+
+                self.pv_moves = self.principal_variation(game, move, depth)
+        except SearchTimeout:
+            pass
+        finally:
+            self.budget = None
+            self.pv_moves = {}
+
+        if move is None:
+            available_columns = [col for col in range(game.cols) if game.heights[col] < game.rows]
+            move = available_columns[0] if available_columns else None
+        return score, move, completed_depth
+
+    def principal_variation(self, game, move, depth):
+        """
+        Collects the best line of the last search, starting with its best move and following the transposition table.
+
+        Parameters:
+            game (ConnectFour): The searched position.
+            move (int): The best move found at the root.
+            depth (int): The depth of the last search.
+
+        Returns:
+            dict: The best move of every position on the line, keyed by position key.
+        """
+        line = {}
+        played = []
+        while move is not None and len(played) < depth:
+            line[game.key] = move
+            game.play(move)
+            played.append(move)
+
+            if game.is_terminal or self.transposition_table is None:
+                break
+            entry = self.transposition_table.probe(game.canonical_key)
+            move = entry[4] if entry is not None else None
+            if move is not None and game.mirror_key < game.key:
+                move = game.cols - 1 - move
+
+        for col in reversed(played):
+            game.undo(col)
+        return line
+
     def alphabeta(self, game, depth, alpha, beta, maximizing_player):
         """
         Implements the Alpha-Beta Pruning algorithm to determine the optimal move.
 
+        In 'pvs' mode, the moves after the first are searched with a null window, only proving that they
+        are no better than the best so far, and searched again with the full window when one turns out better.
+        Scores are integers, so a window of width one is enough.
+
         Parameters:
             game (ConnectFour): The current state of the Connect Four game.
             depth (int): The current depth in the Alpha-Beta Pruning search.
@@ -55,88 +383,163 @@ class AlphaBetaAiBot:
         Returns:
             tuple: A tuple containing the evaluation score and the chosen move column.
         """
-        if depth == 0 or game.is_winner('X') or game.is_winner('O') or game.is_board_full():
+        self.nodes += 1
+        if self.budget is not None and self.nodes % CHECK_INTERVAL == 0:
+            self.budget.check(self.nodes)
+
+        if game.is_terminal:
+            return self.evaluate(game), None
+        if self.tablebase is not None and depth != self.current_depth:
+            # Exact, even at depth 0; the root is searched to still choose a move
+            score = self.tablebase.score(game)
+            if score is not None:
+                return score, None
+        if depth == 0:
             return self.evaluate(game), None
 
-        available_columns = [col for col in range(COLS) if game.board[0][col] == ' ']
+        table = self.transposition_table
+        hash_move = None
+        if table is not None or self.pv_moves:
+            key = game.key
+            hash_move = self.pv_moves.get(key)
+
+        if table is not None:
+            # A position and its mirror image share one entry, its move oriented for the smaller key
+            mirror_key = game.mirror_key
+            mirrored = mirror_key < key
+            if mirrored:
+                key = mirror_key
+
+            entry = table.probe(key)
+            if entry is not None:
+                _, entry_depth, score, flag, move = entry
+                if mirrored and move is not None:
+                    move = game.cols - 1 - move
+                if entry_depth >= depth:
+                    if flag == EXACT:
+                        return score, move
+                    elif flag == LOWER_BOUND:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if beta <= alpha:
+                        return score, move
+                hash_move = move
+
+            window = (alpha, beta)
+
+        available_columns = self.move_ordering.order(game, hash_move)
+        if depth == self.current_depth and game.is_symmetric:
+            # Mirror moves of a symmetric root score the same, so only one of each pair is searched
+            available_columns = [col for col in available_columns if col <= game.cols - 1 - col]
+        if self.threats:
+            available_columns, forced = threat_moves(game, available_columns, depth > 1)
+            if forced is not None:
+                return (WIN_SCORE if (forced == WIN) == maximizing_player else -WIN_SCORE), available_columns[0]
+
+        pvs = self.search_mode == 'pvs'
 
         if maximizing_player:
             max_eval = float('-inf')
             best_move = None
 
             for col in available_columns:
-                new_game = self.get_new_game_state(game, col, 'O')
-                eval, _ = self.alphabeta(new_game, depth - 1, alpha, beta, False)
+                game.play(col)
+                if pvs and best_move is not None:
+                    eval, _ = self.alphabeta(game, depth - 1, alpha, alpha + 1, False)
+                    if alpha < eval < beta:
+                        eval, _ = self.alphabeta(game, depth - 1, alpha, beta, False)
+                else:
+                    eval, _ = self.alphabeta(game, depth - 1, alpha, beta, False)
+                game.undo(col)
 
                 if eval > max_eval:
                     max_eval = eval
                     best_move = col
 
                 alpha = max(alpha, eval)
-                if beta <= alpha:
+                # No move scores above a win, so one is as good as a cutoff
+                if beta <= alpha or max_eval >= WIN_SCORE:
+                    self.move_ordering.record_cutoff(game, col, depth)
                     break
 
+            if table is not None:
+                if mirrored and best_move is not None:
+                    self.store(table, key, depth, max_eval, game.cols - 1 - best_move, window)
+                else:
+                    self.store(table, key, depth, max_eval, best_move, window)
             return max_eval, best_move
         else:
             min_eval = float('inf')
             best_move = None
 
             for col in available_columns:
-                new_game = self.get_new_game_state(game, col, 'X')
-                eval, _ = self.alphabeta(new_game, depth - 1, alpha, beta, True)
+                game.play(col)
+                if pvs and best_move is not None:
+                    eval, _ = self.alphabeta(game, depth - 1, beta - 1, beta, True)
+                    if alpha < eval < beta:
+                        eval, _ = self.alphabeta(game, depth - 1, alpha, beta, True)
+                else:
+                    eval, _ = self.alphabeta(game, depth - 1, alpha, beta, True)
+                game.undo(col)
 
                 if eval < min_eval:
                     min_eval = eval
                     best_move = col
 
                 beta = min(beta, eval)
-                if beta <= alpha:
+                # No move scores below a loss, so one is as good as a cutoff
+                if beta <= alpha or min_eval <= -WIN_SCORE:
+                    self.move_ordering.record_cutoff(game, col, depth)
                     break
 
+            if table is not None:
+                if mirrored and best_move is not None:
+                    self.store(table, key, depth, min_eval, game.cols - 1 - best_move, window)
+                else:
+                    self.store(table, key, depth, min_eval, best_move, window)
             return min_eval, best_move
 
+    def store(self, table, key, depth, score, move, window):
+        """
+        Saves the result of a search in the transposition table.
+
+        Parameters:
+            table (TranspositionTable): The table to write to.
+            key (int): The canonical key of the searched position, see `ConnectFour.canonical_key`.
+            depth (int): The depth the position was searched to.
+            score (int): The score returned by the search.
+            move (int): The best move found, oriented for the canonical key.
+            window (tuple): The (alpha, beta) window the position was searched with.
+        """
+        alpha, beta = window
+        if score <= alpha:
+            flag = UPPER_BOUND
+        elif score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        table.store(key, depth, score, flag, move)
+
     def evaluate(self, game):
         """
         Improved evaluation method that assigns scores based on winning positions and three in a row/diagonal/column.
 
+        The windows of `connect - 1` cells, three in Connect Four, are scored as discs are dropped and taken back, so this only reads
+        `game.window_score`, the same total as summing `evaluate_window` over every window.
+
         Parameters:
             game (ConnectFour): The current state of the Connect Four game.
 
         Returns:
             int: The evaluation score.
         """
-        if game.is_winner('O'):
+        if game.winner == 'O':
             return 100_000
-        elif game.is_winner('X'):
+        elif game.winner == 'X':
             return -100_000
         else:
-            score = 0
-
-            # Check for three in a row
-            for row in range(game.rows):
-                for col in range(game.cols - 2):
-                    window = [game.board[row][col], game.board[row][col + 1], game.board[row][col + 2]]
-                    score += self.evaluate_window(window)
-
-            # Check for three in a column
-            for col in range(game.cols):
-                for row in range(game.rows - 2):
-                    window = [game.board[row][col], game.board[row + 1][col], game.board[row + 2][col]]
-                    score += self.evaluate_window(window)
-
-            # Check for three in a diagonal (top-left to bottom-right)
-            for row in range(game.rows - 2):
-                for col in range(game.cols - 2):
-                    window = [game.board[row][col], game.board[row + 1][col + 1], game.board[row + 2][col + 2]]
-                    score += self.evaluate_window(window)
-
-            # Check for three in a diagonal (bottom-left to top-right)
-            for row in range(2, game.rows):
-                for col in range(game.cols - 2):
-                    window = [game.board[row][col], game.board[row - 1][col + 1], game.board[row - 2][col + 2]]
-                    score += self.evaluate_window(window)
-
-            return score
+            return game.window_score
 
     def evaluate_window(self, window):
         """
@@ -170,9 +573,28 @@ class AlphaBetaAiBot:
         Returns:
             ConnectFour: The new game state after the move.
         """
-        new_game = ConnectFour()
-        new_game.board = [row[:] for row in game.board]
-        new_game.turn = game.turn
+        new_game = game.copy()
         new_game.drop_disc(col, player)
         return new_game
-    
+
+
+def compare_move_orderings(game, depth, orderings=None):
+    """
+    Searches a position once with each move ordering and reports how many nodes each one needed.
+
+    Every ordering gets a fresh bot, so no transposition table or history is shared between runs.
+
+    Parameters:
+        game (ConnectFour): The position to search.
+        depth (int): The search depth.
+        orderings (dict): MoveOrdering keyword arguments by name, `ordering.ORDERINGS` by default.
+
+    Returns:
+        dict: The nodes searched, chosen move, score and time of every ordering, by name.
+    """
+    results = {}
+    for name, options in (orderings or ORDERINGS).items():
+        bot = AlphaBetaAiBot(max_depth=depth, move_ordering=MoveOrdering(**options))
+        bot.choose_move(game)
+        results[name] = bot.last_search.as_dict()
+    return results
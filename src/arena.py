@@ -0,0 +1,334 @@
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from game import ConnectFour
+from specs import ROWS, COLS, CONNECT
+from random_ai import RandomAiBot
+from minmax import MinMaxAiBot
+from alphabeta import AlphaBetaAiBot
+from solver import SolverAiBot
+from mcts import MctsAiBot
+from records import GameRecord, GameWriter, to_digits
+
+
+BOTS = {
+    'random': RandomAiBot,
+    'minmax': MinMaxAiBot,
+    'alphabeta': AlphaBetaAiBot,
+    'solver': SolverAiBot,
+    'mcts': MctsAiBot,
+}
+
+Z_95 = 1.959964
+
+
+def parse_value(text):
+    """
+    Converts a bot option from the command line to an int, a float, a bool or None when possible.
+    """
+    if text == 'None':
+        return None
+    if text in ('True', 'False'):
+        return text == 'True'
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def create_bot(spec):
+    """
+    Creates a bot from a spec such as "random" or "alphabeta:max_depth=6,time_limit_ms=200".
+
+    Parameters:
+        spec (str): The bot name from BOTS, optionally followed by keyword arguments.
+
+    Returns:
+        object: The bot.
+    """
+    name, _, options = spec.partition(':')
+    if name not in BOTS:
+        raise ValueError(f"Unknown bot {name!r}, expected one of {', '.join(BOTS)}.")
+
+    kwargs = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        kwargs[key] = parse_value(value)
+    return BOTS[name](**kwargs)
+
+
+def play_game(bots, first, seed=None, size=(ROWS, COLS, CONNECT)):
+    """
+    Plays one game between two bots.
+
+    Parameters:
+        bots (tuple): The two bots.
+        first (int): The index of the bot playing first, as Player 1 (X).
+        seed (int): Seed of the random module, for bots that play randomly.
+        size (tuple): The rows, columns and discs in a row needed to win.
+
+    Returns:
+        dict: The game record: the index of the winning bot (None for a draw), the moves as 1-based
+        column digits (a list of 1-based columns on boards wider than nine), and for every move the
+        time taken in milliseconds and the nodes searched.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    game = ConnectFour(*size)
+    latencies, nodes = [], []
+    forfeit = None
+
+    while not game.is_terminal:
+        mover = first if game.turn == 0 else 1 - first
+        bot = bots[mover]
+
+        start = time.perf_counter()
+        col = bot.choose_move(game)
+        latencies.append(round((time.perf_counter() - start) * 1000, 3))
+
+        search = getattr(bot, 'last_search', None)
+        nodes.append(search.nodes if search is not None else None)
+
+        if col is None or not game.is_valid_move(col):
+            forfeit = mover
+            break
+        game.play(col)
+
+    if forfeit is not None:
+        winner = 1 - forfeit
+    elif game.winner is not None:
+        winner = first if game.winner == 'X' else 1 - first
+    else:
+        winner = None
+
+    return {
+        'first': first,
+        'winner': winner,
+        'forfeit': forfeit,
+        'moves': to_digits(game.moves) if game.cols <= 9 else [col + 1 for col in game.moves],
+        'latency_ms': latencies,
+        'nodes': nodes,
+    }
+
+
+_worker_bots = None
+
+
+def _init_worker(specs):
+    """
+    Creates the bots of a worker process once; they are reused for all its games.
+    """
+    global _worker_bots
+    _worker_bots = tuple(create_bot(spec) for spec in specs)
+
+
+def _play_worker_game(index, first, seed, size):
+    record = play_game(_worker_bots, first, seed, size)
+    record['game'] = index
+    return record
+
+
+def run_arena(specs, games, workers=1, seed=None, max_pending=None, size=(ROWS, COLS, CONNECT)):
+    """
+    Plays a match between two bots, yielding each game record as soon as it is finished.
+
+    The bots take turns playing first. With several workers the games run on a process pool,
+    keeping at most `max_pending` of them queued so that long matches do not pile up in memory.
+
+    Parameters:
+        specs (tuple): The specs of the two bots, see `create_bot`.
+        games (int): The number of games to play.
+        workers (int): The number of worker processes, 1 to play in this process.
+        seed (int): Base seed; game `i` uses `seed + i` for reproducible random play.
+        max_pending (int): The most games queued on the pool at once, four per worker by default.
+        size (tuple): The rows, columns and discs in a row needed to win.
+
+    Yields:
+        dict: The game record from `play_game`, plus its `game` index.
+    """
+    def game_seed(index):
+        return None if seed is None else seed + index
+
+    if workers <= 1:
+        _init_worker(specs)
+        for index in range(games):
+            yield _play_worker_game(index, index % 2, game_seed(index), size)
+        return
+
+    max_pending = max_pending or 4 * workers
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(specs,)) as executor:
+        pending = set()
+        index = 0
+        while index < games or pending:
+            while index < games and len(pending) < max_pending:
+                pending.add(executor.submit(_play_worker_game, index, index % 2, game_seed(index), size))
+                index += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def wilson_interval(successes, total, z=Z_95):
+    """
+    Returns the Wilson score confidence interval of a proportion.
+
+    Parameters:
+        successes (float): The number of successes.
+        total (int): The number of trials.
+        z (float): The normal quantile of the confidence level.
+
+    Returns:
+        tuple: The lower and upper bounds.
+    """
+    if total == 0:
+        return 0.0, 1.0
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def elo_difference(score):
+    """
+    Converts an expected score into an Elo rating difference.
+
+    Parameters:
+        score (float): The expected score, between 0 and 1.
+
+    Returns:
+        float: The Elo difference, infinite for a score of 0 or 1.
+    """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(records, elapsed):
+    """
+    Summarizes a match from the point of view of the first bot.
+
+    Parameters:
+        records (list): The game records from `run_arena`.
+        elapsed (float): The wall-clock time of the match in seconds.
+
+    Returns:
+        dict: Games played, games per second, wins/draws/losses with 95% confidence intervals,
+        the score, the Elo difference with its 95% interval, and move latency statistics per bot.
+    """
+    games = len(records)
+    wins = sum(record['winner'] == 0 for record in records)
+    losses = sum(record['winner'] == 1 for record in records)
+    draws = games - wins - losses
+
+    score = (wins + draws / 2) / games if games else 0.5
+    # Wilson bounds on the score stay inside (0, 1) when one side wins every game
+    score_low, score_high = wilson_interval(wins + draws / 2, games)
+
+    latencies = ([], [])
+    for record in records:
+        for ply, latency in enumerate(record['latency_ms']):
+            mover = record['first'] if ply % 2 == 0 else 1 - record['first']
+            latencies[mover].append(latency)
+
+    def latency_stats(values):
+        if not values:
+            return {}
+        values = sorted(values)
+        return {
+            'mean_ms': round(sum(values) / len(values), 3),
+            'p95_ms': values[min(len(values) - 1, int(0.95 * len(values)))],
+            'max_ms': values[-1],
+        }
+
+    return {
+        'games': games,
+        'games_per_sec': round(games / elapsed, 3) if elapsed > 0 else None,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'win_rate_ci': wilson_interval(wins, games),
+        'draw_rate_ci': wilson_interval(draws, games),
+        'loss_rate_ci': wilson_interval(losses, games),
+        'score': round(score, 4),
+        'elo': elo_difference(score),
+        'elo_ci': (elo_difference(score_low), elo_difference(score_high)),
+        'latency': [latency_stats(latencies[0]), latency_stats(latencies[1])],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless matches between two Connect Four bots.")
+    parser.add_argument('bot_a', help="First bot, e.g. 'alphabeta:max_depth=6'. Bots: " + ', '.join(BOTS))
+    parser.add_argument('bot_b', help="Second bot.")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help="JSONL file receiving one record per game.")
+    parser.add_argument('--archive', help="Binary game archive receiving the moves of every game, see records.py.")
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--cols', type=int, default=COLS)
+    parser.add_argument('--connect', type=int, default=CONNECT, help="Discs in a row needed to win.")
+    args = parser.parse_args(argv)
+
+    size = (args.rows, args.cols, args.connect)
+    try:
+        ConnectFour(*size)
+    except ValueError as error:
+        parser.error(str(error))
+
+    specs = (args.bot_a, args.bot_b)
+    for spec in specs:
+        try:
+            create_bot(spec)  # Fail early on a bad spec
+        except (ValueError, TypeError) as error:
+            parser.error(f"invalid bot {spec!r}: {error}")
+
+    output = open(args.output, 'w') if args.output else None
+    archive = GameWriter(args.archive, *size) if args.archive else None
+    records = []
+    start = time.perf_counter()
+    try:
+        for record in run_arena(specs, args.games, args.workers, args.seed, size=size):
+            if output is not None:
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+            if archive is not None:
+                moves = record['moves']
+                moves = [int(col) - 1 for col in moves] if isinstance(moves, str) else [col - 1 for col in moves]
+                archive.write(GameRecord(moves, 0, *size))
+            # Keep only what the summary needs
+            records.append({key: record[key] for key in ('first', 'winner', 'latency_ms')})
+            print(f"\r{len(records)}/{args.games} games", end='', file=sys.stderr, flush=True)
+    finally:
+        print(file=sys.stderr)
+        if output is not None:
+            output.close()
+        if archive is not None:
+            archive.close()
+
+    summary = summarize(records, time.perf_counter() - start)
+    print(f"{args.bot_a} vs {args.bot_b}: +{summary['wins']} ={summary['draws']} -{summary['losses']} "
+          f"({summary['games']} games, {summary['games_per_sec']} games/sec)")
+    print(f"Score {summary['score']:.3f}, Elo {summary['elo']:+.0f} "
+          f"(95% CI {summary['elo_ci'][0]:+.0f} to {summary['elo_ci'][1]:+.0f})")
+    for label, key in (('Win', 'win_rate_ci'), ('Draw', 'draw_rate_ci'), ('Loss', 'loss_rate_ci')):
+        low, high = summary[key]
+        print(f"{label} rate 95% CI: {low:.3f} - {high:.3f}")
+    for spec, stats in zip(specs, summary['latency']):
+        if stats:
+            print(f"{spec}: mean {stats['mean_ms']} ms, p95 {stats['p95_ms']} ms, max {stats['max_ms']} ms per move")
+
+
+if __name__ == "__main__":
+    main()
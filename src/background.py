@@ -0,0 +1,221 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def likely_replies(bot, game):
+    """
+    Returns the legal columns of a position, the most likely to be played first.
+
+    The reply a bot expects is the best move stored in its transposition table, when it has one
+    like AlphaBetaAiBot; the other columns follow from the center outwards.
+
+    Parameters:
+        bot (object): The bot that searched the move leading to the position.
+        game (ConnectFour): The position.
+
+    Returns:
+        list: The legal columns, empty if the game is over.
+    """
+    if game.is_terminal:
+        return []
+    columns = sorted((col for col in range(game.cols) if game.is_valid_move(col)),
+                     key=lambda col: abs(col - (game.cols - 1) / 2))
+
+    table = getattr(bot, 'transposition_table', None)
+    entry = table.probe(game.canonical_key) if hasattr(table, 'probe') else None
+    if entry is not None and entry[4] is not None:
+        expected = game.cols - 1 - entry[4] if game.mirror_key < game.key else entry[4]
+        if expected in columns:
+            columns.remove(expected)
+            columns.insert(0, expected)
+    return columns
+
+
+class BackgroundSearch:
+    """
+    Runs a bot's choose_move, or its analyze, on a worker thread, so that the caller's event loop keeps running.
+
+    The bot searches a copy of the game. Bots with a `stop_event` attribute are stopped through it
+    by `cancel`, which returns once the worker thread has let go of the bot; other bots are left to
+    finish on their own and their move is thrown away.
+
+    While the opponent thinks, `ponder` searches the bot's move after each of their likely replies in turn,
+    with the same bot, so that its transposition table fills up too. A reply searched to the end has its move
+    kept, and `start` returns it at once if the opponent does play that reply; otherwise the search starts
+    with the table the pondering left behind.
+    A bot with a `ponder` method of its own, such as MctsAiBot, ponders with it instead: searching each reply
+    with its full budget would throw its search tree away, while growing the tree of the current position
+    keeps the opponent's reply in it for the next search.
+
+    Attributes:
+        bot (object or None): The bot searching, None when idle.
+        start_time (float or None): `time.perf_counter()` when the search started.
+        pondered (dict): The bot's move after every reply pondered to the end, keyed by position key.
+        pondered_bot (object or None): The bot the pondered moves were searched by.
+        ponder_hits (int): The number of moves taken from `pondered` by `start`.
+
+    Methods:
+        start(bot, game, analyze): Starts searching the best move, or the scores of all moves, of a position.
+        ponder(bot, game): Starts searching the bot's move after every likely reply of the opponent.
+        done(): Whether the search has finished.
+        elapsed_ms(): Returns the time since the search started.
+        progress(): Returns the depth and nodes reached so far.
+        result(): Returns the chosen move, or the scores, of the finished search.
+        cancel(): Stops the search and throws its result away.
+        shutdown(): Cancels any search and stops the worker thread.
+    """
+
+    def __init__(self):
+        """
+        Initialize the BackgroundSearch with its worker thread idle.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-search')
+        self.future = None
+        self.bot = None
+        self.stop_event = None
+        self.start_time = None
+        self.pondered = {}
+        self.pondered_bot = None
+        self.ponder_hits = 0
+
+    @property
+    def running(self):
+        """
+        Whether a search was started and its result not collected or cancelled yet.
+        """
+        return self.future is not None
+
+    def start(self, bot, game, analyze=False):
+        """
+        Starts searching the best move of a position, cancelling the previous search if any.
+
+        Parameters:
+            bot (object): The bot choosing the move.
+            game (ConnectFour): The position, copied before the search starts.
+            analyze (bool): Whether to score every column with `bot.analyze` instead of choosing a move.
+        """
+        self._begin(bot)
+        key = game.key
+        if not analyze and bot is self.pondered_bot and key in self.pondered:
+            move = self.pondered[key]
+            self.ponder_hits += 1
+            self.future = self.executor.submit(lambda: move)
+        else:
+            self.future = self.executor.submit(bot.analyze if analyze else bot.choose_move, game.copy())
+
+    def ponder(self, bot, game):
+        """
+        Starts searching the bot's move after every likely reply of the opponent, forgetting earlier pondered moves.
+
+        The search runs until every reply is searched, or with the bot's own `ponder` until `cancel` is called.
+        Its result is None.
+
+        Parameters:
+            bot (object): The bot that will answer the reply, which should have a `stop_event` attribute.
+            game (ConnectFour): The position with the opponent to move, copied before the search starts.
+        """
+        self._begin(bot)
+        self.pondered = {}
+        self.pondered_bot = bot
+        if hasattr(bot, 'ponder'):
+            self.future = self.executor.submit(bot.ponder, game.copy())
+        else:
+            self.future = self.executor.submit(self._ponder, bot, game.copy(), self.stop_event, self.pondered)
+
+    def _ponder(self, bot, game, stop_event, pondered):
+        """
+        Searches the bot's move after each likely reply on the worker thread, until stopped.
+        """
+        for col in likely_replies(bot, game):
+            game.play(col)
+            if not game.is_terminal:
+                move = bot.choose_move(game)
+                if stop_event.is_set():
+                    return None  # The last search was cut short
+                pondered[game.key] = move
+            game.undo(col)
+        return None
+
+    def _begin(self, bot):
+        """
+        Cancels the previous search and hands the stop event to the bot.
+        """
+        self.cancel()
+        self.bot = bot
+        self.stop_event = threading.Event()
+        if hasattr(bot, 'stop_event'):
+            bot.stop_event = self.stop_event
+        self.start_time = time.perf_counter()
+
+    def done(self):
+        """
+        Whether the search has finished.
+
+        Returns:
+            bool: True if the result is ready, False while searching or when idle.
+        """
+        return self.future is not None and self.future.done()
+
+    def elapsed_ms(self):
+        """
+        Returns the time since the search started.
+
+        Returns:
+            float: The elapsed time in milliseconds, 0 when idle.
+        """
+        if self.start_time is None:
+            return 0.0
+        return (time.perf_counter() - self.start_time) * 1000
+
+    def progress(self):
+        """
+        Returns the depth and nodes reached so far, read from the bot while it searches.
+
+        Returns:
+            tuple: The depth of the iteration in progress and the nodes searched, each None if the bot does not report it.
+        """
+        if self.bot is None:
+            return None, None
+        return getattr(self.bot, 'current_depth', None), getattr(self.bot, 'nodes', None)
+
+    def result(self):
+        """
+        Returns the chosen move, or the scores, of the finished search and makes the search idle again.
+
+        Returns:
+            int, list or None: The chosen column, or the score of every column when analyzing.
+        """
+        try:
+            return self.future.result()
+        finally:
+            self._release()
+
+    def cancel(self):
+        """
+        Stops the search, waits for the worker thread to let go of the bot and throws the result away.
+        """
+        if self.future is None:
+            return
+        self.stop_event.set()
+        try:
+            self.future.result()
+        except Exception:
+            pass  # The move is thrown away anyway
+        finally:
+            self._release()
+
+    def shutdown(self):
+        """
+        Cancels any search and stops the worker thread.
+        """
+        self.cancel()
+        self.executor.shutdown()
+
+    def _release(self):
+        if hasattr(self.bot, 'stop_event'):
+            self.bot.stop_event = None
+        self.future = None
+        self.bot = None
+        self.stop_event = None
+        self.start_time = None
@@ -0,0 +1,215 @@
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from specs import ROWS, COLS, CONNECT
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from records import from_digits
+
+
+DEFAULT_DEPTH = 6
+DEFAULT_CHUNK_SIZE = 32
+
+
+def parse_position(position, size=(ROWS, COLS, CONNECT)):
+    """
+    Builds the game of a position given as moves or as a board.
+
+    Parameters:
+        position (str or sequence): The moves as 1-based column digits, or the rows of a board
+            top row first, see `ConnectFour.from_board`.
+        size (tuple): The rows, columns and discs in a row needed to win. A board brings its own rows and columns.
+
+    Returns:
+        ConnectFour: The position.
+
+    Raises:
+        ValueError: If the moves or the board are not valid.
+    """
+    rows, cols, connect = size
+    if isinstance(position, str):
+        return ConnectFour.from_moves(from_digits(position), rows, cols, connect)
+    return ConnectFour.from_board(position, connect)
+
+
+def analyze_game(bot, game):
+    """
+    Scores every legal column of a position, see `AlphaBetaAiBot.analyze`.
+
+    The bot's transposition table is kept, so positions seen by earlier calls are not searched again.
+
+    Parameters:
+        bot (AlphaBetaAiBot): The bot searching, `bot.max_depth` plies deep counting the column played.
+        game (ConnectFour): The position.
+
+    Returns:
+        dict: The best column, its score, the score of every column (None for full ones) and the nodes searched.
+        Scores are positive when good for 'O'; the best column is None if the game is over.
+    """
+    scores = bot.analyze(game)
+    return {'move': bot.last_search.move, 'score': bot.last_search.score, 'scores': scores, 'nodes': bot.nodes}
+
+
+_worker_bot = None
+
+
+def _init_worker(options):
+    """
+    Creates the search bot of a worker process. It lives as long as the process, keeping its transposition table.
+    """
+    global _worker_bot
+    _worker_bot = AlphaBetaAiBot(**options)
+
+
+def _analyze_chunk(start, positions, size):
+    """
+    Analyzes consecutive positions inside a worker process.
+
+    Returns:
+        list: One result per position, see `analyze_positions`.
+    """
+    results = []
+    for index, position in enumerate(positions, start):
+        started = time.perf_counter()
+        try:
+            game = parse_position(position, size)
+        except (ValueError, TypeError, IndexError) as error:
+            results.append({'index': index, 'error': str(error)})
+            continue
+        result = {'index': index}
+        result.update(analyze_game(_worker_bot, game))
+        result['time_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        results.append(result)
+    return results
+
+
+def _chunks(positions, chunk_size):
+    """
+    Groups positions into lists of `chunk_size`, reading the iterable lazily.
+    """
+    chunk, start = [], 0
+    for index, position in enumerate(positions):
+        if not chunk:
+            start = index
+        chunk.append(position)
+        if len(chunk) == chunk_size:
+            yield start, chunk
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def analyze_positions(positions, depth=DEFAULT_DEPTH, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, max_pending=None,
+                      size=(ROWS, COLS, CONNECT), **options):
+    """
+    Analyzes many positions, yielding the result of each in input order as soon as it is ready.
+
+    Positions are read lazily and sent to the workers in chunks, with at most `max_pending` chunks
+    in flight, so an input generator of any length is processed in bounded memory. Every worker
+    keeps one bot, and its transposition table, for all the positions it analyzes.
+    A position that cannot be read gives a result with an `error` message instead of stopping the batch.
+
+    Parameters:
+        positions (iterable): Positions as move strings or boards, see `parse_position`.
+        depth (int): The search depth, counting the column played.
+        workers (int): The number of worker processes, 1 to analyze in this process.
+        chunk_size (int): The number of positions sent to a worker at once.
+        max_pending (int): The most chunks queued on the pool at once, four per worker by default.
+        size (tuple): The rows, columns and discs in a row needed to win, for move strings.
+        **options: Other AlphaBetaAiBot arguments, such as `tt_size_mb`.
+
+    Yields:
+        dict: The `index` of the position in the input, the best column `move`, its `score`, the
+        `scores` of every column (None for full ones), the `nodes` searched and the `time_ms` taken.
+    """
+    options = dict(options, max_depth=depth)
+    chunks = _chunks(positions, chunk_size)
+
+    if workers <= 1:
+        _init_worker(options)
+        for start, chunk in chunks:
+            yield from _analyze_chunk(start, chunk, size)
+        return
+
+    max_pending = max_pending or 4 * workers
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(options,)) as executor:
+        pending = deque()
+        for start, chunk in chunks:
+            pending.append(executor.submit(_analyze_chunk, start, chunk, size))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def read_positions(lines):
+    """
+    Reads one position per line: moves as 1-based column digits, '-' for the empty board,
+    or a board as a JSON list of rows. Blank lines are skipped.
+
+    Parameters:
+        lines (iterable): The lines, for example an open file.
+
+    Yields:
+        str or list: The positions, see `parse_position`.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('['):
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line  # Reported as invalid moves by the worker
+        else:
+            yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every column of many Connect Four positions.")
+    parser.add_argument('input', help="File with one position per line, '-' for standard input.")
+    parser.add_argument('--output', help="JSONL file receiving one result per position, standard output by default.")
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--tt-size-mb', type=float, default=None, help="Transposition table size of every worker.")
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--cols', type=int, default=COLS)
+    parser.add_argument('--connect', type=int, default=CONNECT, help="Discs in a row needed to win.")
+    args = parser.parse_args(argv)
+
+    size = (args.rows, args.cols, args.connect)
+    try:
+        ConnectFour(*size)
+    except ValueError as error:
+        parser.error(str(error))
+
+    options = {'tt_size_mb': args.tt_size_mb} if args.tt_size_mb else {}
+    source = sys.stdin if args.input == '-' else open(args.input)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        for result in analyze_positions(read_positions(source), args.depth, args.workers, args.chunk_size,
+                                        size=size, **options):
+            output.write(json.dumps(result) + '\n')
+            count += 1
+            errors += 'error' in result
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"Analyzed {count} positions ({errors} invalid) in {elapsed:.1f} s, {rate:.1f} positions/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
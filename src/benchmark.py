@@ -0,0 +1,274 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+from game import ConnectFour
+from minmax import MinMaxAiBot
+from alphabeta import AlphaBetaAiBot
+from records import from_digits
+
+
+# Bump the version whenever a position is added, removed or changed, so that old baselines are not compared
+CORPUS_VERSION = 1
+
+# (name, category, moves as 1-based column digits)
+CORPUS = (
+    ('empty', 'opening', ''),
+    ('center', 'opening', '4'),
+    ('opening-4', 'opening', '4453'),
+    ('opening-8', 'opening', '43443525'),
+    ('midgame-10', 'midgame', '4433554412'),
+    ('midgame-16', 'midgame', '4444442333332211'),
+    ('midgame-15', 'midgame', '255327657366745'),
+    ('endgame-34a', 'near-terminal', '7232622133151713756667411342357762'),
+    ('endgame-34b', 'near-terminal', '2653764717636756453355323165142271'),
+    ('win-in-1', 'forced-win', '12345671234567123'),
+    ('win-in-3', 'forced-win', '3341721453267'),
+    ('win-in-4', 'forced-win', '7473425317363311'),
+)
+
+BOTS = {
+    'minimax': MinMaxAiBot,
+    'alphabeta': AlphaBetaAiBot,
+    'pvs': partial(AlphaBetaAiBot, search_mode='pvs'),
+}
+
+DEFAULT_DEPTHS = {
+    'minimax': (2, 4, 6),
+    'alphabeta': (2, 4, 6, 8),
+    'pvs': (2, 4, 6, 8),
+}
+
+DEFAULT_THRESHOLD = 0.10
+MIN_COMPARED_MS = 100  # Shorter total times are mostly noise and are not compared
+
+
+def load_position(moves):
+    """
+    Builds the game of a corpus position.
+
+    Parameters:
+        moves (str): The moves as 1-based column digits.
+
+    Returns:
+        ConnectFour: The position.
+    """
+    return ConnectFour.from_moves(from_digits(moves))
+
+
+def run_case(bot_name, moves, depth, repeat=1, memory=True, threats=False):
+    """
+    Searches one position at one depth with a fresh bot, so that no state is carried over between cases.
+
+    Parameters:
+        bot_name (str): The bot from BOTS.
+        moves (str): The position as 1-based column digits.
+        depth (int): The search depth.
+        repeat (int): The number of timed searches; the fastest one is reported.
+        memory (bool): Whether to run one more search under tracemalloc to measure the peak memory.
+        threats (bool): Whether the bot narrows its moves down by the immediate threats, see `threats.threat_moves`.
+
+    Returns:
+        dict: The chosen move and its score, the nodes searched, the time and speed of the search,
+        and the peak memory in kilobytes (None when not measured).
+    """
+    game = load_position(moves)
+    best_ms, info = None, None
+
+    for _ in range(repeat):
+        bot = BOTS[bot_name](max_depth=depth, threats=threats)
+        start = time.perf_counter()
+        bot.choose_move(game)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if best_ms is None or elapsed_ms < best_ms:
+            best_ms, info = elapsed_ms, bot.last_search
+
+    peak_kb = None
+    if memory:
+        # Tracing slows the search down a lot, so it gets a run of its own. The bot is built
+        # inside it to count its tables too.
+        tracemalloc.start()
+        try:
+            BOTS[bot_name](max_depth=depth, threats=threats).choose_move(game)
+            peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'move': info.move,
+        'score': info.score,
+        'nodes': info.nodes,
+        'time_ms': round(best_ms, 3),
+        'nodes_per_sec': round(info.nodes / best_ms * 1000) if best_ms > 0 else None,
+        'peak_kb': peak_kb,
+    }
+
+
+def run_benchmark(depths=None, positions=None, repeat=1, memory=True, progress=None, threats=False):
+    """
+    Runs every bot over the corpus at each of its depths.
+
+    The pruning ratio of an Alpha-Beta case is the share of the Minimax tree it did not visit,
+    available when Minimax was run on the same position at the same depth. Minimax always runs
+    first so that the ratio is known when each case is reported.
+
+    Parameters:
+        depths (dict): The depths searched by each bot, DEFAULT_DEPTHS by default.
+        positions (list): The names of the corpus positions to run, all of them by default.
+        repeat (int): The number of timed searches per case.
+        memory (bool): Whether to measure the peak memory of every case.
+        progress (callable): Called with each finished case.
+        threats (bool): Whether the bots narrow their moves down by the immediate threats, see `threats.threat_moves`.
+
+    Returns:
+        dict: The corpus version, whether threats were used, the results of every case and the totals of every bot.
+    """
+    depths = depths or DEFAULT_DEPTHS
+    corpus = [entry for entry in CORPUS if positions is None or entry[0] in positions]
+
+    results = []
+    full_tree = {}
+    for bot_name in sorted(depths, key=lambda bot_name: bot_name != 'minimax'):
+        bot_depths = depths[bot_name]
+        for name, category, moves in corpus:
+            for depth in bot_depths:
+                case = {'bot': bot_name, 'position': name, 'category': category, 'depth': depth}
+                case.update(run_case(bot_name, moves, depth, repeat, memory, threats))
+
+                if bot_name == 'minimax':
+                    full_tree[name, depth] = case['nodes']
+                    case['pruning'] = 0.0
+                elif (name, depth) in full_tree:
+                    case['pruning'] = round(1 - case['nodes'] / full_tree[name, depth], 4)
+                else:
+                    case['pruning'] = None
+
+                results.append(case)
+                if progress is not None:
+                    progress(case)
+
+    totals = {}
+    for bot_name in depths:
+        cases = [case for case in results if case['bot'] == bot_name]
+        nodes = sum(case['nodes'] for case in cases)
+        time_ms = sum(case['time_ms'] for case in cases)
+        totals[bot_name] = {
+            'cases': len(cases),
+            'nodes': nodes,
+            'time_ms': round(time_ms, 3),
+            'nodes_per_sec': round(nodes / time_ms * 1000) if time_ms > 0 else None,
+        }
+
+    return {
+        'corpus_version': CORPUS_VERSION,
+        'python': sys.version.split()[0],
+        'threats': threats,
+        'results': results,
+        'totals': totals,
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares a benchmark report with a baseline report.
+
+    Node counts are deterministic and compared case by case. Times are noisy, so they are only
+    compared on each bot's total over the cases both reports share, when it is at least MIN_COMPARED_MS.
+
+    Parameters:
+        report (dict): The new report from `run_benchmark`.
+        baseline (dict): The baseline report.
+        threshold (float): The allowed relative increase, e.g. 0.1 for 10%.
+
+    Returns:
+        list: A message for every regression, empty when there is none.
+
+    Raises:
+        ValueError: If the reports were made from different corpus versions.
+    """
+    if report['corpus_version'] != baseline['corpus_version']:
+        raise ValueError(f"The baseline uses corpus version {baseline['corpus_version']}, "
+                         f"not {report['corpus_version']}.")
+
+    def case_key(case):
+        return case['bot'], case['position'], case['depth']
+
+    old_cases = {case_key(case): case for case in baseline['results']}
+    regressions = []
+    old_times, new_times = {}, {}
+
+    for case in report['results']:
+        old = old_cases.get(case_key(case))
+        if old is None:
+            continue
+        bot, position, depth = case_key(case)
+        if case['nodes'] > old['nodes'] * (1 + threshold):
+            regressions.append(f"{bot} {position} depth {depth}: {case['nodes']} nodes, was {old['nodes']}")
+        old_times[bot] = old_times.get(bot, 0) + old['time_ms']
+        new_times[bot] = new_times.get(bot, 0) + case['time_ms']
+
+    for bot, old_time in old_times.items():
+        if old_time >= MIN_COMPARED_MS and new_times[bot] > old_time * (1 + threshold):
+            regressions.append(f"{bot}: {new_times[bot]:.1f} ms in total, was {old_time:.1f} ms")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Minimax and Alpha-Beta searches on a fixed corpus.")
+    parser.add_argument('--bots', nargs='+', choices=list(BOTS), default=list(BOTS))
+    parser.add_argument('--depths', type=int, nargs='+', help="Depths for every bot, instead of the defaults.")
+    parser.add_argument('--positions', nargs='+', choices=[entry[0] for entry in CORPUS],
+                        help="Corpus positions to run, all by default.")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed searches per case, keeping the fastest.")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the peak memory measurement.")
+    parser.add_argument('--threats', action='store_true',
+                        help="Narrow the moves searched down by the immediate threats of both players.")
+    parser.add_argument('--output', help="Write the report as JSON to this file.")
+    parser.add_argument('--baseline', help="Compare with this JSON report and exit with status 1 on regressions.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative increase of nodes and time before failing (default 0.1).")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    depths = {bot: tuple(args.depths) if args.depths else DEFAULT_DEPTHS[bot] for bot in args.bots}
+
+    print(f"{'bot':<10} {'position':<12} {'depth':>5} {'nodes':>9} {'ms':>10} {'nodes/s':>9} "
+          f"{'pruning':>8} {'peak KB':>9}")
+
+    def progress(case):
+        pruning = '' if case['pruning'] is None else f"{case['pruning']:.1%}"
+        peak = '' if case['peak_kb'] is None else case['peak_kb']
+        print(f"{case['bot']:<10} {case['position']:<12} {case['depth']:>5} {case['nodes']:>9} "
+              f"{case['time_ms']:>10.1f} {case['nodes_per_sec'] or 0:>9} {pruning:>8} {peak:>9}", flush=True)
+
+    report = run_benchmark(depths, args.positions, args.repeat, not args.no_memory, progress, args.threats)
+    for bot, totals in report['totals'].items():
+        print(f"{bot}: {totals['nodes']} nodes in {totals['time_ms']:.1f} ms, {totals['nodes_per_sec']} nodes/s")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if baseline is not None:
+        try:
+            regressions = compare(report, baseline, args.threshold)
+        except ValueError as error:
+            parser.error(str(error))
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
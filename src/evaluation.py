@@ -0,0 +1,128 @@
+from functools import lru_cache
+
+
+WINDOW_LENGTH = 3  # Window size of Connect Four, one fewer than the discs needed to win
+WINDOW_SCORE = 5
+
+
+def popcount(bits):
+    """
+    Counts the set bits of a bitboard.
+
+    Parameters:
+        bits (int): The bitboard.
+
+    Returns:
+        int: The number of set bits.
+    """
+    return bin(bits).count('1')
+
+
+def count_windows(geometry, discs, others, length=WINDOW_LENGTH):
+    """
+    Counts the lines of `length` cells holding one disc fewer than full of `discs` and one cell of `others`.
+
+    All lines of one direction are counted at once by shifting the bitboards onto the line's start cell,
+    so the cost does not depend on the number of windows on the board.
+
+    Parameters:
+        geometry (BoardGeometry): The board layout.
+        discs (int): Bitboard of the player's discs.
+        others (int): Bitboard of the cells allowed for the remaining cell of the window.
+        length (int): The number of cells in a window.
+
+    Returns:
+        int: The number of matching windows.
+    """
+    count = 0
+
+    if length == 3:
+        # Unrolled version of the loop below for the common window size
+        for step, starts in geometry.window_starts(3):
+            discs_1, discs_2 = discs >> step, discs >> (step << 1)
+            others_1, others_2 = others >> step, others >> (step << 1)
+            count += popcount(starts & ((discs & discs_1 & others_2) |
+                                        (discs & others_1 & discs_2) |
+                                        (others & discs_1 & discs_2)))
+        return count
+
+    for step, starts in geometry.window_starts(length):
+        shifted_discs = [discs >> (i * step) for i in range(length)]
+        shifted_others = [others >> (i * step) for i in range(length)]
+
+        matches = 0
+        for odd in range(length):
+            pattern = starts & shifted_others[odd]
+            for i in range(length):
+                if i != odd:
+                    pattern &= shifted_discs[i]
+            matches |= pattern
+
+        count += popcount(matches)
+    return count
+
+
+def window_score(game, open_only):
+    """
+    Scores the windows of `game.window_length` cells, three in Connect Four, where a player has all discs but one,
+    positive for 'O' and negative for 'X'.
+
+    Parameters:
+        game (ConnectFour): The position to score.
+        open_only (bool): Only count windows whose remaining cell is empty, otherwise it may hold an opponent disc too.
+
+    Returns:
+        int: WINDOW_SCORE times the difference between the windows of 'O' and those of 'X'.
+    """
+    geometry = game.geometry
+    length = game.window_length
+    x_bits, o_bits = game.bitboards
+
+    if open_only:
+        empty = geometry.board_mask & ~game.mask
+        x_windows = count_windows(geometry, x_bits, empty, length)
+        o_windows = count_windows(geometry, o_bits, empty, length)
+    else:
+        x_windows = count_windows(geometry, x_bits, geometry.board_mask & ~x_bits, length)
+        o_windows = count_windows(geometry, o_bits, geometry.board_mask & ~o_bits, length)
+
+    return WINDOW_SCORE * (o_windows - x_windows)
+
+
+@lru_cache(maxsize=None)
+def window_gains(length=WINDOW_LENGTH):
+    """
+    Builds the tables used to keep the window scores up to date one disc at a time.
+
+    The content of a window is encoded as `x + (length + 1) * o`, the number of 'X' and 'O' discs in it,
+    so adding a disc of a player adds that player's weight to the window's state.
+
+    Parameters:
+        length (int): The number of cells in a window.
+
+    Returns:
+        tuple: The weight of each player, and for each player the `(any, open)` lists giving, by window state,
+        how much `window_score(game, False)` and `window_score(game, True)` change when one of their discs is added.
+    """
+    base = length + 1
+    weights = (1, base)
+    states = range(base * base)
+
+    def score(state, open_only):
+        # Short windows can count for both players at once, e.g. one disc each in a window of two
+        x_count, o_count = state % base, state // base
+        value = 0
+        if o_count == length - 1 and (x_count == 0 or not open_only):
+            value += WINDOW_SCORE
+        if x_count == length - 1 and (o_count == 0 or not open_only):
+            value -= WINDOW_SCORE
+        return value
+
+    gains = []
+    for weight in weights:
+        gains.append(tuple(
+            [score(state + weight, open_only) - score(state, open_only) if state + weight in states else 0
+             for state in states]
+            for open_only in (False, True)
+        ))
+    return weights, tuple(gains)
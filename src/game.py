@@ -1,21 +1,288 @@
 from specs import *
+from geometry import get_geometry
+from evaluation import window_gains, popcount
+
+
+PLAYERS = ('X', 'O')
 
 
 class ConnectFour:
-    def __init__(self):
+    def __init__(self, rows=ROWS, cols=COLS, connect=CONNECT):
         """
         Initializes a ConnectFour game instance.
 
+        The board is stored as two bitboards, one per player, plus the height of every column.
+        Each column takes `rows + 1` bits, the lowest bit being the bottom cell and the extra
+        top bit always staying empty so that shifted line checks never wrap into the next column.
+        Python integers grow as needed, so a single integer holds the board whatever its size.
+
+        Parameters:
+        - rows (int): The number of rows on the game board.
+        - cols (int): The number of columns on the game board.
+        - connect (int): The number of discs in a row needed to win.
+
         Attributes:
         - rows (int): The number of rows on the game board.
         - cols (int): The number of columns on the game board.
-        - board (list): A 2D list representing the game board.
+        - connect (int): The number of discs in a row needed to win.
+        - geometry (BoardGeometry): The shared bit layout and line tables of the board size.
+        - bitboards (list): Two integers holding the discs of Player 1 (X) and Player 2 (O).
+        - mask (int): Bitboard of all occupied cells.
+        - mirror_bitboards (list): The bitboards of the position flipped left to right, kept up to date by every move.
+        - mirror_mask (int): Bitboard of all occupied cells of the flipped position.
+        - heights (list): The number of discs in each column.
+        - move_count (int): The number of discs on the board.
+        - moves (list): The columns played in order, see `records` to save and load them.
         - turn (int): Represents the current player's turn. 0 for Player 1 (X), 1 for Player 2 (O).
+        - winner (str or None): The player who connected `connect` discs ('X' or 'O'), kept up to date by every move.
+        - window_length (int): The number of cells of the evaluation windows, one fewer than `connect`.
+        - window_counts (list): The state of every evaluation window, see `evaluation.window_gains`.
+        - window_score (int): `evaluation.window_score(game, False)`, kept up to date by every move.
+        - open_window_score (int): `evaluation.window_score(game, True)`, kept up to date by every move.
         """
-        self.rows = ROWS
-        self.cols = COLS
-        self.board = [[' ' for _ in range(COLS)] for _ in range(ROWS)]
+        if connect < 2 or connect > max(rows, cols):
+            raise ValueError(f"Cannot connect {connect} on a {rows}x{cols} board.")
+
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.geometry = get_geometry(rows, cols)
+        self.col_height = self.geometry.col_height
+        self.bitboards = [0, 0]
+        self.mask = 0
+        self.mirror_bitboards = [0, 0]
+        self.mirror_mask = 0
+        self._mirror_offsets = self.geometry.mirror_offsets
+        self.heights = [0] * cols
+        self.move_count = 0
+        self.moves = []
         self.turn = 0  # 0 for Player 1 (X), 1 for Player 2 (O)
+        self.winner = None
+        self._winning_count = 0  # move_count right after the winning disc was dropped
+        self._win_shifts = self.geometry.win_shifts(connect)
+        self.window_length = connect - 1
+        self.window_counts = [0] * len(self.geometry.windows(self.window_length))
+        self.window_score = 0
+        self.open_window_score = 0
+        self._cell_windows = self.geometry.cell_windows(self.window_length)
+        self._window_weights, self._window_gains = window_gains(self.window_length)
+        self._board = None
+
+
+    @classmethod
+    def from_bitboards(cls, bitboards, turn, rows=ROWS, cols=COLS, connect=CONNECT):
+        """
+        Builds a game from the discs of both players, for example to rebuild a position sent to another process.
+        The order the discs were played in is unknown, so `moves` only records the moves played afterwards.
+
+        Parameters:
+        - bitboards (tuple): The bitboards of Player 1 (X) and Player 2 (O).
+        - turn (int): The player to move. 0 for Player 1 (X), 1 for Player 2 (O).
+        - rows, cols, connect (int): The board size and the number of discs in a row needed to win.
+
+        Returns:
+        - ConnectFour: The game with the discs in place.
+        """
+        game = cls(rows, cols, connect)
+        for col in range(game.cols):
+            for row in range(game.rows):
+                bit = 1 << game.geometry.cell(col, row)
+                if bitboards[0] & bit:
+                    game.drop_disc(col, 'X')
+                elif bitboards[1] & bit:
+                    game.drop_disc(col, 'O')
+                else:
+                    break
+        game.turn = turn
+        game.moves = []
+        return game
+
+
+    @classmethod
+    def from_moves(cls, moves, rows=ROWS, cols=COLS, connect=CONNECT, first=0):
+        """
+        Builds a game by playing a sequence of moves from the empty board, Player 1 (X) first by default.
+
+        Parameters:
+        - moves (iterable): The columns played, 0-based.
+        - rows, cols, connect (int): The board size and the number of discs in a row needed to win.
+        - first (int): The player moving first. 0 for Player 1 (X), 1 for Player 2 (O).
+
+        Returns:
+        - ConnectFour: The game after the moves.
+
+        Raises:
+        - ValueError: If a move is not valid.
+        """
+        game = cls(rows, cols, connect)
+        game.turn = first
+        for col in moves:
+            if game.is_terminal or not game.is_valid_move(col):
+                raise ValueError(f"Invalid move {col} after {game.move_count} moves.")
+            game.play(col)
+        return game
+
+
+    @classmethod
+    def from_board(cls, board, connect=CONNECT):
+        """
+        Builds a game from a 2D board, top row first as in `board`, the size being that of the board.
+
+        Cells are 'X' or 1 for Player 1, 'O' or 2 for Player 2, and ' ', '.', 0 or None when empty.
+        Player 1 (X) moves first, so the player to move follows from the number of discs.
+        As with `from_bitboards`, `moves` only records the moves played afterwards.
+
+        Parameters:
+        - board (sequence): The rows of the board, each a sequence of cells.
+        - connect (int): The number of discs in a row needed to win.
+
+        Returns:
+        - ConnectFour: The game with the discs in place.
+
+        Raises:
+        - ValueError: If a cell is unknown, a disc floats above an empty cell or the disc counts cannot happen.
+        """
+        rows = len(board)
+        cols = len(board[0]) if rows else 0
+        game = cls(rows, cols, connect)
+        for row, cells in enumerate(reversed(board)):
+            if len(cells) != cols:
+                raise ValueError(f"Row {rows - row} has {len(cells)} cells instead of {cols}.")
+            for col, cell in enumerate(cells):
+                if cell in ('X', 1, 'O', 2):
+                    if game.heights[col] != row:
+                        raise ValueError(f"The disc in column {col + 1} floats above an empty cell.")
+                    game.drop_disc(col, 'X' if cell in ('X', 1) else 'O')
+                elif cell not in (' ', '.', 0, None):
+                    raise ValueError(f"Unknown cell {cell!r}.")
+
+        x_count = popcount(game.bitboards[0])
+        o_count = game.move_count - x_count
+        if x_count - o_count not in (0, 1):
+            raise ValueError(f"{x_count} discs of X and {o_count} of O cannot happen with X moving first.")
+        game.turn = x_count - o_count
+        game.moves = []
+        return game
+
+
+    @property
+    def is_terminal(self):
+        """
+        Whether the game is over, either by a win or by a full board.
+
+        Returns:
+        - bool: True if no more moves can be played, False otherwise.
+        """
+        return self.winner is not None or self.move_count == self.rows * self.cols
+
+
+    @property
+    def first_turn(self):
+        """
+        The player who played the first move of `moves`, or who is to move if none was played.
+
+        Returns:
+        - int: 0 for Player 1 (X), 1 for Player 2 (O).
+        """
+        return (self.turn + len(self.moves)) % 2
+
+
+    @property
+    def key(self):
+        """
+        A unique integer identifying the position and the player to move.
+
+        Adding the mask to a player's bitboard sets one extra bit on top of every column,
+        which makes the sum unique for each arrangement of discs.
+
+        Returns:
+        - int: The position key.
+        """
+        return ((self.bitboards[0] + self.mask) << 1) | self.turn
+
+
+    @property
+    def mirror_key(self):
+        """
+        The key of the position flipped left to right, see `key`.
+
+        Returns:
+        - int: The position key of the mirror position.
+        """
+        return ((self.mirror_bitboards[0] + self.mirror_mask) << 1) | self.turn
+
+
+    @property
+    def canonical_key(self):
+        """
+        The same key for a position and its mirror image, the smaller of `key` and `mirror_key`.
+
+        Mirror positions have mirror best moves and the same score, so caches keyed by it hold
+        each pair once. A move stored with it is in the orientation of the smaller key: when
+        `mirror_key < key`, column `col` of the stored move is column `cols - 1 - col` here.
+
+        Returns:
+        - int: The canonical position key.
+        """
+        key = ((self.bitboards[0] + self.mask) << 1) | self.turn
+        mirror_key = ((self.mirror_bitboards[0] + self.mirror_mask) << 1) | self.turn
+        return mirror_key if mirror_key < key else key
+
+
+    @property
+    def is_symmetric(self):
+        """
+        Whether the position is its own mirror image, like the empty board, so that mirror moves are equally good.
+
+        Returns:
+        - bool: True if flipping the board left to right leaves it unchanged.
+        """
+        return self.mask == self.mirror_mask and self.bitboards[0] == self.mirror_bitboards[0]
+
+
+    @property
+    def board(self):
+        """
+        A read-only 2D view of the game board, top row first, built from the bitboards on demand.
+
+        Returns:
+        - tuple: A tuple of rows, each a tuple of ' ', 'X' or 'O' cells.
+        """
+        if self._board is None:
+            x_bits, o_bits = self.bitboards
+            board = []
+            for row in range(self.rows - 1, -1, -1):
+                cells = []
+                for col in range(self.cols):
+                    bit = 1 << (col * self.col_height + row)
+                    cells.append('X' if x_bits & bit else 'O' if o_bits & bit else ' ')
+                board.append(tuple(cells))
+            self._board = tuple(board)
+        return self._board
+
+
+    def copy(self):
+        """
+        Creates an independent copy of the game state.
+
+        Returns:
+        - ConnectFour: The copied game.
+        """
+        new_game = ConnectFour(self.rows, self.cols, self.connect)
+        new_game.bitboards = self.bitboards[:]
+        new_game.mask = self.mask
+        new_game.mirror_bitboards = self.mirror_bitboards[:]
+        new_game.mirror_mask = self.mirror_mask
+        new_game.heights = self.heights[:]
+        new_game.move_count = self.move_count
+        new_game.moves = self.moves[:]
+        new_game.turn = self.turn
+        new_game.winner = self.winner
+        new_game._winning_count = self._winning_count
+        new_game.window_counts = self.window_counts[:]
+        new_game.window_score = self.window_score
+        new_game.open_window_score = self.open_window_score
+        return new_game
 
 
     def is_valid_move(self, col):
@@ -28,7 +295,58 @@ class ConnectFour:
         Returns:
         - bool: True if the move is valid, False otherwise.
         """
-        return 0 <= col < self.cols and self.board[0][col] == ' '
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+
+    def play(self, col):
+        """
+        Drops a disc of the player to move into a column, in place and without validation.
+
+        Parameters:
+        - col (int): The column where the disc is dropped. Must be a valid move.
+        """
+        height = self.heights[col]
+        cell = col * self.col_height + height
+        bit = 1 << cell
+        self.bitboards[self.turn] |= bit
+        self.mask |= bit
+        mirror_bit = 1 << (self._mirror_offsets[col] + height)
+        self.mirror_bitboards[self.turn] |= mirror_bit
+        self.mirror_mask |= mirror_bit
+        self.heights[col] = height + 1
+        self.move_count += 1
+        self.moves.append(col)
+        self._add_to_windows(cell, self.turn)
+        self._update_winner(self.turn)
+        self.turn = 1 - self.turn
+        self._board = None
+
+
+    def undo(self, col):
+        """
+        Takes back the last disc dropped into a column, restoring the previous state.
+
+        Parameters:
+        - col (int): The column of the move to take back.
+        """
+        height = self.heights[col] - 1
+        self.heights[col] = height
+        cell = col * self.col_height + height
+        bit = 1 << cell
+        index = 0 if self.bitboards[0] & bit else 1
+        self.bitboards[index] ^= bit
+        self.mask ^= bit
+        mirror_bit = 1 << (self._mirror_offsets[col] + height)
+        self.mirror_bitboards[index] ^= mirror_bit
+        self.mirror_mask ^= mirror_bit
+        if self.moves:  # Empty when taking back the discs of a game built from a board
+            self.moves.pop()
+        self._remove_from_windows(cell, index)
+        if self.move_count == self._winning_count:
+            self.winner = None
+        self.move_count -= 1
+        self.turn = 1 - self.turn
+        self._board = None
 
 
     def drop_disc(self, col, player):
@@ -42,12 +360,111 @@ class ConnectFour:
         Returns:
         - bool: True if the disc is successfully dropped, False otherwise.
         """
-        for i in range(self.rows - 1, -1, -1):
-            if self.board[i][col] == ' ':
-                self.board[i][col] = player
-                self.turn = 1 - self.turn  # Switch turn to the other player
-                return True
-        return False
+        if not self.is_valid_move(col):
+            return False
+
+        index = PLAYERS.index(player)
+        height = self.heights[col]
+        cell = col * self.col_height + height
+        bit = 1 << cell
+        self.bitboards[index] |= bit
+        self.mask |= bit
+        mirror_bit = 1 << (self._mirror_offsets[col] + height)
+        self.mirror_bitboards[index] |= mirror_bit
+        self.mirror_mask |= mirror_bit
+        self.heights[col] = height + 1
+        self.move_count += 1
+        self.moves.append(col)
+        self._add_to_windows(cell, index)
+        self._update_winner(index)
+        self.turn = 1 - self.turn  # Switch turn to the other player
+        self._board = None
+        return True
+
+
+    def _add_to_windows(self, cell, index):
+        """
+        Updates the windows through a cell, and the scores, after a disc was dropped into it.
+
+        Parameters:
+        - cell (int): The bit index of the cell.
+        - index (int): The index of the player who owns the disc (0 for X, 1 for O).
+        """
+        weight = self._window_weights[index]
+        any_gain, open_gain = self._window_gains[index]
+        counts = self.window_counts
+        score_change = open_score_change = 0
+
+        for window in self._cell_windows[cell]:
+            state = counts[window]
+            counts[window] = state + weight
+            score_change += any_gain[state]
+            open_score_change += open_gain[state]
+
+        self.window_score += score_change
+        self.open_window_score += open_score_change
+
+
+    def _remove_from_windows(self, cell, index):
+        """
+        Updates the windows through a cell, and the scores, after its disc was taken back.
+
+        Parameters:
+        - cell (int): The bit index of the cell.
+        - index (int): The index of the player who owned the disc (0 for X, 1 for O).
+        """
+        weight = self._window_weights[index]
+        any_gain, open_gain = self._window_gains[index]
+        counts = self.window_counts
+        score_change = open_score_change = 0
+
+        for window in self._cell_windows[cell]:
+            state = counts[window] - weight
+            counts[window] = state
+            score_change += any_gain[state]
+            open_score_change += open_gain[state]
+
+        self.window_score -= score_change
+        self.open_window_score -= open_score_change
+
+
+    def _update_winner(self, index):
+        """
+        Records a win for a player right after one of their discs was dropped.
+
+        Only the player who just moved can have completed a line, so a single shift-and-mask
+        pass over their bitboard is enough. Each direction doubles the length of the runs it
+        finds until they reach `connect`, see `BoardGeometry.win_shifts`.
+
+        Parameters:
+        - index (int): The index of the player who just moved (0 for X, 1 for O).
+        """
+        if self.winner is not None:
+            return
+
+        bits = self.bitboards[index]
+
+        # Vertical, horizontal and both diagonal directions
+        if self.connect in (3, 4):
+            # Unrolled version of the loop below for two doublings
+            for pair_shift, run_shift in self._win_shifts:
+                pairs = bits & (bits >> pair_shift)
+                if pairs & (pairs >> run_shift):
+                    break
+            else:
+                return
+        else:
+            for shifts in self._win_shifts:
+                runs = bits
+                for shift in shifts:
+                    runs &= runs >> shift
+                if runs:
+                    break
+            else:
+                return
+
+        self.winner = PLAYERS[index]
+        self._winning_count = self.move_count
 
 
     def is_winner(self, player):
@@ -60,30 +477,7 @@ class ConnectFour:
         Returns:
         - bool: True if the player has won, False otherwise.
         """
-        # Check for horizontal wins
-        for row in self.board:
-            if ''.join(row).count(player * 4) > 0:
-                return True
-
-        # Check for vertical wins
-        for col in range(self.cols):
-            column = ''.join(self.board[row][col] for row in range(self.rows))
-            if column.count(player * 4) > 0:
-                return True
-
-        # Check for diagonal wins (top-left to bottom-right)
-        for row in range(self.rows - 3):
-            for col in range(self.cols - 3):
-                if all(self.board[row + i][col + i] == player for i in range(4)):
-                    return True
-
-        # Check for diagonal wins (bottom-left to top-right)
-        for row in range(3, self.rows):
-            for col in range(self.cols - 3):
-                if all(self.board[row - i][col + i] == player for i in range(4)):
-                    return True
-
-        return False
+        return self.winner == player
 
 
     def is_board_full(self):
@@ -93,5 +487,4 @@ class ConnectFour:
         Returns:
         - bool: True if the board is full, False otherwise.
         """
-        return all(cell != ' ' for row in self.board for cell in row)
-
+        return self.move_count == self.rows * self.cols
@@ -0,0 +1,195 @@
+from functools import lru_cache
+
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))  # (column step, row step): vertical, horizontal and both diagonals
+
+
+class BoardGeometry:
+    """
+    Bit layout and precomputed line tables of one board size.
+
+    Cells are numbered column by column from the bottom, each column taking `rows + 1` bits.
+    The extra top bit of every column stays empty, so shifting a bitboard by a direction's step
+    never moves a disc into a neighbouring column's line.
+
+    Parameters:
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+
+    Attributes:
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+        col_height (int): The number of bits per column.
+        board_mask (int): Bitboard of every playable cell.
+        bottom_mask (int): Bitboard of the bottom cell of every column.
+        steps (tuple): The bit shift of each direction in DIRECTIONS.
+        mirror_offsets (tuple): For every column, the bit index of the bottom cell of its mirror column.
+
+    Methods:
+        cell(col, row): Returns the bit index of a cell.
+        mirror(bitboard): Returns a bitboard flipped left to right.
+        windows(length): Returns the bitboards of every line of `length` cells.
+        window_starts(length): Returns the step and start cells of the lines of each direction.
+        cell_windows(length): Returns, for every cell, the indices of the lines of `length` cells through it.
+        win_shifts(connect): Returns the shifts that find lines of `connect` discs in a bitboard.
+    """
+
+    def __init__(self, rows, cols):
+        """
+        Initialize the BoardGeometry.
+
+        Parameters:
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.col_height = rows + 1
+        self.board_mask = sum(1 << self.cell(col, row) for col in range(cols) for row in range(rows))
+        self.bottom_mask = sum(1 << self.cell(col, 0) for col in range(cols))
+        self.steps = tuple(dc * self.col_height + dr for dc, dr in DIRECTIONS)
+        self.mirror_offsets = tuple(self.cell(cols - 1 - col, 0) for col in range(cols))
+        self._column_mask = (1 << self.col_height) - 1
+        self._windows = {}
+        self._window_starts = {}
+        self._cell_windows = {}
+        self._win_shifts = {}
+
+    def cell(self, col, row):
+        """
+        Returns the bit index of a cell.
+
+        Parameters:
+            col (int): The column of the cell.
+            row (int): The row of the cell, 0 being the bottom row.
+
+        Returns:
+            int: The index of the cell's bit.
+        """
+        return col * self.col_height + row
+
+    def mirror(self, bitboard):
+        """
+        Returns a bitboard flipped left to right, column `col` moving to column `cols - 1 - col`.
+
+        Each column is moved as a whole, so this also mirrors position keys made by adding bitboards
+        of the same board, such as `ConnectFour.key` without its turn bit: no carry crosses a column.
+
+        Parameters:
+            bitboard (int): The bitboard to flip.
+
+        Returns:
+            int: The mirrored bitboard.
+        """
+        column_mask = self._column_mask
+        mirrored = 0
+        for col, offset in enumerate(self.mirror_offsets):
+            mirrored |= ((bitboard >> (col * self.col_height)) & column_mask) << offset
+        return mirrored
+
+    def _lines(self, length):
+        """
+        Yields every line of `length` cells as its direction index and the list of its cells.
+        """
+        for direction, (dc, dr) in enumerate(DIRECTIONS):
+            for col in range(self.cols):
+                for row in range(self.rows):
+                    end_col = col + dc * (length - 1)
+                    end_row = row + dr * (length - 1)
+                    if 0 <= end_col < self.cols and 0 <= end_row < self.rows:
+                        yield direction, [self.cell(col + dc * i, row + dr * i) for i in range(length)]
+
+    def windows(self, length):
+        """
+        Returns every line of `length` cells on the board.
+
+        Parameters:
+            length (int): The number of cells in a line.
+
+        Returns:
+            tuple: One `(cells, mask)` pair per line, `cells` being the bit indices and `mask` their bitboard.
+        """
+        if length not in self._windows:
+            self._windows[length] = tuple(
+                (tuple(cells), sum(1 << cell for cell in cells)) for _, cells in self._lines(length)
+            )
+        return self._windows[length]
+
+    def window_starts(self, length):
+        """
+        Returns, for each direction, its bit step and the bitboard of the cells where a line of `length` cells starts.
+
+        Counting the set bits of `starts & a & (b >> step) & (c >> 2 * step) ...` then counts the lines whose
+        cells are in `a`, `b`, `c`, ... in one pass over the whole board.
+
+        Parameters:
+            length (int): The number of cells in a line.
+
+        Returns:
+            tuple: One `(step, starts)` pair per direction.
+        """
+        if length not in self._window_starts:
+            starts = [0] * len(DIRECTIONS)
+            for direction, cells in self._lines(length):
+                starts[direction] |= 1 << cells[0]
+            self._window_starts[length] = tuple(zip(self.steps, starts))
+        return self._window_starts[length]
+
+    def cell_windows(self, length):
+        """
+        Returns, for every cell, the lines of `length` cells passing through it.
+
+        Parameters:
+            length (int): The number of cells in a line.
+
+        Returns:
+            tuple: Indexed by bit index, the tuple of indices into `windows(length)` of the lines through the cell.
+        """
+        if length not in self._cell_windows:
+            by_cell = [[] for _ in range(self.cols * self.col_height)]
+            for index, (cells, _) in enumerate(self.windows(length)):
+                for cell in cells:
+                    by_cell[cell].append(index)
+            self._cell_windows[length] = tuple(tuple(indices) for indices in by_cell)
+        return self._cell_windows[length]
+
+
+    def win_shifts(self, connect):
+        """
+        Returns, for each direction, the shifts that reduce a bitboard to the start cells of its lines of `connect` discs.
+
+        Applying `runs &= runs >> shift` for each shift in turn doubles the length of the runs of discs found,
+        then extends them to exactly `connect` by overlapping two runs, so a line of any length costs only
+        a few shifts: `(s, 2s)` for four in a row, `(s, 2s, s)` for five.
+
+        Parameters:
+            connect (int): The number of discs in a row needed to win.
+
+        Returns:
+            tuple: One tuple of shifts per direction.
+        """
+        if connect not in self._win_shifts:
+            lengths = []
+            length = 1
+            while length * 2 <= connect:
+                lengths.append(length)
+                length *= 2
+            if length < connect:
+                lengths.append(connect - length)
+            self._win_shifts[connect] = tuple(tuple(step * n for n in lengths) for step in self.steps)
+        return self._win_shifts[connect]
+
+
+@lru_cache(maxsize=None)
+def get_geometry(rows, cols):
+    """
+    Returns the shared BoardGeometry of a board size, building its tables only once.
+
+    Parameters:
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+
+    Returns:
+        BoardGeometry: The geometry of the board size.
+    """
+    return BoardGeometry(rows, cols)
@@ -1,18 +1,35 @@
+import os
 import pygame
 import sys
 from game import ConnectFour
 from random_ai import RandomAiBot
 from minmax import MinMaxAiBot
 from alphabeta import AlphaBetaAiBot
+from solver import SolverAiBot, DEFAULT_BOOK_PATH
+from tablebase import DEFAULT_TABLEBASE_PATH
+from mcts import MctsAiBot
+from background import BackgroundSearch
+from rendering import BoardRenderer
+from records import GameRecord
+from search import WIN_SCORE
 from specs import *
 
 
+REPLAY_MOVE_DELAY_MS = 400
+ANALYSIS_DEPTH = 8
+ANALYSIS_TIME_MS = 3000
+MCTS_TIME_MS = 2000
+
 class ConnectFourGUI:
-    def __init__(self):
+    def __init__(self, min_move_time_ms=500, ponder=True):
         """
         Initializes the ConnectFourGUI instance.
 
         Initializes Pygame, sets up the game window, initializes game-related variables, and loads fonts.
+
+        Parameters:
+        - min_move_time_ms (float): The shortest time the AI takes to answer, so that its move can be followed. 0 to play at once.
+        - ponder (bool): Whether the AI searches its answers to the player's likely moves while the player thinks.
         """
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -21,7 +38,18 @@ class ConnectFourGUI:
 
         self.game = ConnectFour()
         self.ai_bot = MinMaxAiBot()
-        self.ai_playing = False
+        self.ai_playing = False  # Whether the AI is searching its move in the background
+        self.search = BackgroundSearch()
+        self.min_move_time_ms = min_move_time_ms
+        self.ponder = ponder
+        self.ponder_key = None  # The key of the position pondered last
+
+        # Analysis mode: the score of every column on the player's turn, toggled with the A key
+        self.analysis_enabled = False
+        self.analysis = BackgroundSearch()
+        self.analysis_bot = AlphaBetaAiBot(max_depth=ANALYSIS_DEPTH, time_limit_ms=ANALYSIS_TIME_MS)
+        self.analysis_key = None  # The key of the position the scores are for
+        self.column_scores = None
 
         # Load font
         self.font = pygame.font.Font(pygame.font.get_default_font(), FONT_SIZE)
@@ -29,16 +57,20 @@ class ConnectFourGUI:
         self.game_title = "Play Connect4 against AGI"
         self.game_title_font = pygame.font.Font(pygame.font.get_default_font(), FONT_SIZE + 10)
         self.game_title_position = (WIDTH // 2, HEIGHT // 4)
+        self.renderer = BoardRenderer(self.screen, self.font)
 
         # Main menu buttons
         self.play_first_button = pygame.Rect(WIDTH // 4, HEIGHT // 2, WIDTH // 2, FONT_SIZE * 2)
         self.play_second_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + FONT_SIZE * 3, WIDTH // 2, FONT_SIZE * 2)
         self.quit_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + FONT_SIZE * 6, WIDTH // 2, FONT_SIZE * 2)
         
-        # Choosing AI bot buttons
+        # Choosing AI bot buttons, closer together than the main menu's so that five fit below the title
+        bot_button_step = FONT_SIZE * 5 // 2
         self.random_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2, WIDTH // 2, FONT_SIZE * 2)
-        self.minmax_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + FONT_SIZE * 3, WIDTH // 2, FONT_SIZE * 2)
-        self.alphabeta_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + FONT_SIZE * 6, WIDTH // 2, FONT_SIZE * 2)
+        self.minmax_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + bot_button_step, WIDTH // 2, FONT_SIZE * 2)
+        self.mcts_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + bot_button_step * 2, WIDTH // 2, FONT_SIZE * 2)
+        self.alphabeta_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + bot_button_step * 3, WIDTH // 2, FONT_SIZE * 2)
+        self.solver_ai_button = pygame.Rect(WIDTH // 4, HEIGHT // 2 + bot_button_step * 4, WIDTH // 2, FONT_SIZE * 2)
 
 
         # Initialize player labels
@@ -54,7 +86,7 @@ class ConnectFourGUI:
         self.screen.fill(BACKGROUND_COLOR)
 
         # Draw game title
-        game_title_text = self.game_title_font.render(self.game_title, True, FONT_COLOR)
+        game_title_text = self.renderer.text(self.game_title, FONT_COLOR, font=self.game_title_font)
         game_title_rect = game_title_text.get_rect(center=self.game_title_position)
         self.screen.blit(game_title_text, game_title_rect)
 
@@ -62,15 +94,15 @@ class ConnectFourGUI:
         pygame.draw.rect(self.screen, FONT_COLOR, self.play_second_button)
         pygame.draw.rect(self.screen, FONT_COLOR, self.quit_button)
 
-        play_first_text = self.font.render("Play First", True, BACKGROUND_COLOR)
+        play_first_text = self.renderer.text("Play First", BACKGROUND_COLOR)
         play_first_rect = play_first_text.get_rect(center=self.play_first_button.center)
         self.screen.blit(play_first_text, play_first_rect)
 
-        play_second_text = self.font.render("Play Second", True, BACKGROUND_COLOR)
+        play_second_text = self.renderer.text("Play Second", BACKGROUND_COLOR)
         play_second_rect = play_second_text.get_rect(center=self.play_second_button.center)
         self.screen.blit(play_second_text, play_second_rect)
 
-        quit_text = self.font.render("Quit", True, BACKGROUND_COLOR)
+        quit_text = self.renderer.text("Quit", BACKGROUND_COLOR)
         quit_rect = quit_text.get_rect(center=self.quit_button.center)
         self.screen.blit(quit_text, quit_rect)
 
@@ -83,11 +115,13 @@ class ConnectFourGUI:
         Handles user input for selecting game options in the main menu.
         """
         menu_running = True
+        self.draw_main_menu()
         while menu_running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit_game()
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.draw_main_menu()  # The menu is only redrawn when the window needs it
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if self.play_first_button.collidepoint(event.pos):
                         self.player1_label = "PLAYER"
@@ -100,10 +134,8 @@ class ConnectFourGUI:
                         self.game.turn = 1  # AI plays first
                         menu_running = False  # Exit the main menu loop
                     elif self.quit_button.collidepoint(event.pos):  # Handle quit button click
-                        pygame.quit()
-                        sys.exit()
+                        self.quit_game()
 
-            self.draw_main_menu()
             self.clock.tick(30)
             
     def draw_ai_bot_dialog(self):
@@ -115,26 +147,38 @@ class ConnectFourGUI:
         self.screen.fill(BACKGROUND_COLOR)
 
         # Draw game title
-        game_title_text = self.game_title_font.render("Select Difficulty", True, FONT_COLOR)
+        game_title_text = self.renderer.text("Select Difficulty", FONT_COLOR, font=self.game_title_font)
         game_title_rect = game_title_text.get_rect(center=self.game_title_position)
         self.screen.blit(game_title_text, game_title_rect)
 
         pygame.draw.rect(self.screen, FONT_COLOR, self.random_ai_button)
         pygame.draw.rect(self.screen, FONT_COLOR, self.minmax_ai_button)
+        pygame.draw.rect(self.screen, FONT_COLOR, self.mcts_ai_button)
         pygame.draw.rect(self.screen, FONT_COLOR, self.alphabeta_ai_button)
+        pygame.draw.rect(self.screen, FONT_COLOR, self.solver_ai_button)
 
-        random_bot_text = self.font.render("Easy", True, BACKGROUND_COLOR)
-        random_bot_rect = random_bot_text.get_rect(center=self.play_first_button.center)
+        random_bot_text = self.renderer.text("Easy", BACKGROUND_COLOR)
+        random_bot_rect = random_bot_text.get_rect(center=self.random_ai_button.center)
         self.screen.blit(random_bot_text, random_bot_rect)
 
-        minmax_text = self.font.render("Normal", True, BACKGROUND_COLOR)
-        minmax_rect = minmax_text.get_rect(center=self.play_second_button.center)
+        minmax_text = self.renderer.text("Normal", BACKGROUND_COLOR)
+        minmax_rect = minmax_text.get_rect(center=self.minmax_ai_button.center)
         self.screen.blit(minmax_text, minmax_rect)
 
-        alphabeta_text = self.font.render("Hard", True, BACKGROUND_COLOR)
-        alphabeta_rect = alphabeta_text.get_rect(center=self.quit_button.center)
+        mcts_text = self.renderer.text("Monte Carlo", BACKGROUND_COLOR)
+        mcts_rect = mcts_text.get_rect(center=self.mcts_ai_button.center)
+        self.screen.blit(mcts_text, mcts_rect)
+
+        alphabeta_text = self.renderer.text("Hard", BACKGROUND_COLOR)
+        alphabeta_rect = alphabeta_text.get_rect(center=self.alphabeta_ai_button.center)
         self.screen.blit(alphabeta_text, alphabeta_rect)
 
+        # Without the opening book the first moves are the Hard bot's, see SolverAiBot
+        solver_label = "Perfect" if os.path.exists(DEFAULT_BOOK_PATH) else "Perfect (late game)"
+        solver_text = self.renderer.text(solver_label, BACKGROUND_COLOR)
+        solver_rect = solver_text.get_rect(center=self.solver_ai_button.center)
+        self.screen.blit(solver_text, solver_rect)
+
         pygame.display.flip()
     
     def choose_ai_opponent(self):
@@ -144,84 +188,58 @@ class ConnectFourGUI:
         Runs a loop until the user selects an AI bot.
         """
         choosing_opponent = True
+        self.draw_ai_bot_dialog()
         while choosing_opponent:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit_game()
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.draw_ai_bot_dialog()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if self.random_ai_button.collidepoint(event.pos):
                         self.ai_bot = RandomAiBot()
                         choosing_opponent = False
                     elif self.minmax_ai_button.collidepoint(event.pos):
-                        self.ai_bot = MinMaxAiBot()
+                        self.ai_bot = MinMaxAiBot(threats=True)
+                        choosing_opponent = False
+                    elif self.mcts_ai_button.collidepoint(event.pos):
+                        self.ai_bot = MctsAiBot(time_limit_ms=MCTS_TIME_MS)
                         choosing_opponent = False
                     elif self.alphabeta_ai_button.collidepoint(event.pos):
-                        self.ai_bot = AlphaBetaAiBot()
+                        # Endgames solved by `python tablebase.py build` are played perfectly
+                        tablebase = DEFAULT_TABLEBASE_PATH if os.path.exists(DEFAULT_TABLEBASE_PATH) else None
+                        self.ai_bot = AlphaBetaAiBot(max_depth=8, threats=True, tablebase=tablebase)
+                        choosing_opponent = False
+                    elif self.solver_ai_button.collidepoint(event.pos):
+                        # Early positions missing from the opening book fall back to the Hard bot after 3 seconds
+                        self.ai_bot = SolverAiBot(time_limit_ms=3000)
                         choosing_opponent = False
                         
-            self.draw_ai_bot_dialog()
             self.clock.tick(30)
-            pygame.display.flip()
 
     def draw_board(self):
         """
-        Draws the game board.
+        Draws the changes of the game board since the last frame.
 
         Displays the current game state, player names, and highlights the current player's turn.
-        """
-        self.screen.fill(BACKGROUND_COLOR)
+        While the AI is thinking, its search progress is shown under the player names.
 
-        # Draw player names and highlight current turn
-        player1_text = self.font.render(self.player1_label, True, FONT_COLOR)
-        player2_text = self.font.render(self.player2_label, True, FONT_COLOR)
-        player1_rect = player1_text.get_rect(center=(CELL_SIZE * COLS // 4, CELL_SIZE // 2))
-        player2_rect = player2_text.get_rect(center=(CELL_SIZE * 3 * COLS // 4, CELL_SIZE // 2))
-        
+        Returns:
+        - list: The rectangles of the screen that changed, for `pygame.display.update`.
+        """
+        # The AI always plays 'O', so the highlighted name depends on who went first
         if self.player1_label == "AI":
-            if self.game.turn == 1:
-                pygame.draw.rect(self.screen, (255, 255, 0), player1_rect.inflate(10, 5), 0)
-            else:
-                pygame.draw.rect(self.screen, BACKGROUND_COLOR, player1_rect.inflate(10, 5), 0)
-
-            if self.game.turn == 0:
-                pygame.draw.rect(self.screen, (255, 255, 0), player2_rect.inflate(10, 5), 0)
-            else:
-                pygame.draw.rect(self.screen, BACKGROUND_COLOR, player2_rect.inflate(10, 5), 0)
+            highlighted = 1 - self.game.turn
         else:
-            if self.game.turn == 0:
-                pygame.draw.rect(self.screen, (255, 255, 0), player1_rect.inflate(10, 5), 0)
-            else:
-                pygame.draw.rect(self.screen, BACKGROUND_COLOR, player1_rect.inflate(10, 5), 0)
-
-            if self.game.turn == 1:
-                pygame.draw.rect(self.screen, (255, 255, 0), player2_rect.inflate(10, 5), 0)
-            else:
-                pygame.draw.rect(self.screen, BACKGROUND_COLOR, player2_rect.inflate(10, 5), 0)
-            
+            highlighted = self.game.turn
+
+        status = self.thinking_text() if self.ai_playing else None
 
-        self.screen.blit(player1_text, player1_rect)
-        self.screen.blit(player2_text, player2_rect)
-
-        # Draw the board cells and discs
-        for row in range(ROWS):
-            for col in range(COLS):
-                pygame.draw.rect(self.screen, EMPTY_COLOR, (col * CELL_SIZE, (row + 2) * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-                pygame.draw.circle(self.screen, PLAYER1_COLOR if self.game.board[row][col] == 'X' else
-                                PLAYER2_COLOR if self.game.board[row][col] == 'O' else
-                                EMPTY_COLOR, (col * CELL_SIZE + CELL_SIZE // 2, (row + 2) * CELL_SIZE + CELL_SIZE // 2),
-                                CELL_SIZE // 2 - 5)
-
-        # Draw vertical lines to divide columns
-        for col in range(COLS + 1):
-            pygame.draw.line(self.screen, FONT_COLOR, (col * CELL_SIZE, CELL_SIZE * 2),
-                            (col * CELL_SIZE, HEIGHT + CELL_SIZE - CELL_SIZE), 2)
-
-        # Draw column numbers below player names
-        for col in range(COLS):
-            col_text = self.font.render(str(col + 1), True, FONT_COLOR)
-            col_rect = col_text.get_rect(center=(col * CELL_SIZE + CELL_SIZE // 2, CELL_SIZE * 1.5))
-            self.screen.blit(col_text, col_rect)
+        scores, best = None, None
+        if self.analysis_enabled and self.column_scores is not None and self.analysis_key == self.game.key:
+            scores = [self.score_text(score) for score in self.column_scores]
+            best = self.analysis_bot.last_search.move
+        return self.renderer.draw(self.game, (self.player1_label, self.player2_label), highlighted, status, scores, best)
 
     def draw_text(self, text, position, background_color=None):
         """
@@ -232,10 +250,7 @@ class ConnectFourGUI:
         - position (tuple): The (x, y) coordinates of the text.
         - background_color (tuple or None): The background color behind the text (optional).
         """
-        if background_color:
-            text_surface = self.font.render(text, True, FONT_COLOR, background_color)
-        else:
-            text_surface = self.font.render(text, True, FONT_COLOR)
+        text_surface = self.renderer.text(text, FONT_COLOR, background_color)
 
         text_rect = text_surface.get_rect(center=position)
         self.screen.blit(text_surface, text_rect)
@@ -267,24 +282,28 @@ class ConnectFourGUI:
                                            WIDTH // 2 + 2, 
                                            FONT_SIZE * 2)
 
-            while not self.ai_playing:
+            self.renderer.invalidate()
+            while True:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        pygame.quit()
-                        sys.exit()
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        self.quit_game()
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_a:
+                        self.toggle_analysis()
+                    elif event.type == pygame.MOUSEBUTTONDOWN and self.game.turn == 0 and not self.game.is_terminal:
                         if event.pos[1] > CELL_SIZE * 2:
                             column = event.pos[0] // CELL_SIZE
                             if self.game.is_valid_move(column):
+                                self.analysis.cancel()
+                                self.search.cancel()  # Stop pondering, keeping the answers found
                                 self.drop_disc_animation(column)
                                 self.game.drop_disc(column, 'X' if self.game.turn == 0 else 'O')
 
-                self.draw_board()
-
-                pygame.display.flip()
+                self.update_analysis()
+                self.update_pondering()
+                pygame.display.update(self.draw_board())
                 self.clock.tick(30)
                 
-                if (self.game.is_winner('X') or self.game.is_winner('O') or self.game.is_board_full()):
+                if self.game.is_terminal:
                     if self.game.is_board_full():
                         winner = "You matched AI level."
                     
@@ -305,7 +324,7 @@ class ConnectFourGUI:
                     pygame.draw.rect(self.screen, FONT_COLOR, main_menu_button)
                     
 
-                    self.draw_text(winner, (WIDTH // 2, 40), BACKGROUND_COLOR)
+                    self.draw_text(f"{winner} (R: replay)", (WIDTH // 2, 40), BACKGROUND_COLOR)
 
                     play_again_button.inflate_ip(-margin, -margin)
                     quit_button.inflate_ip(-margin, -margin)
@@ -316,19 +335,20 @@ class ConnectFourGUI:
                     pygame.draw.rect(self.screen, BACKGROUND_COLOR, main_menu_button)
 
                     # Draw text on buttons
-                    play_again_text = self.font.render("Play Again", True, FONT_COLOR)
+                    play_again_text = self.renderer.text("Play Again", FONT_COLOR)
                     play_again_rect = play_again_text.get_rect(center=play_again_button.center)
                     self.screen.blit(play_again_text, play_again_rect)
 
-                    quit_text = self.font.render("Quit", True, FONT_COLOR)
+                    quit_text = self.renderer.text("Quit", FONT_COLOR)
                     quit_rect = quit_text.get_rect(center=quit_button.center)
                     self.screen.blit(quit_text, quit_rect)
 
-                    main_menu_text = self.font.render("Main Menu", True, FONT_COLOR)
+                    main_menu_text = self.renderer.text("Main Menu", FONT_COLOR)
                     main_menu_rect = main_menu_text.get_rect(center=main_menu_button.center)
                     self.screen.blit(main_menu_text, main_menu_rect)
                     
                     pygame.display.flip()
+                    self.renderer.invalidate()  # The overlay covers the player names
                     
                     play_again_button.inflate_ip(margin, margin)
                     quit_button.inflate_ip(margin, margin)
@@ -338,8 +358,10 @@ class ConnectFourGUI:
                     while waiting_for_input:
                         for event in pygame.event.get():
                             if event.type == pygame.QUIT:
-                                pygame.quit()
-                                sys.exit()
+                                self.quit_game()
+                            elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                                self.replay_game()
+                                waiting_for_input = False  # The game is over again, so the overlay comes back
                             elif event.type == pygame.MOUSEBUTTONDOWN:
                                 if play_again_button.collidepoint(event.pos):
                                     if self.player1_label == "AI":
@@ -347,52 +369,165 @@ class ConnectFourGUI:
                                     else:
                                         last_game_first = 0
                                         
+                                    self.cancel_ai_move()
                                     self.game = ConnectFour()
                                     self.game.turn = last_game_first
                                     waiting_for_input = False
                                     
                                 elif quit_button.collidepoint(event.pos):
-                                    pygame.quit()
-                                    sys.exit()
+                                    self.quit_game()
                                 
                                 elif main_menu_button.collidepoint(event.pos):
+                                    self.cancel_ai_move()
                                     self.run_game()
                                     waiting_for_input = False
                                     
-                if self.game.turn == 1 and not self.ai_playing:
-                    self.ai_playing = True
-                    pygame.time.delay(1000)
-
-                    # AI's turn
-                    column = self.ai_bot.choose_move(self.game)
-                    if column is not None:
-                        self.drop_disc_animation(column)
-                        self.game.drop_disc(column, 'O')
-
-                    self.ai_playing = False
+                # AI's turn, searched on a worker thread while this loop keeps drawing frames
+                if self.game.turn == 1 and not self.game.is_terminal:
+                    if not self.search.running:
+                        self.ai_playing = True
+                        self.search.start(self.ai_bot, self.game)
+                    elif self.search.done() and self.search.elapsed_ms() >= self.min_move_time_ms:
+                        column = self.search.result()
+                        self.ai_playing = False
+                        if column is not None:
+                            self.drop_disc_animation(column)
+                            self.game.drop_disc(column, 'O')
                 
                 
 
+    def replay_game(self):
+        """
+        Replays the finished game move by move from the empty board, ending on the same position.
+        """
+        record = GameRecord.from_game(self.game)
+        self.game = ConnectFour(record.rows, record.cols, record.connect)
+        self.game.turn = record.first
+        self.renderer.invalidate()
+        pygame.display.update(self.draw_board())
+
+        for column in record.moves:
+            pygame.time.delay(REPLAY_MOVE_DELAY_MS)
+            self.drop_disc_animation(column)
+            self.game.play(column)
+            pygame.display.update(self.draw_board())
+
+    def toggle_analysis(self):
+        """
+        Switches analysis mode on or off. When on, the score of every column is shown on the player's turn.
+        """
+        self.analysis_enabled = not self.analysis_enabled
+        if not self.analysis_enabled:
+            self.analysis.cancel()
+            self.analysis_key = None
+            self.column_scores = None
+
+    def update_analysis(self):
+        """
+        Starts analyzing the position on the player's turn when it has changed, and collects the scores once ready.
+
+        The analysis runs on its own worker thread and bot, and only while the AI is not searching.
+        """
+        if not self.analysis_enabled or self.game.turn != 0 or self.game.is_terminal:
+            return
+        if self.analysis.running:
+            if self.analysis.done():
+                self.column_scores = self.analysis.result()
+        elif self.analysis_key != self.game.key:
+            self.column_scores = None
+            self.analysis_key = self.game.key
+            self.analysis.start(self.analysis_bot, self.game, analyze=True)
+
+    def update_pondering(self):
+        """
+        Starts pondering on the player's turn, once per position: the AI searches its answer to each
+        of the player's likely moves in the background, with the same bot and transposition table.
+        The Monte Carlo bot grows its search tree of the position instead, see `MctsAiBot.ponder`.
+
+        An answer found before the player moves is played as soon as `min_move_time_ms` has passed,
+        see `BackgroundSearch.ponder`. Bots that cannot be stopped, such as the Easy one, do not ponder.
+        """
+        if not self.ponder or self.game.turn != 0 or self.game.is_terminal or self.search.running:
+            return
+        if self.ponder_key != self.game.key and hasattr(self.ai_bot, 'stop_event'):
+            self.ponder_key = self.game.key
+            self.search.ponder(self.ai_bot, self.game)
+
+    def score_text(self, score):
+        """
+        Writes the score of a column from the player's point of view, the player being 'X'.
+
+        Parameters:
+        - score (int or None): The score of the column, positive when good for 'O'.
+
+        Returns:
+        - str or None: "Win", "Loss" or the signed score, None for a full column.
+        """
+        if score is None:
+            return None
+        if score <= -WIN_SCORE:
+            return "Win"
+        if score >= WIN_SCORE:
+            return "Loss"
+        return f"{-score:+d}"
+
+    def thinking_text(self):
+        """
+        Describes the AI's search progress, shown between the player names and the column numbers.
+
+        Returns:
+        - str: The depth and nodes searched so far, or the playouts and their speed for the Monte Carlo bot.
+        """
+        depth, nodes = self.search.progress()
+        text = "AI thinking..."
+        if isinstance(self.search.bot, MctsAiBot):
+            elapsed_ms = self.search.elapsed_ms()
+            rate = nodes / elapsed_ms * 1000 if elapsed_ms > 0 else 0
+            return text + f" {nodes:,} playouts, {rate:,.0f}/sec"
+        if depth:
+            text += f" depth {depth}"
+        if nodes is not None:
+            text += f", {nodes:,} nodes" if depth else f" {nodes:,} nodes"
+        return text
+
+    def cancel_ai_move(self):
+        """
+        Stops the AI's background search and the analysis, if any, and forgets their results.
+        """
+        self.search.cancel()
+        self.ai_playing = False
+        self.ponder_key = None
+        self.analysis.cancel()
+        self.analysis_key = None
+        self.column_scores = None
+
+    def quit_game(self):
+        """
+        Stops the AI's background search and closes the game.
+        """
+        self.search.shutdown()
+        self.analysis.shutdown()
+        pygame.quit()
+        sys.exit()
+
     def drop_disc_animation(self, col):
         """
         Animates the dropping of a disc into a column.
 
+        Only the cell the disc leaves and the cell it enters are redrawn at each step.
+
         Parameters:
         - col (int): The column where the disc is dropped.
         """
+        player = 'X' if self.game.turn == 0 else 'O'
         row = 0
         while row < ROWS:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            self.screen.fill(BACKGROUND_COLOR)
-            self.draw_board()
-            pygame.draw.circle(self.screen, PLAYER1_COLOR if self.game.turn == 0 else PLAYER2_COLOR,
-                               (col * CELL_SIZE + CELL_SIZE // 2, (row + 2) * CELL_SIZE + CELL_SIZE // 2),
-                               CELL_SIZE // 2 - 5)
-            pygame.display.flip()
+                    self.quit_game()
+
+            dirty = self.draw_board()
+            dirty += self.renderer.draw_falling_disc(col, row, player)
+            pygame.display.update(dirty)
             pygame.time.delay(50)
             row += 1
-            
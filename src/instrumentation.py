@@ -0,0 +1,293 @@
+import argparse
+import cProfile
+import logging
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+
+
+logger = logging.getLogger(__name__)
+
+
+class SearchStats:
+    """
+    Counters and timings of one choose_move call, collected when a bot is created with `collect_stats=True`.
+
+    The timings come from wrapping each call, which slows the search down, so they are only
+    meaningful relative to each other. Win checks are the line checks done by every dropped disc,
+    so make/unmake time excludes them.
+
+    Attributes:
+        nodes_per_ply (list): The number of nodes searched at each ply from the root, over all iterations.
+        interior_nodes (int): Nodes whose children were searched.
+        children (int): Children searched from interior nodes.
+        cutoffs (int): Nodes where a child's score ended the search of the remaining moves.
+        first_move_cutoffs (int): Cutoffs caused by the first move searched.
+        leaf_evaluations (int): Calls to the bot's evaluate method.
+        win_checks (int): Line checks after a dropped disc.
+        tt_probes (int): Transposition table lookups, 0 without a table.
+        tt_hits (int): Lookups that found the position.
+        total_ms (float): Wall-clock time of the call.
+        evaluate_ms (float): Time spent in evaluate.
+        make_unmake_ms (float): Time spent playing and taking back moves, win checks excluded.
+        win_check_ms (float): Time spent in win checks.
+
+    Methods:
+        branching_factor(): Returns the average number of children searched per interior node.
+        effective_branching_factor(depth): Returns the branching factor of a uniform tree of the same size.
+        as_dict(): Returns the statistics as a dictionary.
+        log(level): Writes a summary of the statistics to this module's logger.
+    """
+
+    def __init__(self):
+        """
+        Initialize the SearchStats with every counter at zero.
+        """
+        self.nodes_per_ply = []
+        self.interior_nodes = 0
+        self.children = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.leaf_evaluations = 0
+        self.win_checks = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.total_ms = 0.0
+        self.evaluate_ms = 0.0
+        self.make_unmake_ms = 0.0
+        self.win_check_ms = 0.0
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_per_ply)
+
+    def branching_factor(self):
+        """
+        Returns the average number of children searched per interior node.
+
+        Returns:
+            float: The average, 0 if no node had children.
+        """
+        return self.children / self.interior_nodes if self.interior_nodes else 0.0
+
+    def effective_branching_factor(self, depth):
+        """
+        Returns the branching factor b of a uniform tree of `depth` plies with as many nodes, nodes = b ** depth.
+
+        Parameters:
+            depth (int): The search depth.
+
+        Returns:
+            float: The effective branching factor.
+        """
+        return self.nodes ** (1 / depth) if depth > 0 else 0.0
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dictionary.
+
+        Returns:
+            dict: The counters, the timings in milliseconds and the derived ratios.
+        """
+        search_ms = self.total_ms - self.evaluate_ms - self.make_unmake_ms - self.win_check_ms
+        return {
+            'nodes': self.nodes,
+            'nodes_per_ply': list(self.nodes_per_ply),
+            'branching_factor': round(self.branching_factor(), 3),
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': round(self.first_move_cutoffs / self.cutoffs, 4) if self.cutoffs else None,
+            'leaf_evaluations': self.leaf_evaluations,
+            'win_checks': self.win_checks,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'total_ms': round(self.total_ms, 3),
+            'evaluate_ms': round(self.evaluate_ms, 3),
+            'make_unmake_ms': round(self.make_unmake_ms, 3),
+            'win_check_ms': round(self.win_check_ms, 3),
+            'search_ms': round(search_ms, 3),
+        }
+
+    def log(self, level=logging.DEBUG):
+        """
+        Writes a summary of the statistics to this module's logger.
+
+        Parameters:
+            level (int): The logging level.
+        """
+        if logger.isEnabledFor(level):
+            logger.log(level, "search stats %s", self.as_dict())
+
+    def __repr__(self):
+        return (f"SearchStats(nodes={self.nodes}, cutoffs={self.cutoffs}, "
+                f"first_move_cutoffs={self.first_move_cutoffs}, total_ms={self.total_ms:.1f})")
+
+
+def trace_search(bot, game, search_name):
+    """
+    Instruments one search of a bot on a game, if the bot asks for it.
+
+    Bots without `collect_stats` or `on_node` get a context that does nothing, so the search runs
+    exactly as it does without instrumentation.
+
+    Parameters:
+        bot (MinMaxAiBot or AlphaBetaAiBot): The searching bot.
+        game (ConnectFour): The state the search plays its moves on.
+        search_name (str): The name of the bot's recursive search method.
+
+    Returns:
+        context manager: Collects the statistics into `bot.stats` on exit.
+    """
+    if not bot.collect_stats and bot.on_node is None:
+        return nullcontext()
+    return _traced(bot, game, search_name)
+
+
+@contextmanager
+def _traced(bot, game, search_name):
+    """
+    Shadows the search, evaluate and move methods with counting wrappers on the bot and game
+    instances only, so the recursion goes through them, and removes the wrappers on exit.
+    """
+    stats = SearchStats()
+    on_node = bot.on_node
+    root_count = game.move_count
+    child_counts = []  # Children searched so far by each node on the current line
+    table = getattr(bot, 'transposition_table', None)
+    table_counts = (table.hits, table.misses) if table is not None else (0, 0)
+
+    search = getattr(bot, search_name)
+    evaluate = bot.evaluate
+    play, undo, update_winner = game.play, game.undo, game._update_winner
+    clock = time.perf_counter
+
+    def traced_search(game, depth, *args):
+        ply = game.move_count - root_count
+        if ply == len(stats.nodes_per_ply):
+            stats.nodes_per_ply.append(0)
+        stats.nodes_per_ply[ply] += 1
+        if child_counts:
+            child_counts[-1] += 1
+
+        child_counts.append(0)
+        try:
+            score, move = search(game, depth, *args)
+        finally:
+            children = child_counts.pop()
+
+        if children:
+            stats.interior_nodes += 1
+            stats.children += children
+            if len(args) == 3:
+                # Alpha-beta: a score outside the window means the remaining moves were cut off
+                alpha, beta, maximizing_player = args
+                if (score >= beta) if maximizing_player else (score <= alpha):
+                    stats.cutoffs += 1
+                    if children == 1:
+                        stats.first_move_cutoffs += 1
+        if on_node is not None:
+            on_node(game, ply, depth, score, move)
+        return score, move
+
+    def traced_evaluate(game):
+        start = clock()
+        score = evaluate(game)
+        stats.evaluate_ms += (clock() - start) * 1000
+        stats.leaf_evaluations += 1
+        return score
+
+    def traced_play(col):
+        start = clock()
+        play(col)
+        stats.make_unmake_ms += (clock() - start) * 1000
+
+    def traced_undo(col):
+        start = clock()
+        undo(col)
+        stats.make_unmake_ms += (clock() - start) * 1000
+
+    def traced_update_winner(index):
+        start = clock()
+        update_winner(index)
+        elapsed_ms = (clock() - start) * 1000
+        stats.win_check_ms += elapsed_ms
+        stats.make_unmake_ms -= elapsed_ms  # Counted again by the enclosing play
+        stats.win_checks += 1
+
+    setattr(bot, search_name, traced_search)
+    bot.evaluate = traced_evaluate
+    game.play, game.undo, game._update_winner = traced_play, traced_undo, traced_update_winner
+    start = clock()
+    try:
+        yield stats
+    finally:
+        stats.total_ms = (clock() - start) * 1000
+        for name in (search_name, 'evaluate'):
+            delattr(bot, name)
+        for name in ('play', 'undo', '_update_winner'):
+            delattr(game, name)
+
+        if table is not None:
+            hits, misses = table.hits - table_counts[0], table.misses - table_counts[1]
+            stats.tt_hits, stats.tt_probes = hits, hits + misses
+        if bot.collect_stats:
+            bot.stats = stats
+            stats.log()
+
+
+def profile_move(bot, game, path=None):
+    """
+    Runs one choose_move call under cProfile.
+
+    Parameters:
+        bot (object): The bot to profile.
+        game (ConnectFour): The position to search.
+        path (str): If given, the file the profile is saved to, for `pstats` or other profile viewers.
+
+    Returns:
+        pstats.Stats: The profile of the call.
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(bot.choose_move, game)
+    if path is not None:
+        profiler.dump_stats(path)
+    return pstats.Stats(profiler)
+
+
+def main(argv=None):
+    from game import ConnectFour
+    from minmax import MinMaxAiBot
+    from alphabeta import AlphaBetaAiBot
+    from records import from_digits
+
+    bots = {'minimax': MinMaxAiBot, 'alphabeta': AlphaBetaAiBot}
+
+    parser = argparse.ArgumentParser(description="Show the search statistics or the profile of one move.")
+    parser.add_argument('moves', nargs='?', default='', help="The position as 1-based column digits, e.g. 4453.")
+    parser.add_argument('--bot', choices=list(bots), default='alphabeta')
+    parser.add_argument('--depth', type=int, default=7)
+    parser.add_argument('--profile', nargs='?', const='', metavar='PATH',
+                        help="Profile the move with cProfile instead, saving the profile to PATH if given.")
+    parser.add_argument('--limit', type=int, default=20, help="Functions listed from the profile.")
+    args = parser.parse_args(argv)
+
+    try:
+        game = ConnectFour.from_moves(from_digits(args.moves))
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.profile is not None:
+        profile = profile_move(bots[args.bot](max_depth=args.depth), game, args.profile or None)
+        profile.sort_stats('cumulative').print_stats(args.limit)
+        return
+
+    bot = bots[args.bot](max_depth=args.depth, collect_stats=True)
+    bot.choose_move(game)
+    print(bot.last_search)
+    for name, value in bot.stats.as_dict().items():
+        print(f"{name:>22}: {value}")
+    print(f"{'effective_branching':>22}: {bot.stats.effective_branching_factor(args.depth):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+import math
+import random
+from array import array
+
+from geometry import get_geometry
+from evaluation import popcount
+from search import SearchBudget, SearchInfo, SearchTimeout
+
+
+DEFAULT_TIME_LIMIT_MS = 1000
+DEFAULT_POOL_SIZE = 1 << 19  # Nodes kept in the tree, 23 bytes each
+EXPLORATION = math.sqrt(2)  # UCT exploration constant, the usual value for rewards between 0 and 1
+PLAYOUT_CHECK_INTERVAL = 16  # Playouts between two budget checks
+
+UNDECIDED, WIN, DRAW = 0, 1, 2  # Outcome of the move leading to a node
+
+
+class MctsAiBot:
+    """
+    AI bot using Monte Carlo Tree Search with the UCT selection rule for the Connect Four game.
+
+    Every playout walks down the tree by UCT, adds the children of the node it reaches and finishes the
+    game with random moves, like RandomAiBot, on two integers: the discs of the player to move and the mask
+    of all discs. The most visited column is played. A node whose player can win at once only gets the
+    winning move as its child.
+
+    The nodes are stored in typed arrays rather than one Python object each, indexed by node number,
+    with the children of a node numbered consecutively. The pool never grows past `pool_size` nodes:
+    once it is full, playouts start from the leaves reached without adding new nodes. The tree is kept
+    between moves; when the next position is found among the root's children or grandchildren, that
+    subtree is copied to the front of new arrays and becomes the new root.
+
+    Parameters:
+        time_limit_ms (float): Time budget per move, None for no time limit.
+        playout_limit (int): Playout budget per move, None for no playout limit.
+        exploration (float): The UCT exploration constant.
+        pool_size (int): The most nodes kept in the tree.
+
+    Attributes:
+        time_limit_ms (float or None): Time budget per move.
+        playout_limit (int or None): Playout budget per move.
+        exploration (float): The UCT exploration constant.
+        pool_size (int): The most nodes kept in the tree.
+        nodes (int): The number of playouts of the current or last search.
+        node_count (int): The number of nodes in the tree.
+        last_search (SearchInfo or None): Move, playouts and time of the last choose_move call; its
+            depth is the deepest node reached and its score is None.
+        stop_event (threading.Event or None): Set from another thread to stop the current search early.
+        current_depth (int): The deepest node reached by the search in progress, for progress reports.
+
+    Methods:
+        choose_move(game): Chooses the most visited column after searching within the budget.
+        ponder(game): Grows the tree of a position with the opponent to move until stopped.
+        playouts_per_sec(): Returns the speed of the last search.
+        reset(): Empties the tree.
+    """
+
+    def __init__(self, time_limit_ms=DEFAULT_TIME_LIMIT_MS, playout_limit=None, exploration=EXPLORATION,
+                 pool_size=DEFAULT_POOL_SIZE):
+        """
+        Initialize the MctsAiBot.
+
+        Parameters:
+            time_limit_ms (float): Time budget per move, None for no time limit.
+            playout_limit (int): Playout budget per move, None for no playout limit.
+            exploration (float): The UCT exploration constant.
+            pool_size (int): The most nodes kept in the tree.
+
+        Raises:
+            ValueError: If there is neither a time nor a playout limit, or the pool cannot hold a root and its children.
+        """
+        if time_limit_ms is None and playout_limit is None:
+            raise ValueError("MctsAiBot needs a time limit or a playout limit.")
+        if pool_size < 2:
+            raise ValueError(f"A pool of {pool_size} nodes is too small.")
+
+        self.time_limit_ms = time_limit_ms
+        self.playout_limit = playout_limit
+        self.exploration = exploration
+        self.pool_size = pool_size
+        self.nodes = 0
+        self.last_search = None
+        self.stop_event = None
+        self.current_depth = 0
+        self.size = None
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the tree.
+        """
+        self._allocate()
+        self.node_count = 0
+        self.root_position = None
+        self.root_mask = None
+
+    def _allocate(self):
+        """
+        Creates empty node arrays of `pool_size` entries.
+        """
+        size = self.pool_size
+        self.parents = array('i', [-1]) * size
+        self.columns = array('b', [0]) * size  # The column played to reach the node
+        self.first_child = array('i', [-1]) * size  # -1 until the node is expanded
+        self.child_counts = array('b', [0]) * size
+        self.visits = array('i', [0]) * size
+        self.rewards = array('d', [0.0]) * size  # Summed for the player who played the move leading to the node
+        self.outcomes = array('b', [UNDECIDED]) * size
+
+    def _set_board(self, game):
+        """
+        Precomputes the bit masks of the game's board size, emptying the tree if it changed.
+        """
+        size = (game.rows, game.cols, game.connect)
+        if size == self.size:
+            return
+        geometry = get_geometry(game.rows, game.cols)
+        self.size = size
+        self.rows, self.cols = game.rows, game.cols
+        self.col_height = geometry.col_height
+        self.board_mask = geometry.board_mask
+        self.bottom_mask = sum(1 << geometry.cell(col, 0) for col in range(game.cols))
+        self.column_masks = [((1 << game.rows) - 1) << geometry.cell(col, 0) for col in range(game.cols)]
+        self.column_order = sorted(range(game.cols), key=lambda col: abs(col - (game.cols - 1) / 2))
+        self.win_shifts = geometry.win_shifts(game.connect)
+        self.pair_shifts = game.connect in (3, 4)
+        self.reset()
+
+    def is_win(self, bits):
+        """
+        Whether a player's discs connect, see `ConnectFour._update_winner`.
+
+        Parameters:
+            bits (int): Bitboard of the player's discs.
+
+        Returns:
+            bool: True if the discs hold a line of `connect`.
+        """
+        if self.pair_shifts:
+            # Unrolled version of the loop below for two doublings
+            for pair_shift, run_shift in self.win_shifts:
+                pairs = bits & (bits >> pair_shift)
+                if pairs & (pairs >> run_shift):
+                    return True
+            return False
+        for shifts in self.win_shifts:
+            runs = bits
+            for shift in shifts:
+                runs &= runs >> shift
+            if runs:
+                return True
+        return False
+
+    def choose_move(self, game):
+        """
+        Chooses a move by running playouts from the current position until the budget runs out.
+
+        Parameters:
+            game (ConnectFour): The current state of the Connect Four game, left unchanged.
+
+        Returns:
+            int or None: The most visited column, or None if the game is over or the search was stopped.
+        """
+        budget = SearchBudget(self.time_limit_ms, stop_event=self.stop_event)
+        self.nodes = 0
+        self.current_depth = 0
+
+        if game.is_terminal:
+            self.last_search = SearchInfo(None, None, 0, 0, budget.elapsed_ms())
+            return None
+
+        self._set_board(game)
+        self._set_root(game.bitboards[game.turn], game.mask)
+
+        try:
+            while self.playout_limit is None or self.nodes < self.playout_limit:
+                if self.nodes % PLAYOUT_CHECK_INTERVAL == 0:
+                    budget.check(self.nodes)
+                self._playout_from_root()
+                self.nodes += 1
+        except SearchTimeout:
+            pass
+
+        move = None if budget.stopped else self._best_column()
+        self.last_search = SearchInfo(move, None, self.current_depth, self.nodes, budget.elapsed_ms())
+        return move
+
+    def ponder(self, game):
+        """
+        Runs playouts from a position with the opponent to move, growing the tree while they think.
+
+        The tree is kept, so the opponent's reply is usually found among the root's children by the next
+        `choose_move`, whose playouts then start from all those the pondering gave that reply.
+        The search runs until `stop_event` is set, or for `time_limit_ms` without one; `last_search` is left as it was.
+
+        Parameters:
+            game (ConnectFour): The position, with the opponent of the bot to move, left unchanged.
+        """
+        budget = SearchBudget(None if self.stop_event is not None else self.time_limit_ms, stop_event=self.stop_event)
+        self.nodes = 0
+        self.current_depth = 0
+        if game.is_terminal:
+            return
+
+        self._set_board(game)
+        self._set_root(game.bitboards[game.turn], game.mask)
+        try:
+            while True:
+                if self.nodes % PLAYOUT_CHECK_INTERVAL == 0:
+                    budget.check(self.nodes)
+                self._playout_from_root()
+                self.nodes += 1
+        except SearchTimeout:
+            pass
+
+    def playouts_per_sec(self):
+        """
+        Returns the speed of the last search.
+
+        Returns:
+            float or None: The playouts per second of the last choose_move call, None before the first one.
+        """
+        if self.last_search is None or self.last_search.elapsed_ms <= 0:
+            return None
+        return self.last_search.nodes / self.last_search.elapsed_ms * 1000
+
+    def _best_column(self):
+        """
+        Returns the most visited column of the root, the most central one among equals.
+        """
+        first = self.first_child[0]
+        best, best_visits = None, -1
+        for child in range(first, first + self.child_counts[0]):
+            if self.visits[child] > best_visits:
+                best, best_visits = self.columns[child], self.visits[child]
+        return best
+
+    def _set_root(self, position, mask):
+        """
+        Makes a position the root of the tree, keeping its subtree if the tree already holds it
+        within two moves of the old root, and expands the root if needed.
+
+        Parameters:
+            position (int): Bitboard of the discs of the player to move.
+            mask (int): Bitboard of all discs.
+        """
+        root = self._find_node(position, mask) if self.node_count else None
+        if root is None:
+            self.node_count = 1
+            self.parents[0] = -1
+            self.first_child[0] = -1
+            self.visits[0] = 0
+            self.rewards[0] = 0.0
+            self.outcomes[0] = UNDECIDED
+        elif root != 0:
+            self._reroot(root)
+        self.root_position, self.root_mask = position, mask
+        if self.first_child[0] < 0:
+            self._expand(0, position, mask)
+
+    def _find_node(self, position, mask):
+        """
+        Returns the node of a position among the root, its children and its grandchildren, or None.
+        """
+        if (position, mask) == (self.root_position, self.root_mask):
+            return 0
+        frontier = [(0, self.root_position, self.root_mask)]
+        for _ in range(2):
+            children = []
+            for node, node_position, node_mask in frontier:
+                first = self.first_child[node]
+                if first < 0:
+                    continue
+                opponent = node_position ^ node_mask
+                for child in range(first, first + self.child_counts[node]):
+                    child_mask = node_mask | ((node_mask + self.bottom_mask) & self.column_masks[self.columns[child]])
+                    if (opponent, child_mask) == (position, mask):
+                        return child
+                    children.append((child, opponent, child_mask))
+            frontier = children
+        return None
+
+    def _reroot(self, root):
+        """
+        Copies the subtree of a node to the front of new arrays, breadth first, so that it becomes the
+        root and the rest of the old tree is freed. Children stay numbered consecutively.
+        """
+        old = (self.parents, self.columns, self.first_child, self.child_counts, self.visits, self.rewards,
+               self.outcomes)
+        old_columns, old_first_child, old_child_counts, old_visits, old_rewards, old_outcomes = old[1:]
+        self._allocate()
+
+        queue = [(root, 0, -1)]  # (old node, new node, new parent)
+        count = 1
+        for old_node, node, parent in queue:
+            self.parents[node] = parent
+            self.columns[node] = old_columns[old_node]
+            self.visits[node] = old_visits[old_node]
+            self.rewards[node] = old_rewards[old_node]
+            self.outcomes[node] = old_outcomes[old_node]
+            first = old_first_child[old_node]
+            if first >= 0:
+                children = old_child_counts[old_node]
+                self.first_child[node] = count
+                self.child_counts[node] = children
+                queue.extend((first + i, count + i, node) for i in range(children))
+                count += children
+        self.node_count = count
+
+    def _expand(self, node, position, mask):
+        """
+        Adds the children of a node, one per legal column in center-first order, or only the
+        winning one if the player to move can win at once. Nothing is added if the pool is full.
+
+        Returns:
+            bool: Whether the children were added.
+        """
+        possible = (mask + self.bottom_mask) & self.board_mask
+        moves = []
+        for col in self.column_order:
+            move = possible & self.column_masks[col]
+            if not move:
+                continue
+            if self.is_win(position | move):
+                moves = [(col, WIN)]
+                break
+            moves.append((col, DRAW if (mask | move) == self.board_mask else UNDECIDED))
+
+        first = self.node_count
+        if first + len(moves) > self.pool_size:
+            return False
+        for child, (col, outcome) in enumerate(moves, first):
+            self.parents[child] = node
+            self.columns[child] = col
+            self.first_child[child] = -1
+            self.child_counts[child] = 0
+            self.visits[child] = 0
+            self.rewards[child] = 0.0
+            self.outcomes[child] = outcome
+        self.first_child[node] = first
+        self.child_counts[node] = len(moves)
+        self.node_count = first + len(moves)
+        return True
+
+    def _select_child(self, node):
+        """
+        Returns the child of a node with the highest UCT value, its first unvisited child if any.
+        """
+        visits, rewards = self.visits, self.rewards
+        first = self.first_child[node]
+        scale = self.exploration * math.sqrt(math.log(visits[node] or 1))
+        best, best_value = first, -1.0
+        for child in range(first, first + self.child_counts[node]):
+            child_visits = visits[child]
+            if child_visits == 0:
+                return child
+            value = rewards[child] / child_visits + scale / math.sqrt(child_visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _playout_from_root(self):
+        """
+        Runs one playout: selects a leaf by UCT, expands it, plays randomly to the end and
+        adds the result to every node on the way back to the root.
+        """
+        node, position, mask = 0, self.root_position, self.root_mask
+        depth = 0
+        while self.first_child[node] >= 0:
+            node = self._select_child(node)
+            move = (mask + self.bottom_mask) & self.column_masks[self.columns[node]]
+            position, mask = position ^ mask, mask | move
+            depth += 1
+            if self.outcomes[node] != UNDECIDED:
+                break
+
+        outcome = self.outcomes[node]
+        if outcome == WIN:
+            reward = 1.0
+        elif outcome == DRAW:
+            reward = 0.5
+        else:
+            if self.visits[node] > 0 and self._expand(node, position, mask):
+                node = self._select_child(node)
+                move = (mask + self.bottom_mask) & self.column_masks[self.columns[node]]
+                depth += 1
+                if self.outcomes[node] == WIN:
+                    reward = 1.0
+                elif self.outcomes[node] == DRAW:
+                    reward = 0.5
+                else:
+                    reward = 1.0 - self.playout(position ^ mask, mask | move)
+            else:
+                reward = 1.0 - self.playout(position, mask)
+
+        if depth > self.current_depth:
+            self.current_depth = depth
+
+        # The reward is for the player who moved into the node, alternating on the way up
+        parents, visits, rewards = self.parents, self.visits, self.rewards
+        while node >= 0:
+            visits[node] += 1
+            rewards[node] += reward
+            reward = 1.0 - reward
+            node = parents[node]
+
+    def playout(self, position, mask):
+        """
+        Finishes a game with random moves.
+
+        Parameters:
+            position (int): Bitboard of the discs of the player to move.
+            mask (int): Bitboard of all discs.
+
+        Returns:
+            float: 1 if the player to move wins, 0 if they lose, 0.5 for a draw.
+        """
+        rows, col_height = self.rows, self.col_height
+        heights = [popcount(mask & column_mask) for column_mask in self.column_masks]
+        open_columns = [col for col in range(self.cols) if heights[col] < rows]
+        discs = [position, position ^ mask]
+        is_win = self.is_win
+        rand = random.random
+        side = 0
+        while open_columns:
+            col = open_columns[int(rand() * len(open_columns))]
+            height = heights[col]
+            bits = discs[side] | (1 << (col * col_height + height))
+            discs[side] = bits
+            height += 1
+            heights[col] = height
+            if height == rows:
+                open_columns.remove(col)
+            if is_win(bits):
+                return 1.0 if side == 0 else 0.0
+            side ^= 1
+        return 0.5
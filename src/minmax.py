@@ -1,5 +1,6 @@
-from specs import ROWS, COLS
-from game import ConnectFour
+from instrumentation import trace_search
+from search import SearchBudget, SearchInfo, SearchTimeout, CHECK_INTERVAL, WIN_SCORE
+from threats import threat_moves, WIN
 
 
 class MinMaxAiBot:
@@ -8,39 +9,130 @@ class MinMaxAiBot:
 
     Parameters:
         max_depth (int): The maximum depth to search in the Minimax algorithm.
+        time_limit_ms (float): Time budget per move. When set, the search deepens iteratively up to `max_depth`.
+        node_limit (int): Node budget per move, also enabling iterative deepening.
+        collect_stats (bool): Whether to collect the SearchStats of every move, which slows the search down.
+        on_node (callable): Called as `on_node(game, ply, depth, score, move)` after every searched node.
+        threats (bool): Whether to play immediate wins at once, only search forced blocks and skip moves letting the opponent win, see `threats.threat_moves`.
 
     Attributes:
         max_depth (int): The maximum depth to search in the Minimax algorithm.
+        time_limit_ms (float or None): Time budget per move.
+        node_limit (int or None): Node budget per move.
+        nodes (int): The number of nodes visited by the current or last search.
+        last_search (SearchInfo or None): Depth, nodes and time of the last choose_move call.
+        collect_stats (bool): Whether to collect the SearchStats of every move.
+        on_node (callable or None): Called after every searched node.
+        threats (bool): Whether the columns searched are narrowed down by the immediate threats of both players.
+        stats (SearchStats or None): Counters and timings of the last choose_move call, when collected.
+        stop_event (threading.Event or None): Set from another thread to stop the current search early.
+        current_depth (int): The depth of the search or iteration in progress, for progress reports.
 
     Methods:
         choose_move(game): Chooses the optimal move for the AI player.
+        iterative_deepening(game, budget): Searches one ply deeper at a time until the budget runs out.
         minimax(game, depth, maximizing_player): Implements the Minimax algorithm.
         evaluate(game): Evaluates the current state of the game.
         get_new_game_state(game, col, player): Creates a new game state after making a move.
     """
 
-    def __init__(self, max_depth=4):
+    def __init__(self, max_depth=4, time_limit_ms=None, node_limit=None, collect_stats=False, on_node=None,
+                 threats=False):
         """
         Initialize the MinMaxAiBot.
 
         Parameters:
             max_depth (int): The maximum depth to search in the Minimax algorithm.
+            time_limit_ms (float): Time budget per move. When set, the search deepens iteratively up to `max_depth`.
+            node_limit (int): Node budget per move, also enabling iterative deepening.
+            collect_stats (bool): Whether to collect the SearchStats of every move, which slows the search down.
+            on_node (callable): Called as `on_node(game, ply, depth, score, move)` after every searched node.
+            threats (bool): Whether to play immediate wins at once, only search forced blocks and skip moves letting the opponent win, see `threats.threat_moves`.
         """
         self.max_depth = max_depth
+        self.time_limit_ms = time_limit_ms
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.budget = None
+        self.last_search = None
+        self.collect_stats = collect_stats
+        self.on_node = on_node
+        self.threats = threats
+        self.stats = None
+        self.stop_event = None
+        self.current_depth = 0
 
     def choose_move(self, game):
         """
         Chooses the optimal move for the AI player using the Minimax algorithm.
 
+        The search plays and takes back moves on `game` in place, leaving it unchanged on return.
+        'O' is the maximizing player, so the move is chosen for whichever side is to move.
+        With a time or node budget, or a `stop_event` to stop it with, the search deepens iteratively
+        on a copy of the game and returns the move of the deepest completed iteration.
+        Either way the report is stored in `last_search`, and the statistics in `stats` when they are collected.
+        A position that is its own mirror image, such as the empty board, only has half of its moves searched at the root.
+
         Parameters:
             game (ConnectFour): The current state of the Connect Four game.
 
         Returns:
             int: The chosen column for the next move.
         """
-        _, move = self.minimax(game, self.max_depth, True)
+        self.nodes = 0
+        budget = SearchBudget(self.time_limit_ms, self.node_limit, self.stop_event)
+
+        if self.time_limit_ms is None and self.node_limit is None and self.stop_event is None:
+            self.current_depth = self.max_depth
+            with trace_search(self, game, 'minimax'):
+                score, move = self.minimax(game, self.max_depth, game.turn == 1)
+            depth = self.max_depth
+        else:
+            game = game.copy()
+            with trace_search(self, game, 'minimax'):
+                score, move, depth = self.iterative_deepening(game, budget)
+
+        self.last_search = SearchInfo(move, score, depth, self.nodes, budget.elapsed_ms())
         return move
 
+    def iterative_deepening(self, game, budget):
+        """
+        Searches one ply deeper at a time until `max_depth` is reached or the budget runs out.
+
+        Minimax visits every node whatever the move order, so earlier iterations only provide a
+        fallback move. An interrupted iteration is thrown away, which may leave `game` with moves played.
+
+        Parameters:
+            game (ConnectFour): The state to search, usually a copy of the game.
+            budget (SearchBudget): The time and node limits of the search.
+
+        Returns:
+            tuple: The score, the chosen column and the deepest completed depth.
+        """
+        maximizing_player = game.turn == 1
+        max_depth = min(self.max_depth, game.rows * game.cols - game.move_count)
+        score, move, completed_depth = None, None, 0
+
+        self.budget = budget
+        try:
+            for depth in range(1, max_depth + 1):
+                self.current_depth = depth
+                score, move = self.minimax(game, depth, maximizing_player)
+                completed_depth = depth
+
+                # A forced result will not change by searching deeper
+                if abs(score) >= WIN_SCORE:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.budget = None
+
+        if move is None:
+            available_columns = [col for col in range(game.cols) if game.heights[col] < game.rows]
+            move = available_columns[0] if available_columns else None
+        return score, move, completed_depth
+
     def minimax(self, game, depth, maximizing_player):
         """
         Implements the Minimax algorithm to determine the optimal move.
@@ -53,18 +145,30 @@ class MinMaxAiBot:
         Returns:
             tuple: A tuple containing the evaluation score and the chosen move column.
         """
-        if depth == 0 or game.is_winner('X') or game.is_winner('O') or game.is_board_full():
+        self.nodes += 1
+        if self.budget is not None and self.nodes % CHECK_INTERVAL == 0:
+            self.budget.check(self.nodes)
+
+        if depth == 0 or game.is_terminal:
             return self.evaluate(game), None
 
-        available_columns = [col for col in range(COLS) if game.board[0][col] == ' ']
+        available_columns = [col for col in range(game.cols) if game.heights[col] < game.rows]
+        if depth == self.current_depth and game.is_symmetric:
+            # Mirror moves of a symmetric root score the same, so only one of each pair is searched
+            available_columns = [col for col in available_columns if col <= game.cols - 1 - col]
+        if self.threats:
+            available_columns, forced = threat_moves(game, available_columns, depth > 1)
+            if forced is not None:
+                return (WIN_SCORE if (forced == WIN) == maximizing_player else -WIN_SCORE), available_columns[0]
 
         if maximizing_player:
             max_eval = float('-inf')
             best_move = None
 
             for col in available_columns:
-                new_game = self.get_new_game_state(game, col, 'O')
-                eval, _ = self.minimax(new_game, depth - 1, False)
+                game.play(col)
+                eval, _ = self.minimax(game, depth - 1, False)
+                game.undo(col)
 
                 if eval > max_eval:
                     max_eval = eval
@@ -76,8 +180,9 @@ class MinMaxAiBot:
             best_move = None
 
             for col in available_columns:
-                new_game = self.get_new_game_state(game, col, 'X')
-                eval, _ = self.minimax(new_game, depth - 1, True)
+                game.play(col)
+                eval, _ = self.minimax(game, depth - 1, True)
+                game.undo(col)
 
                 if eval < min_eval:
                     min_eval = eval
@@ -89,44 +194,21 @@ class MinMaxAiBot:
         """
         Improved evaluation method that assigns scores based on winning positions and three in a row/diagonal/column.
 
+        The windows of `connect - 1` cells, three in Connect Four, are scored as discs are dropped and taken back, so this only reads
+        `game.open_window_score`, the same total as summing `evaluate_window` over every window.
+
         Parameters:
             game (ConnectFour): The current state of the Connect Four game.
 
         Returns:
             int: The evaluation score.
         """
-        if game.is_winner('O'):
+        if game.winner == 'O':
             return 100_000
-        elif game.is_winner('X'):
+        elif game.winner == 'X':
             return -100_000
         else:
-            score = 0
-
-            # Check for three in a row
-            for row in range(game.rows):
-                for col in range(game.cols - 2):
-                    window = [game.board[row][col], game.board[row][col + 1], game.board[row][col + 2]]
-                    score += self.evaluate_window(window)
-
-            # Check for three in a column
-            for col in range(game.cols):
-                for row in range(game.rows - 2):
-                    window = [game.board[row][col], game.board[row + 1][col], game.board[row + 2][col]]
-                    score += self.evaluate_window(window)
-
-            # Check for three in a diagonal (top-left to bottom-right)
-            for row in range(game.rows - 2):
-                for col in range(game.cols - 2):
-                    window = [game.board[row][col], game.board[row + 1][col + 1], game.board[row + 2][col + 2]]
-                    score += self.evaluate_window(window)
-
-            # Check for three in a diagonal (bottom-left to top-right)
-            for row in range(2, game.rows):
-                for col in range(game.cols - 2):
-                    window = [game.board[row][col], game.board[row - 1][col + 1], game.board[row - 2][col + 2]]
-                    score += self.evaluate_window(window)
-
-            return score
+            return game.open_window_score
 
     def evaluate_window(self, window):
         """
@@ -160,9 +242,7 @@ class MinMaxAiBot:
         Returns:
             ConnectFour: The new game state after the move.
         """
-        new_game = ConnectFour()
-        new_game.board = [row[:] for row in game.board]
-        new_game.turn = game.turn
+        new_game = game.copy()
         new_game.drop_disc(col, player)
         return new_game
     
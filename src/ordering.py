@@ -0,0 +1,126 @@
+from specs import ROWS, COLS
+
+
+class MoveOrdering:
+    """
+    Decides in which order the Alpha-Beta search visits the columns of a position.
+
+    The better moves come first, the more branches can be pruned. Each heuristic can be switched off
+    to compare node counts, see `alphabeta.compare_move_orderings`.
+
+    Parameters:
+        center (bool): Visit the central columns first instead of going from left to right.
+        hash_move (bool): Visit the best move of an earlier search of the position first.
+        killers (bool): Visit moves that caused a cutoff at the same ply early.
+        history (bool): Sort the other moves by how often and how deep they caused cutoffs.
+
+    Attributes:
+        static_order (list): The order used when no other information is available.
+        killer_moves (list): The last two cutoff moves of every ply.
+        history_table (list): Cutoff scores of every column, one list per player.
+
+    Methods:
+        order(game, hash_move): Returns the legal columns of a position in search order.
+        record_cutoff(game, col, depth): Remembers a move that caused a cutoff.
+        clear(): Forgets the killer moves and the history table.
+        resize(rows, cols): Adapts the tables to another board size.
+    """
+
+    def __init__(self, center=True, hash_move=True, killers=True, history=True, rows=ROWS, cols=COLS):
+        """
+        Initialize the MoveOrdering.
+
+        Parameters:
+            center (bool): Visit the central columns first instead of going from left to right.
+            hash_move (bool): Visit the best move of an earlier search of the position first.
+            killers (bool): Visit moves that caused a cutoff at the same ply early.
+            history (bool): Sort the other moves by how often and how deep they caused cutoffs.
+            rows (int): The number of rows of the board searched.
+            cols (int): The number of columns of the board searched.
+        """
+        self.use_center = center
+        self.use_hash_move = hash_move
+        self.use_killers = killers
+        self.use_history = history
+        self.rows = None
+        self.cols = None
+        self.resize(rows, cols)
+
+    def resize(self, rows, cols):
+        """
+        Adapts the static order and the tables to another board size, clearing them if the size changes.
+
+        Parameters:
+            rows (int): The number of rows of the board searched.
+            cols (int): The number of columns of the board searched.
+        """
+        if (rows, cols) == (self.rows, self.cols):
+            return
+
+        self.rows = rows
+        self.cols = cols
+        if self.use_center:
+            self.static_order = sorted(range(cols), key=lambda col: abs(col - (cols - 1) / 2))
+        else:
+            self.static_order = list(range(cols))
+        self.clear()
+
+    def clear(self):
+        """
+        Forgets the killer moves and the history table.
+        """
+        self.killer_moves = [[None, None] for _ in range(self.rows * self.cols + 1)]
+        self.history_table = [[0] * self.cols, [0] * self.cols]
+
+    def order(self, game, hash_move=None):
+        """
+        Returns the legal columns of a position in search order.
+
+        Parameters:
+            game (ConnectFour): The position to search.
+            hash_move (int or None): The best move of an earlier search of the position.
+
+        Returns:
+            list: The columns that are not full, best candidates first.
+        """
+        moves = [col for col in self.static_order if game.heights[col] < game.rows]
+
+        if self.use_history:
+            # The sort is stable, so columns without history keep the static order
+            moves.sort(key=self.history_table[game.turn].__getitem__, reverse=True)
+
+        first = []
+        if self.use_hash_move and hash_move is not None:
+            first.append(hash_move)
+        if self.use_killers:
+            for killer in self.killer_moves[game.move_count]:
+                if killer is not None and killer not in first and game.heights[killer] < game.rows:
+                    first.append(killer)
+
+        if first:
+            moves = first + [col for col in moves if col not in first]
+        return moves
+
+    def record_cutoff(self, game, col, depth):
+        """
+        Remembers a move that caused a cutoff.
+
+        Parameters:
+            game (ConnectFour): The position where the cutoff happened.
+            col (int): The move that caused the cutoff.
+            depth (int): The remaining search depth at the position.
+        """
+        killers = self.killer_moves[game.move_count]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+
+        self.history_table[game.turn][col] += depth * depth
+
+
+ORDERINGS = {
+    'left_to_right': dict(center=False, hash_move=False, killers=False, history=False),
+    'center': dict(center=True, hash_move=False, killers=False, history=False),
+    'center_hash': dict(center=True, hash_move=True, killers=False, history=False),
+    'full': dict(center=True, hash_move=True, killers=True, history=True),
+}
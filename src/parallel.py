@@ -0,0 +1,210 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout, wait
+
+from alphabeta import AlphaBetaAiBot
+from instrumentation import SearchStats
+from game import ConnectFour
+from search import SearchBudget, SearchInfo, SearchTimeout, WIN_SCORE
+from threats import threat_moves, WIN
+
+
+LOCAL_OPTIONS = ('time_limit_ms', 'node_limit', 'collect_stats', 'on_node')  # Only used by this process
+STOP_POLL_SECONDS = 0.05
+
+_worker_bot = None
+_worker_stop = None
+
+
+def _init_worker(options, stop):
+    """
+    Creates the search bot of a worker process. It lives as long as the process, keeping its transposition table.
+    """
+    global _worker_bot, _worker_stop
+    _worker_bot = AlphaBetaAiBot(**options)
+    _worker_stop = stop
+
+
+def _search_child(bitboards, turn, size, col, depth, alpha, beta):
+    """
+    Searches the position after one root move inside a worker process.
+
+    Returns:
+        tuple: The score of the move, None if the search was stopped, and the number of nodes searched.
+    """
+    game = ConnectFour.from_bitboards(bitboards, turn, *size)
+    game.play(col)
+
+    _worker_bot.nodes = 0
+    _worker_bot.current_depth = depth  # The root is in the main process
+    _worker_bot.budget = SearchBudget(stop_event=_worker_stop)
+    _worker_bot.move_ordering.resize(game.rows, game.cols)
+    _worker_bot.move_ordering.clear()
+    try:
+        score, _ = _worker_bot.alphabeta(game, depth - 1, alpha, beta, game.turn == 1)
+    except SearchTimeout:
+        score = None
+    finally:
+        _worker_bot.budget = None
+    return score, _worker_bot.nodes
+
+
+class ParallelAlphaBetaAiBot(AlphaBetaAiBot):
+    """
+    Alpha-Beta bot that splits the root moves across a pool of worker processes.
+
+    The first root move is searched alone to get a bound, then all other moves are searched at once,
+    each only having to prove whether it beats that bound (Young Brothers Wait at the root).
+    The chosen move is the one the serial search picks with the same root order.
+    The pool is started on the first move and reused until `close` is called.
+
+    Parameters:
+        workers (int): The number of worker processes. With 1 the search runs serially in this process.
+        **options: The AlphaBetaAiBot arguments, also used by the workers except those in LOCAL_OPTIONS.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        worker_options (dict): The AlphaBetaAiBot arguments of the workers' bots.
+
+    Methods:
+        choose_move(game): Chooses the optimal move, searching the root moves in parallel.
+        close(): Shuts the worker processes down.
+    """
+
+    def __init__(self, workers=2, **options):
+        """
+        Initialize the ParallelAlphaBetaAiBot.
+
+        Parameters:
+            workers (int): The number of worker processes. With 1 the search runs serially in this process.
+            **options: The AlphaBetaAiBot arguments, also used by the workers except those in LOCAL_OPTIONS.
+        """
+        super().__init__(**options)
+        self.workers = workers
+        # A position store or tablebase given by path is opened again by each worker
+        self.worker_options = {key: value for key, value in options.items() if key not in LOCAL_OPTIONS}
+        self.executor = None
+        self._worker_stop = None
+
+    def _result(self, future, budget):
+        """
+        Waits for the result of a root move, raising SearchTimeout as soon as `stop_event` is set.
+        """
+        while True:
+            try:
+                score, nodes = future.result(timeout=STOP_POLL_SECONDS)
+            except FutureTimeout:
+                if budget.stopped:
+                    raise SearchTimeout()
+                continue
+            if score is None:
+                raise SearchTimeout()
+            return score, nodes
+
+    def choose_move(self, game):
+        """
+        Chooses the optimal move, searching the root moves in parallel.
+
+        Searches with a time or node budget, and searches with a single worker, run serially.
+        As in the serial search, a position found in `position_store` deep enough is not searched, and with
+        `threats` the root moves are narrowed down first. Setting `stop_event` stops the workers; the best
+        move among the root moves searched so far is then returned, with a depth of 0 in the report.
+
+        Parameters:
+            game (ConnectFour): The current state of the Connect Four game.
+
+        Returns:
+            int: The chosen column for the next move.
+        """
+        if self.workers <= 1 or self.time_limit_ms is not None or self.node_limit is not None:
+            return super().choose_move(game)
+
+        budget = SearchBudget(stop_event=self.stop_event)
+        if self.position_store is not None:
+            entry = self.position_store.lookup(game)
+            if entry is not None:
+                score, depth, move = entry
+                if depth >= self.max_depth and move is not None and game.is_valid_move(move):
+                    self.last_search = SearchInfo(move, score, depth, 0, budget.elapsed_ms())
+                    if self.collect_stats:
+                        self.stats = SearchStats()  # Nothing was searched
+                    return move
+
+        self.move_ordering.resize(game.rows, game.cols)
+        available_columns = self.move_ordering.order(game)
+        if game.is_symmetric:
+            available_columns = [col for col in available_columns if col <= game.cols - 1 - col]
+        if game.is_terminal or not available_columns:
+            self.last_search = SearchInfo(None, None, 0, 0, budget.elapsed_ms())
+            return None
+
+        maximizing_player = game.turn == 1
+        if self.threats:
+            available_columns, forced = threat_moves(game, available_columns, self.max_depth > 1)
+            if forced is not None:
+                score = WIN_SCORE if (forced == WIN) == maximizing_player else -WIN_SCORE
+                self.last_search = SearchInfo(available_columns[0], score, self.max_depth, 1, budget.elapsed_ms())
+                return available_columns[0]
+
+        if self.executor is None:
+            self._worker_stop = multiprocessing.Event()
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(self.worker_options, self._worker_stop))
+        self._worker_stop.clear()
+
+        position = (tuple(game.bitboards), game.turn, (game.rows, game.cols, game.connect))
+        pvs = self.search_mode == 'pvs'
+        best_score, best_move, nodes = None, None, 0
+        futures = []
+        try:
+            # The eldest brother gives the bound the others have to beat
+            first = available_columns[0]
+            futures.append(self.executor.submit(_search_child, *position, first, self.max_depth,
+                                                float('-inf'), float('inf')))
+            best_score, nodes = self._result(futures[0], budget)
+            best_move = first
+
+            # In 'pvs' mode the bound is only tested with a null window, and moves beating it searched again
+            if maximizing_player:
+                window = (best_score, best_score + 1 if pvs else float('inf'))
+            else:
+                window = (best_score - 1 if pvs else float('-inf'), best_score)
+            brothers = [(col, self.executor.submit(_search_child, *position, col, self.max_depth, *window))
+                        for col in available_columns[1:]]
+            futures.extend(future for _, future in brothers)
+
+            # Scores that beat the bound are exact; ties go to the earlier move, as in the serial search
+            bound = best_score
+            for col, future in brothers:
+                score, child_nodes = self._result(future, budget)
+                nodes += child_nodes
+                if pvs and ((score > bound) if maximizing_player else (score < bound)):
+                    full_window = (best_score, float('inf')) if maximizing_player else (float('-inf'), best_score)
+                    futures.append(self.executor.submit(_search_child, *position, col, self.max_depth, *full_window))
+                    score, child_nodes = self._result(futures[-1], budget)
+                    nodes += child_nodes
+                if (score > best_score) if maximizing_player else (score < best_score):
+                    best_score, best_move = score, col
+            depth = self.max_depth
+        except SearchTimeout:
+            # Stop the workers and wait for them, so that the next search starts on an idle pool
+            self._worker_stop.set()
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            depth = 0
+            if best_move is None:
+                best_move = available_columns[0]
+
+        self.nodes = nodes + 1
+        self.last_search = SearchInfo(best_move, best_score, depth, self.nodes, budget.elapsed_ms())
+        if self.record_positions and self.position_store is not None and depth > 0:
+            self.position_store.record(game, best_score, depth, best_move)
+        return best_move
+
+    def close(self):
+        """
+        Shuts the worker processes down. A later move starts a new pool.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,408 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from specs import ROWS, COLS, CONNECT
+from game import ConnectFour
+from records import from_digits
+
+
+STORE_MAGIC = b'C4PS'
+STORE_HEADER = struct.Struct('<4sBBBBQ')  # magic, version, rows, cols, connect, record count
+STORE_RECORD = struct.Struct('<QiBbxx')  # position key, score, depth, best move (-1 for none), padding
+STORE_VERSION = 2
+JOURNAL_SUFFIX = '.journal'
+NO_MOVE = -1
+KEY_BITS = 64  # Width of the key field of a record
+
+
+def check_key_bits(rows, cols):
+    """
+    Raises ValueError if the position keys of a board do not fit the key field of a record.
+
+    A key has one bit per cell plus one on top of every column, and the turn bit, see `ConnectFour.key`.
+    """
+    bits = cols * (rows + 1) + 1
+    if bits > KEY_BITS:
+        raise ValueError(f"Position keys of a {rows}x{cols} board take {bits} bits, "
+                         f"a position store holds at most {KEY_BITS}.")
+
+
+class PositionStore:
+    """
+    Search results of positions, (score, depth, best move) by canonical position key, kept in a file shared by many processes.
+
+    The file starts with a header (magic, version, board size and record count) followed by fixed-width
+    records sorted by key. It is memory-mapped and searched in place by bisection, so opening it costs
+    nothing and every process reading it shares the same page-cached copy.
+
+    New results are appended to a journal file next to it, `<path>.journal`, with one write per record,
+    so several processes can append at once. The journal is read into memory when the store is opened and
+    merged into the sorted file by `compact`. Scores are those of the bots, positive when good for 'O'.
+    A position and its mirror image share one record, see `ConnectFour.canonical_key`; `lookup` and `record`
+    turn the stored move around as needed, while `probe` and `append` work on keys and stored moves as they are.
+
+    Parameters:
+        path (str): The path of the store file. An empty store is created if it does not exist.
+        rows (int): The number of rows of the board, for a new store.
+        cols (int): The number of columns of the board, for a new store.
+        connect (int): The number of discs in a row needed to win, for a new store.
+
+    Attributes:
+        path (str): The path of the store file.
+        rows (int): The number of rows of the board the store is for.
+        cols (int): The number of columns of the board the store is for.
+        connect (int): The number of discs in a row needed to win.
+        count (int): The number of sorted records.
+        journal (dict): The appended entries, by position key.
+
+    Methods:
+        probe(key): Returns the stored entry of a position key.
+        lookup(game): Returns the stored entry of a game.
+        append(key, score, depth, move): Saves a result in the journal.
+        record(game, score, depth, move): Saves the result of a game in the journal.
+        compact(): Merges the journal into the sorted records.
+        write(path, entries, rows, cols, connect): Writes a sorted store file.
+        close(): Unmaps the file and closes the journal.
+    """
+
+    def __init__(self, path, rows=ROWS, cols=COLS, connect=CONNECT):
+        """
+        Initialize the PositionStore, mapping the file and reading the journal.
+
+        Parameters:
+            path (str): The path of the store file. An empty store is created if it does not exist.
+            rows (int): The number of rows of the board, for a new store.
+            cols (int): The number of columns of the board, for a new store.
+            connect (int): The number of discs in a row needed to win, for a new store.
+
+        Raises:
+            ValueError: If the file is not a position store, or the positions of the board do not fit its records.
+        """
+        if not os.path.exists(path):
+            self.write(path, {}, rows, cols, connect)
+
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self._journal_file = None
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as store_file:
+            self._map = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.rows, self.cols, self.connect, self.count = STORE_HEADER.unpack_from(self._map)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a position store file.")
+        try:
+            check_key_bits(self.rows, self.cols)
+        except ValueError:
+            self._map.close()
+            raise
+
+        self.journal = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as journal_file:
+                data = journal_file.read()
+            # A record cut short by a crash is ignored
+            data = data[:len(data) - len(data) % STORE_RECORD.size]
+            for key, score, depth, move in STORE_RECORD.iter_unpack(data):
+                self._merge(self.journal, key, score, depth, move)
+
+    @staticmethod
+    def _merge(entries, key, score, depth, move):
+        old = entries.get(key)
+        if old is None or depth >= old[1]:
+            entries[key] = (score, depth, move)
+
+    def __len__(self):
+        return self.count + len(self.journal)
+
+    def _probe_sorted(self, key):
+        """
+        Finds a key among the sorted records by bisection, reading only the records it visits.
+        """
+        data = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = STORE_HEADER.size + middle * STORE_RECORD.size
+            record_key = STORE_RECORD.unpack_from(data, offset)[0]
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                return STORE_RECORD.unpack_from(data, offset)[1:]
+        return None
+
+    def probe(self, key):
+        """
+        Returns the stored entry of a position key, the deeper one if it is both in the file and in the journal.
+
+        Parameters:
+            key (int): The canonical position key, see `ConnectFour.canonical_key`.
+
+        Returns:
+            tuple or None: The `(score, depth, move)` entry, move being None if unknown, or None if the key is not stored.
+        """
+        entry = self._probe_sorted(key)
+        appended = self.journal.get(key)
+        if appended is not None and (entry is None or appended[1] >= entry[1]):
+            entry = appended
+        if entry is None:
+            return None
+        score, depth, move = entry
+        return score, depth, None if move == NO_MOVE else move
+
+    def lookup(self, game):
+        """
+        Returns the stored entry of a game.
+
+        Parameters:
+            game (ConnectFour): The position to look up.
+
+        Returns:
+            tuple or None: The `(score, depth, move)` entry, or None if the position is not stored
+            or the game is not played on the store's board.
+        """
+        if (game.rows, game.cols, game.connect) != (self.rows, self.cols, self.connect):
+            return None
+        entry = self.probe(game.canonical_key)
+        if entry is not None and entry[2] is not None and game.mirror_key < game.key:
+            score, depth, move = entry
+            return score, depth, game.cols - 1 - move
+        return entry
+
+    def append(self, key, score, depth, move):
+        """
+        Saves a result in the journal, unless a result at least as deep is already stored.
+
+        Parameters:
+            key (int): The canonical position key.
+            score (int): The score of the position, positive when good for 'O'.
+            depth (int): The depth the position was searched to.
+            move (int or None): The best move found, oriented for the canonical key.
+
+        Returns:
+            bool: True if the result was appended.
+        """
+        stored = self.probe(key)
+        if stored is not None and stored[1] >= depth:
+            return False
+
+        record = STORE_RECORD.pack(key, int(score), depth, NO_MOVE if move is None else move)
+        if self._journal_file is None:
+            # Unbuffered append mode: every record is a single write to the end of the file
+            self._journal_file = open(self.journal_path, 'ab', buffering=0)
+        self._journal_file.write(record)
+        self.journal[key] = (int(score), depth, NO_MOVE if move is None else move)
+        return True
+
+    def record(self, game, score, depth, move):
+        """
+        Saves the result of a search of a game in the journal, see `append`.
+
+        Parameters:
+            game (ConnectFour): The searched position, on the store's board.
+            score (int): The score of the position, positive when good for 'O'.
+            depth (int): The depth the position was searched to.
+            move (int or None): The best move found.
+
+        Returns:
+            bool: True if the result was appended.
+        """
+        if move is not None and game.mirror_key < game.key:
+            move = game.cols - 1 - move
+        return self.append(game.canonical_key, score, depth, move)
+
+    def compact(self):
+        """
+        Merges the journal into the sorted records and removes the journal.
+
+        The new file is written next to the old one and renamed over it, so readers that already
+        mapped the old file keep a consistent view. Other processes should not append meanwhile.
+        """
+        entries = {}
+        for index in range(self.count):
+            key, score, depth, move = STORE_RECORD.unpack_from(self._map, STORE_HEADER.size + index * STORE_RECORD.size)
+            entries[key] = (score, depth, move)
+        for key, (score, depth, move) in self.journal.items():
+            self._merge(entries, key, score, depth, move)
+
+        temporary_path = self.path + '.tmp'
+        self.write(temporary_path, entries, self.rows, self.cols, self.connect)
+        self.close()
+        os.replace(temporary_path, self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._open()
+
+    @staticmethod
+    def write(path, entries, rows=ROWS, cols=COLS, connect=CONNECT):
+        """
+        Writes a sorted store file.
+
+        Parameters:
+            path (str): The path of the file.
+            entries (dict): `(score, depth, move)` entries by position key, move being None or NO_MOVE if unknown.
+            rows (int): The number of rows of the board.
+            cols (int): The number of columns of the board.
+            connect (int): The number of discs in a row needed to win.
+
+        Raises:
+            ValueError: If the positions of the board do not fit the records.
+        """
+        check_key_bits(rows, cols)
+        with open(path, 'wb') as store_file:
+            store_file.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, rows, cols, connect, len(entries)))
+            for key in sorted(entries):
+                score, depth, move = entries[key]
+                store_file.write(STORE_RECORD.pack(key, score, depth, NO_MOVE if move is None else move))
+
+    def close(self):
+        """
+        Unmaps the file and closes the journal.
+        """
+        self._map.close()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def __getstate__(self):
+        # Other processes map the file themselves
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+
+_worker_bot = None
+
+
+def _init_worker(depth):
+    """
+    Creates the search bot of a worker process.
+    """
+    from alphabeta import AlphaBetaAiBot
+
+    global _worker_bot
+    _worker_bot = AlphaBetaAiBot(max_depth=depth)
+
+
+def _search_position(bitboards, turn, size):
+    """
+    Searches one position inside a worker process.
+
+    Returns:
+        tuple: The canonical position key and its `(score, depth, move)` entry.
+    """
+    game = ConnectFour.from_bitboards(bitboards, turn, *size)
+    move = _worker_bot.choose_move(game)
+    if move is not None and game.mirror_key < game.key:
+        move = game.cols - 1 - move
+    return game.canonical_key, (int(_worker_bot.last_search.score), _worker_bot.last_search.depth, move)
+
+
+def generate(max_moves, depth, size=(ROWS, COLS, CONNECT), workers=1, progress=None):
+    """
+    Searches every position reachable with up to `max_moves` discs, skipping finished games and mirror images.
+
+    Parameters:
+        max_moves (int): The deepest ply to store.
+        depth (int): The Alpha-Beta search depth of every position.
+        size (tuple): The rows, columns and discs in a row needed to win.
+        workers (int): The number of worker processes.
+        progress (callable): Called with the number of positions searched so far and the total.
+
+    Returns:
+        dict: `(score, depth, move)` entries by canonical position key.
+    """
+    positions = {}
+    layer = {0: ConnectFour(*size)}
+    for _ in range(max_moves + 1):
+        next_layer = {}
+        for game in layer.values():
+            positions[game.canonical_key] = game
+            for col in range(game.cols):
+                if game.is_valid_move(col):
+                    child = game.copy()
+                    child.play(col)
+                    if not child.is_terminal:
+                        next_layer[child.canonical_key] = child
+        layer = next_layer
+        if not layer:
+            break
+
+    tasks = [(tuple(game.bitboards), game.turn, size) for game in positions.values()]
+    entries = {}
+    with ProcessPoolExecutor(max(1, workers), initializer=_init_worker, initargs=(depth,)) as executor:
+        for done, (key, entry) in enumerate(executor.map(_search_position, *zip(*tasks), chunksize=16), 1):
+            entries[key] = entry
+            if progress is not None:
+                progress(done, len(tasks))
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, inspect and compact a position store.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Search every opening position and write a new store.")
+    build_parser.add_argument('output')
+    build_parser.add_argument('--max-moves', type=int, default=4)
+    build_parser.add_argument('--depth', type=int, default=8)
+    build_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    build_parser.add_argument('--rows', type=int, default=ROWS)
+    build_parser.add_argument('--cols', type=int, default=COLS)
+    build_parser.add_argument('--connect', type=int, default=CONNECT)
+
+    lookup_parser = subparsers.add_parser('lookup', help="Show the stored entries of positions given as 1-based columns.")
+    lookup_parser.add_argument('store')
+    lookup_parser.add_argument('positions', nargs='+')
+
+    compact_parser = subparsers.add_parser('compact', help="Merge the journal into the sorted records.")
+    compact_parser.add_argument('store')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        def progress(done, total):
+            print(f"\rSearched {done}/{total} positions", end='', file=sys.stderr, flush=True)
+
+        size = (args.rows, args.cols, args.connect)
+        try:
+            check_key_bits(args.rows, args.cols)
+        except ValueError as error:
+            parser.error(str(error))
+        entries = generate(args.max_moves, args.depth, size, args.workers, progress)
+        print(file=sys.stderr)
+        PositionStore.write(args.output, entries, *size)
+        print(f"Wrote {len(entries)} positions to {args.output}")
+    elif args.command == 'lookup':
+        store = PositionStore(args.store)
+        for moves in args.positions:
+            try:
+                game = ConnectFour.from_moves(from_digits(moves), store.rows, store.cols, store.connect)
+            except ValueError as error:
+                parser.error(f"{moves}: {error}")
+            entry = store.lookup(game)
+            if entry is None:
+                print(f"{moves or '-'}: not stored")
+            else:
+                score, depth, move = entry
+                best = '-' if move is None else move + 1
+                print(f"{moves or '-'}: score {score}, depth {depth}, best column {best}")
+    else:
+        store = PositionStore(args.store)
+        appended = len(store.journal)
+        store.compact()
+        print(f"Merged {appended} journal entries, {store.count} positions stored")
+
+
+if __name__ == "__main__":
+    main()
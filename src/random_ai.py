@@ -1,5 +1,4 @@
 import random
-from specs import *
 
 
 class RandomAiBot:
@@ -13,6 +12,6 @@ class RandomAiBot:
         Returns:
         - int or None: The column where the AI chooses to drop a disc, or None if no valid moves are available.
         """
-        available_columns = [col for col in range(COLS) if game.board[0][col] == ' ']
+        available_columns = [col for col in range(game.cols) if game.is_valid_move(col)]
         return random.choice(available_columns) if available_columns else None
 
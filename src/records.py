@@ -0,0 +1,363 @@
+import argparse
+import itertools
+import struct
+import sys
+
+from specs import ROWS, COLS, CONNECT
+from game import ConnectFour
+
+
+ARCHIVE_MAGIC = b'C4GR'
+ARCHIVE_HEADER = struct.Struct('<4sBBBBB')  # magic, version, rows, cols, connect, bits per move
+RECORD_HEADER = struct.Struct('<HB')  # move count, player who moved first
+ARCHIVE_VERSION = 1
+
+
+def move_bits(cols):
+    """
+    Returns the number of bits a packed move takes on a board, 3 for seven columns.
+    """
+    return max(1, (cols - 1).bit_length())
+
+
+def to_digits(moves):
+    """
+    Writes moves as the usual string of 1-based column digits, such as '4453'.
+
+    Parameters:
+        moves (iterable): The columns played, 0-based.
+
+    Returns:
+        str: The digits.
+
+    Raises:
+        ValueError: If a column does not fit in one digit, on boards of more than nine columns.
+    """
+    moves = list(moves)
+    if any(col > 8 for col in moves):
+        raise ValueError("Only boards of up to nine columns can be written as digits.")
+    return ''.join(str(col + 1) for col in moves)
+
+
+def from_digits(digits):
+    """
+    Reads moves written as 1-based column digits.
+
+    Parameters:
+        digits (str): The digits, '-' or '' for no moves.
+
+    Returns:
+        list: The columns played, 0-based.
+
+    Raises:
+        ValueError: If a character is not a column digit.
+    """
+    digits = digits.strip()
+    if digits == '-':
+        return []
+    if not all('1' <= char <= '9' for char in digits):
+        raise ValueError(f"Invalid moves {digits!r}.")
+    return [int(char) - 1 for char in digits]
+
+
+def pack_moves(moves, bits):
+    """
+    Packs moves into bytes, `bits` bits per move, the first move in the lowest bits.
+
+    Parameters:
+        moves (list): The columns played, 0-based.
+        bits (int): The bits per move, see `move_bits`.
+
+    Returns:
+        bytes: The packed moves, `ceil(len(moves) * bits / 8)` bytes long.
+    """
+    value = 0
+    for col in reversed(moves):
+        value = (value << bits) | col
+    return value.to_bytes((len(moves) * bits + 7) // 8, 'little')
+
+
+def unpack_moves(data, count, bits):
+    """
+    Unpacks moves packed by `pack_moves`.
+
+    Parameters:
+        data (bytes): The packed moves.
+        count (int): The number of moves.
+        bits (int): The bits per move.
+
+    Returns:
+        list: The columns played, 0-based.
+    """
+    value = int.from_bytes(data, 'little')
+    mask = (1 << bits) - 1
+    moves = []
+    for _ in range(count):
+        moves.append(value & mask)
+        value >>= bits
+    return moves
+
+
+class GameRecord:
+    """
+    The moves of one game and the board it was played on, enough to rebuild any of its positions.
+
+    Parameters:
+        moves (list): The columns played, 0-based.
+        first (int): The player who moved first. 0 for Player 1 (X), 1 for Player 2 (O).
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+        connect (int): The number of discs in a row needed to win.
+
+    Methods:
+        from_game(game): Returns the record of a game.
+        game(ply): Rebuilds the game after a number of moves.
+        to_digits(): Writes the moves as 1-based column digits.
+    """
+
+    def __init__(self, moves, first=0, rows=ROWS, cols=COLS, connect=CONNECT):
+        self.moves = moves
+        self.first = first
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and (
+            (self.moves, self.first, self.rows, self.cols, self.connect)
+            == (other.moves, other.first, other.rows, other.cols, other.connect))
+
+    def __repr__(self):
+        return f"GameRecord({self.moves}, first={self.first}, size={self.rows}x{self.cols}, connect={self.connect})"
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Returns the record of a game.
+
+        Parameters:
+            game (ConnectFour): The game, played from the empty board.
+
+        Returns:
+            GameRecord: Its moves and board.
+
+        Raises:
+            ValueError: If the game was built from a board, so that the order of some discs is unknown.
+        """
+        if len(game.moves) != game.move_count:
+            raise ValueError("The game was not played from the empty board, its moves are unknown.")
+        return cls(list(game.moves), game.first_turn, game.rows, game.cols, game.connect)
+
+    def game(self, ply=None):
+        """
+        Rebuilds the game after a number of moves.
+
+        Parameters:
+            ply (int or None): The number of moves to play, all of them if None.
+
+        Returns:
+            ConnectFour: The position.
+
+        Raises:
+            ValueError: If a move of the record is not valid.
+        """
+        moves = self.moves if ply is None else self.moves[:ply]
+        return ConnectFour.from_moves(moves, self.rows, self.cols, self.connect, self.first)
+
+    def to_digits(self):
+        """
+        Writes the moves as 1-based column digits, the standard text format of games where X moves first.
+
+        Returns:
+            str: The digits.
+
+        Raises:
+            ValueError: If O moved first or the board has more than nine columns.
+        """
+        if self.first != 0:
+            raise ValueError("Games where O moves first cannot be written as digits.")
+        return to_digits(self.moves)
+
+
+class GameWriter:
+    """
+    Writes games one at a time to an archive, binary or text.
+
+    A binary archive starts with a header (magic, version, board size and bits per move), followed
+    by one record per game: its move count, the player who moved first and its moves packed
+    `move_bits(cols)` bits each, 3 for seven columns, so a full game of 42 moves takes 19 bytes.
+    A text archive holds one game per line as 1-based column digits.
+
+    Parameters:
+        path (str): The path of the archive.
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+        connect (int): The number of discs in a row needed to win.
+        binary (bool): Whether to write the binary format rather than text.
+        append (bool): Whether to add games to an existing archive rather than replacing it.
+
+    Methods:
+        write(game): Writes a game or a GameRecord.
+        close(): Closes the file.
+    """
+
+    def __init__(self, path, rows=ROWS, cols=COLS, connect=CONNECT, binary=True, append=False):
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.binary = binary
+        self.bits = move_bits(cols)
+        self.count = 0
+
+        if binary:
+            header = ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, rows, cols, connect, self.bits)
+            existing = b''
+            if append:
+                try:
+                    with open(path, 'rb') as archive:
+                        existing = archive.read(ARCHIVE_HEADER.size)
+                except FileNotFoundError:
+                    pass
+                if existing and existing != header:
+                    raise ValueError(f"{path} is not an archive of {rows}x{cols} connect {connect} games.")
+            self.file = open(path, 'ab' if append else 'wb')
+            if not existing:
+                self.file.write(header)
+        else:
+            self.file = open(path, 'a' if append else 'w')
+
+    def write(self, game):
+        """
+        Writes a game.
+
+        Parameters:
+            game (ConnectFour or GameRecord): The game, played on the board of the archive.
+
+        Raises:
+            ValueError: If the game is played on another board, or cannot be written as text.
+        """
+        record = game if isinstance(game, GameRecord) else GameRecord.from_game(game)
+        if (record.rows, record.cols, record.connect) != (self.rows, self.cols, self.connect):
+            raise ValueError(f"Cannot write a {record.rows}x{record.cols} game to a {self.rows}x{self.cols} archive.")
+
+        if self.binary:
+            self.file.write(RECORD_HEADER.pack(len(record.moves), record.first))
+            self.file.write(pack_moves(record.moves, self.bits))
+        else:
+            self.file.write((record.to_digits() or '-') + '\n')
+        self.count += 1
+
+    def close(self):
+        """
+        Closes the file.
+        """
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_games(path, rows=ROWS, cols=COLS, connect=CONNECT):
+    """
+    Reads the games of an archive one at a time, without loading the whole file.
+
+    The format is recognized from the first bytes. Binary archives carry their board size;
+    text archives, one game per line as 1-based column digits, are read with the given one.
+
+    Parameters:
+        path (str): The path of the archive.
+        rows, cols, connect (int): The board size and the number of discs in a row needed to win, for text archives.
+
+    Yields:
+        GameRecord: The games, in the order they were written.
+
+    Raises:
+        ValueError: If the archive is damaged or a line is not a game.
+    """
+    with open(path, 'rb') as archive:
+        header = archive.read(ARCHIVE_HEADER.size)
+        if header[:len(ARCHIVE_MAGIC)] == ARCHIVE_MAGIC:
+            magic, version, rows, cols, connect, bits = ARCHIVE_HEADER.unpack(header)
+            if version != ARCHIVE_VERSION:
+                raise ValueError(f"{path} is an archive of unsupported version {version}.")
+            while True:
+                record_header = archive.read(RECORD_HEADER.size)
+                if not record_header:
+                    return
+                if len(record_header) < RECORD_HEADER.size:
+                    raise ValueError(f"{path} ends in the middle of a game.")
+                count, first = RECORD_HEADER.unpack(record_header)
+                size = (count * bits + 7) // 8
+                data = archive.read(size)
+                if len(data) < size:
+                    raise ValueError(f"{path} ends in the middle of a game.")
+                yield GameRecord(unpack_moves(data, count, bits), first, rows, cols, connect)
+        else:
+            archive.seek(0)
+            for line_number, line in enumerate(archive, 1):
+                line = line.decode('ascii', 'replace').strip()
+                if not line:
+                    continue
+                try:
+                    moves = from_digits(line)
+                except ValueError as error:
+                    raise ValueError(f"{path}, line {line_number}: {error}") from None
+                yield GameRecord(moves, 0, rows, cols, connect)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and inspect archives of Connect Four games.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="Copy the games of an archive to another format.")
+    convert_parser.add_argument('input')
+    convert_parser.add_argument('output')
+    convert_parser.add_argument('--text', action='store_true', help="Write digit strings instead of binary.")
+
+    show_parser = subparsers.add_parser('show', help="Print a position of a game of an archive.")
+    show_parser.add_argument('archive')
+    show_parser.add_argument('game', type=int, help="The index of the game, 0 for the first.")
+    show_parser.add_argument('--ply', type=int, default=None, help="The number of moves played, all by default.")
+
+    for subparser in (convert_parser, show_parser):
+        subparser.add_argument('--rows', type=int, default=ROWS, help="Board size of text archives.")
+        subparser.add_argument('--cols', type=int, default=COLS)
+        subparser.add_argument('--connect', type=int, default=CONNECT)
+
+    args = parser.parse_args(argv)
+    size = (args.rows, args.cols, args.connect)
+
+    try:
+        if args.command == 'convert':
+            games = read_games(args.input, *size)
+            first = next(games, None)
+            if first is None:
+                parser.error(f"{args.input} holds no games.")
+            with GameWriter(args.output, first.rows, first.cols, first.connect, binary=not args.text) as writer:
+                writer.write(first)
+                for record in games:
+                    writer.write(record)
+            print(f"Wrote {writer.count} games to {args.output}")
+        else:
+            record = next(itertools.islice(read_games(args.archive, *size), args.game, None), None)
+            if record is None:
+                parser.error(f"{args.archive} has no game {args.game}.")
+            game = record.game(args.ply)
+            print(f"Game {args.game}, {game.move_count} of {len(record)} moves, "
+                  f"{'XO'[record.first]} first, {'XO'[game.turn]} to move")
+            for cells in game.board:
+                print('|' + '|'.join(cells) + '|')
+            print(' ' + ' '.join(str(col + 1)[-1] for col in range(game.cols)))
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import pygame
+from specs import *
+
+
+HIGHLIGHT_COLOR = (255, 255, 0)
+BOARD_TOP = CELL_SIZE * 2  # The board starts below the player names and the column numbers
+
+
+class BoardRenderer:
+    """
+    Draws the game screen by blitting cached surfaces, redrawing only the regions that changed since the last frame.
+
+    Everything that never changes during a game, the background, the column numbers, the cells and the grid
+    lines, is rendered once into `background`. Text is rendered once per string and color. A changed cell is
+    restored from `background` and gets its disc blitted on top, so a frame costs a few small blits and
+    `pygame.display.update` of the returned rectangles instead of a full redraw and flip.
+    The falling disc of the drop animation is erased by the next call to `draw`.
+    Column scores, when given, are written under the column numbers, the best one highlighted.
+
+    Parameters:
+        screen (pygame.Surface): The display surface.
+        font (pygame.font.Font): The font of the labels.
+
+    Methods:
+        text(text, color, background, font): Returns the cached surface of a text.
+        invalidate(): Forces the next frame to redraw the whole screen.
+        draw(game, labels, highlighted, status, scores, best): Draws the changes of a frame and returns the dirty rectangles.
+        draw_falling_disc(col, row, player): Moves the falling disc of the drop animation one cell down.
+        end_falling_disc(): Restores the cell under the falling disc after the animation.
+    """
+
+    def __init__(self, screen, font):
+        """
+        Initialize the BoardRenderer and render its cached surfaces.
+
+        Parameters:
+            screen (pygame.Surface): The display surface.
+            font (pygame.font.Font): The font of the labels.
+        """
+        self.screen = screen
+        self.font = font
+        self._texts = {}
+
+        self.labels_rect = pygame.Rect(0, 0, WIDTH, CELL_SIZE * 3 // 4)
+        self.status_rect = pygame.Rect(0, CELL_SIZE * 3 // 4, WIDTH, CELL_SIZE // 2)
+        self.scores_rect = pygame.Rect(0, BOARD_TOP - CELL_SIZE // 3, WIDTH, CELL_SIZE // 3)
+        self.scores_font = pygame.font.Font(pygame.font.get_default_font(), FONT_SIZE * 2 // 3)
+
+        self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.background.fill(BACKGROUND_COLOR)
+        pygame.draw.rect(self.background, EMPTY_COLOR, (0, BOARD_TOP, COLS * CELL_SIZE, ROWS * CELL_SIZE))
+        for col in range(COLS + 1):
+            pygame.draw.line(self.background, FONT_COLOR, (col * CELL_SIZE, BOARD_TOP), (col * CELL_SIZE, HEIGHT), 2)
+        for col in range(COLS):
+            col_text = self.text(str(col + 1))
+            self.background.blit(col_text, col_text.get_rect(center=(col * CELL_SIZE + CELL_SIZE // 2, CELL_SIZE * 1.5)))
+
+        self.discs = {}
+        for player, color in (('X', PLAYER1_COLOR), ('O', PLAYER2_COLOR)):
+            disc = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.circle(disc, color, (CELL_SIZE // 2, CELL_SIZE // 2), CELL_SIZE // 2 - 5)
+            self.discs[player] = disc.convert_alpha()
+
+        self.falling = None
+        self.invalidate()
+
+    def text(self, text, color=FONT_COLOR, background=None, font=None):
+        """
+        Returns the surface of a text, rendering it only the first time.
+
+        Parameters:
+            text (str): The text.
+            color (tuple): The text color.
+            background (tuple or None): The color behind the text, transparent if None.
+            font (pygame.font.Font): The font, the label font if None.
+
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        font = font or self.font
+        key = (text, color, background, font)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = font.render(text, True, color, background) if background else font.render(text, True, color)
+            self._texts[key] = surface
+        return surface
+
+    def invalidate(self):
+        """
+        Forces the next frame to redraw the whole screen, for example after a menu or an overlay was drawn over it.
+        """
+        self.board = None
+        self.header = None
+        self.status = None
+        self.scores = None
+
+    def cell_rect(self, col, row):
+        """
+        Returns the screen rectangle of a cell, row 0 being the top row.
+        """
+        return pygame.Rect(col * CELL_SIZE, BOARD_TOP + row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    def _draw_cell(self, col, row, player):
+        rect = self.cell_rect(col, row)
+        self.screen.blit(self.background, rect, rect)
+        if player in self.discs:
+            self.screen.blit(self.discs[player], rect)
+        return rect
+
+    def _draw_labels(self, labels, highlighted):
+        self.screen.blit(self.background, self.labels_rect, self.labels_rect)
+        for index, (label, x) in enumerate(zip(labels, (CELL_SIZE * COLS // 4, CELL_SIZE * 3 * COLS // 4))):
+            label_text = self.text(label)
+            label_rect = label_text.get_rect(center=(x, CELL_SIZE // 2))
+            if index == highlighted:
+                pygame.draw.rect(self.screen, HIGHLIGHT_COLOR, label_rect.inflate(10, 5), 0)
+            self.screen.blit(label_text, label_rect)
+        return self.labels_rect
+
+    def _draw_status(self, status):
+        self.screen.blit(self.background, self.status_rect, self.status_rect)
+        if status:
+            # Not cached: the status changes with every frame of a search
+            status_text = self.font.render(status, True, FONT_COLOR, BACKGROUND_COLOR)
+            self.screen.blit(status_text, status_text.get_rect(center=self.status_rect.center))
+        return self.status_rect
+
+    def _draw_scores(self, scores, best):
+        self.screen.blit(self.background, self.scores_rect, self.scores_rect)
+        for col, score in enumerate(scores or ()):
+            if score is not None:
+                background = HIGHLIGHT_COLOR if col == best else None
+                score_text = self.text(score, FONT_COLOR, background, self.scores_font)
+                center = (col * CELL_SIZE + CELL_SIZE // 2, self.scores_rect.centery)
+                self.screen.blit(score_text, score_text.get_rect(center=center))
+        return self.scores_rect
+
+    def draw(self, game, labels, highlighted, status=None, scores=None, best=None):
+        """
+        Draws what changed since the last frame.
+
+        Parameters:
+            game (ConnectFour): The game to draw.
+            labels (tuple): The names of Player 1 and Player 2.
+            highlighted (int or None): The index of the name to highlight, the player to move.
+            status (str or None): A line of text shown between the names and the column numbers.
+            scores (tuple or None): The text shown under every column number, None for none.
+            best (int or None): The column whose text is highlighted.
+
+        Returns:
+            list: The rectangles of the screen that changed, for `pygame.display.update`.
+        """
+        board = game.board
+        header = (tuple(labels), highlighted)
+        column_scores = (tuple(scores), best) if scores is not None else None
+
+        if self.board is None:
+            self.screen.blit(self.background, (0, 0))
+            self._draw_labels(*header)
+            self._draw_status(status)
+            if column_scores is not None:
+                self._draw_scores(*column_scores)
+            for row, cells in enumerate(board):
+                for col, player in enumerate(cells):
+                    if player in self.discs:
+                        self.screen.blit(self.discs[player], self.cell_rect(col, row))
+            self.board, self.header, self.status, self.scores = board, header, status, column_scores
+            self.falling = None
+            return [self.screen.get_rect()]
+
+        dirty = self.end_falling_disc()
+        if header != self.header:
+            dirty.append(self._draw_labels(*header))
+            self.header = header
+        if status != self.status:
+            dirty.append(self._draw_status(status))
+            self.status = status
+        if column_scores != self.scores:
+            dirty.append(self._draw_scores(*(column_scores or (None, None))))
+            self.scores = column_scores
+        if board is not self.board and board != self.board:
+            for row, (cells, old_cells) in enumerate(zip(board, self.board)):
+                if cells != old_cells:
+                    for col, (player, old_player) in enumerate(zip(cells, old_cells)):
+                        if player != old_player:
+                            dirty.append(self._draw_cell(col, row, player))
+            self.board = board
+        return dirty
+
+    def draw_falling_disc(self, col, row, player):
+        """
+        Moves the falling disc of the drop animation to a cell, restoring the cell it was over before.
+
+        Parameters:
+            col (int): The column of the disc.
+            row (int): The row of the disc, 0 being the top row.
+            player (str): The player of the disc ('X' or 'O').
+
+        Returns:
+            list: The rectangles of the screen that changed.
+        """
+        dirty = self.end_falling_disc()
+        rect = self.cell_rect(col, row)
+        self.screen.blit(self.discs[player], rect)
+        self.falling = (col, row)
+        return dirty + [rect]
+
+    def end_falling_disc(self):
+        """
+        Restores the cell under the falling disc of the drop animation, if any.
+
+        Returns:
+            list: The rectangles of the screen that changed.
+        """
+        if self.falling is None or self.board is None:
+            self.falling = None
+            return []
+        col, row = self.falling
+        self.falling = None
+        return [self._draw_cell(col, row, self.board[row][col])]
@@ -0,0 +1,113 @@
+import time
+
+
+WIN_SCORE = 100_000
+CHECK_INTERVAL = 256  # Nodes searched between two budget checks
+ASPIRATION_WINDOW = 10  # Half width of the window searched around an expected score, two evaluation steps
+
+
+class SearchTimeout(Exception):
+    """
+    Raised from inside a search when its time or node budget has run out.
+    """
+
+
+class SearchBudget:
+    """
+    Time and node limits of a single choose_move call.
+
+    Parameters:
+        time_limit_ms (float or None): Wall-clock budget in milliseconds, None for no limit.
+        node_limit (int or None): Maximum number of nodes to search, None for no limit.
+        stop_event (threading.Event or None): Stops the search as soon as it is set, e.g. from another thread.
+
+    Methods:
+        check(nodes): Raises SearchTimeout if the budget has run out.
+        elapsed_ms(): Returns the time spent since the budget was created.
+    """
+
+    def __init__(self, time_limit_ms=None, node_limit=None, stop_event=None):
+        """
+        Initialize the SearchBudget and start its clock.
+
+        Parameters:
+            time_limit_ms (float or None): Wall-clock budget in milliseconds, None for no limit.
+            node_limit (int or None): Maximum number of nodes to search, None for no limit.
+            stop_event (threading.Event or None): Stops the search as soon as it is set, e.g. from another thread.
+        """
+        self.start = time.perf_counter()
+        self.deadline = None if time_limit_ms is None else self.start + time_limit_ms / 1000
+        self.node_limit = node_limit
+        self.stop_event = stop_event
+
+    def check(self, nodes):
+        """
+        Raises SearchTimeout if the budget has run out.
+
+        Parameters:
+            nodes (int): The number of nodes searched so far.
+        """
+        if self.node_limit is not None and nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+
+    @property
+    def stopped(self):
+        """
+        Whether the search was stopped through `stop_event`.
+
+        Returns:
+            bool: True if the stop event is set.
+        """
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def elapsed_ms(self):
+        """
+        Returns the time spent since the budget was created.
+
+        Returns:
+            float: Elapsed wall-clock time in milliseconds.
+        """
+        return (time.perf_counter() - self.start) * 1000
+
+
+class SearchInfo:
+    """
+    Report of a single choose_move call.
+
+    Attributes:
+        move (int or None): The chosen column.
+        score (int or None): The score of the chosen move, positive when good for 'O'.
+        depth (int): The deepest fully completed search depth.
+        nodes (int): The number of nodes searched, including unfinished iterations.
+        elapsed_ms (float): Wall-clock time of the call in milliseconds.
+    """
+
+    def __init__(self, move, score, depth, nodes, elapsed_ms):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed_ms = elapsed_ms
+
+    def as_dict(self):
+        """
+        Returns the report as a dictionary.
+
+        Returns:
+            dict: The report fields.
+        """
+        return {
+            'move': self.move,
+            'score': self.score,
+            'depth': self.depth,
+            'nodes': self.nodes,
+            'elapsed_ms': round(self.elapsed_ms, 3),
+        }
+
+    def __repr__(self):
+        return (f"SearchInfo(move={self.move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, elapsed_ms={self.elapsed_ms:.1f})")
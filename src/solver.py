@@ -0,0 +1,637 @@
+import argparse
+import os
+import struct
+import sys
+
+from specs import ROWS, COLS
+from game import ConnectFour
+from records import from_digits
+from geometry import get_geometry
+from evaluation import popcount
+from search import SearchBudget, SearchInfo, SearchTimeout, CHECK_INTERVAL
+
+
+DEFAULT_TT_SIZE = (1 << 20) + 7  # An odd size spreads the position keys better
+
+BOOK_MAGIC = b'C4BK'
+BOOK_HEADER = struct.Struct('<4sBBBBI')  # magic, version, rows, cols, max moves, entry count
+BOOK_RECORD = struct.Struct('<Qb')  # position key, score
+BOOK_VERSION = 2
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+
+class Solver:
+    """
+    Perfect-play solver computing the exact game-theoretic score of Connect Four positions.
+
+    Positions are searched with negamax over two integers: the discs of the player to move and the mask
+    of all discs. The score of a position is positive when the player to move wins, and equals the number
+    of their discs still unplayed when they connect four, so faster wins score higher; 0 is a draw.
+    The exact score is found by bisecting it with null-window searches, each pruned by a transposition
+    table of score bounds, a center-first order favouring moves that create threats, and by never
+    playing a move that lets the opponent win right away.
+
+    Parameters:
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+        tt_size (int): The number of slots in the transposition table.
+        book (OpeningBook): Known scores of opening positions, looked up before searching.
+
+    Attributes:
+        nodes (int): The number of positions searched since the counter was last reset.
+        book (OpeningBook or None): Known scores of opening positions.
+        budget (SearchBudget or None): Limits checked while searching, raising SearchTimeout.
+
+    Methods:
+        solve(position, mask, moves): Returns the exact score of a position.
+        best_move(game): Returns the best column and the exact score of a game.
+        analyze(game): Returns the exact score of every column of a game.
+        negamax(position, mask, moves, alpha, beta): Searches a position within a score window.
+        winning_cells(position, mask): Returns the empty cells completing four for the given discs.
+        reset(): Empties the transposition table.
+    """
+
+    def __init__(self, rows=ROWS, cols=COLS, tt_size=DEFAULT_TT_SIZE, book=None):
+        """
+        Initialize the Solver.
+
+        Parameters:
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
+            tt_size (int): The number of slots in the transposition table.
+            book (OpeningBook): Known scores of opening positions, looked up before searching.
+        """
+        geometry = get_geometry(rows, cols)
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.col_height = geometry.col_height
+        self.board_mask = geometry.board_mask
+        self.bottom_mask = sum(1 << geometry.cell(col, 0) for col in range(cols))
+        self.column_masks = [((1 << rows) - 1) << geometry.cell(col, 0) for col in range(cols)]
+        self.column_order = sorted(range(cols), key=lambda col: abs(col - (cols - 1) / 2))
+        self.line_steps = tuple((step, 2 * step, 3 * step) for step in geometry.steps[1:])
+        self.tt_size = tt_size
+        self.book = book
+        self.nodes = 0
+        self.budget = None
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the transposition table.
+        """
+        self.tt_keys = [None] * self.tt_size
+        self.tt_values = [0] * self.tt_size
+
+    def winning_cells(self, position, mask):
+        """
+        Returns the empty cells where the owner of `position` would connect four.
+
+        Parameters:
+            position (int): Bitboard of one player's discs.
+            mask (int): Bitboard of all discs.
+
+        Returns:
+            int: Bitboard of the winning cells, playable now or not.
+        """
+        # Vertical: three discs right below
+        cells = (position << 1) & (position << 2) & (position << 3)
+
+        # Horizontal and diagonals: two discs on one side and a third on either side
+        for step, double, triple in self.line_steps:
+            left_1, right_1 = position << step, position >> step
+            left_pair = left_1 & (position << double)
+            right_pair = right_1 & (position >> double)
+            cells |= (left_pair & ((position << triple) | right_1)) | (right_pair & ((position >> triple) | left_1))
+
+        return cells & (self.board_mask ^ mask)
+
+    def negamax(self, position, mask, moves, alpha, beta):
+        """
+        Searches a position within the (alpha, beta) score window.
+
+        The player to move must not be able to win with their next move.
+
+        Parameters:
+            position (int): Bitboard of the discs of the player to move.
+            mask (int): Bitboard of all discs.
+            moves (int): The number of discs on the board.
+            alpha (int): Lower end of the window.
+            beta (int): Upper end of the window.
+
+        Returns:
+            int: The exact score if it lies inside the window, otherwise a bound on the side it fell.
+        """
+        self.nodes += 1
+        if self.budget is not None and self.nodes % CHECK_INTERVAL == 0:
+            self.budget.check(self.nodes)
+
+        cells = self.cells
+        possible = (mask + self.bottom_mask) & self.board_mask
+        opponent_win = self.winning_cells(position ^ mask, mask)
+
+        # Block a single threat; two threats cannot both be blocked
+        forced = possible & opponent_win
+        if forced:
+            if forced & (forced - 1):
+                return -((cells - moves) // 2)
+            possible = forced
+
+        # Never play right below a cell where the opponent would win
+        possible &= ~(opponent_win >> 1)
+        if not possible:
+            return -((cells - moves) // 2)
+
+        if moves >= cells - 2:
+            return 0
+
+        # The opponent cannot win with their next move, so we cannot lose faster than that
+        lowest = -((cells - 2 - moves) // 2)
+        if alpha < lowest:
+            alpha = lowest
+            if alpha >= beta:
+                return alpha
+
+        highest = (cells - 1 - moves) // 2
+        if beta > highest:
+            beta = highest
+            if alpha >= beta:
+                return beta
+
+        key = position + mask
+        index = key % self.tt_size
+        if self.tt_keys[index] == key:
+            value = self.tt_values[index]
+            bound = value >> 1
+            if value & 1:
+                if alpha < bound:
+                    alpha = bound
+                    if alpha >= beta:
+                        return alpha
+            elif beta > bound:
+                beta = bound
+                if alpha >= beta:
+                    return beta
+
+        if self.book is not None and moves <= self.book.max_moves:
+            score = self.book.get(key)
+            if score is not None:
+                return score
+
+        # Moves creating the most winning cells first; the sort is stable, so center first among equals
+        candidates = []
+        for col in self.column_order:
+            move = possible & self.column_masks[col]
+            if move:
+                candidates.append((popcount(self.winning_cells(position | move, mask)), move))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        opponent = position ^ mask
+        for _, move in candidates:
+            score = -self.negamax(opponent, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                self.tt_keys[index] = key
+                self.tt_values[index] = score * 2 + 1
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.tt_keys[index] = key
+        self.tt_values[index] = alpha * 2
+        return alpha
+
+    def search(self, position, mask, moves, alpha, beta):
+        """
+        Searches a position within a score window, first checking for a win with the next move.
+
+        Parameters:
+            position (int): Bitboard of the discs of the player to move.
+            mask (int): Bitboard of all discs.
+            moves (int): The number of discs on the board.
+            alpha (int): Lower end of the window.
+            beta (int): Upper end of the window.
+
+        Returns:
+            int: The exact score if it lies inside the window, otherwise a bound on the side it fell.
+        """
+        possible = (mask + self.bottom_mask) & self.board_mask
+        if self.winning_cells(position, mask) & possible:
+            return (self.cells + 1 - moves) // 2
+        if moves == self.cells:
+            return 0
+        return self.negamax(position, mask, moves, alpha, beta)
+
+    def solve(self, position, mask, moves):
+        """
+        Returns the exact score of a position by bisecting it with null-window searches.
+
+        Parameters:
+            position (int): Bitboard of the discs of the player to move.
+            mask (int): Bitboard of all discs.
+            moves (int): The number of discs on the board.
+
+        Returns:
+            int: The score, positive if the player to move wins, negative if they lose, 0 for a draw.
+        """
+        possible = (mask + self.bottom_mask) & self.board_mask
+        if self.winning_cells(position, mask) & possible:
+            return (self.cells + 1 - moves) // 2
+        if moves == self.cells:
+            return 0
+
+        low = -((self.cells - moves) // 2)
+        high = (self.cells + 1 - moves) // 2
+        while low < high:
+            middle = low + (high - low) // 2
+            # Probe closer to 0 first, where the scores of most positions are
+            if middle <= 0 and low // 2 < middle:
+                middle = low // 2
+            elif middle >= 0 and high // 2 > middle:
+                middle = high // 2
+
+            result = self.negamax(position, mask, moves, middle, middle + 1)
+            if result <= middle:
+                high = result
+            else:
+                low = result
+        return low
+
+    def best_move(self, game):
+        """
+        Returns the best column and the exact score of a game.
+
+        Parameters:
+            game (ConnectFour): The position to solve. It must not be over.
+
+        Returns:
+            tuple: The best column and the score for the player to move.
+
+        Raises:
+            ValueError: If the game is not four in a row on the solver's board size.
+        """
+        if (game.rows, game.cols, game.connect) != (self.rows, self.cols, 4):
+            raise ValueError(f"The solver plays four in a row on {self.rows}x{self.cols} boards only.")
+
+        position, mask, moves = game.bitboards[game.turn], game.mask, game.move_count
+        possible = (mask + self.bottom_mask) & self.board_mask
+
+        winning = self.winning_cells(position, mask) & possible
+        for col in self.column_order:
+            if winning & self.column_masks[col]:
+                return col, (self.cells + 1 - moves) // 2
+
+        score = self.solve(position, mask, moves)
+
+        # The first move whose reply cannot hold the opponent above -score is a best move
+        fallback = None
+        for col in self.column_order:
+            move = possible & self.column_masks[col]
+            if not move:
+                continue
+            fallback = col if fallback is None else fallback
+            reply = self.search(position ^ mask, mask | move, moves + 1, -score, -score + 1)
+            if -reply >= score:
+                return col, score
+        return fallback, score
+
+    def analyze(self, game):
+        """
+        Returns the exact score of every column of a game, all solved with the same transposition table.
+
+        Parameters:
+            game (ConnectFour): The position to solve.
+
+        Returns:
+            list: The score of every column for the player to move, None for full columns or if the game is over.
+
+        Raises:
+            ValueError: If the game is not four in a row on the solver's board size.
+        """
+        if (game.rows, game.cols, game.connect) != (self.rows, self.cols, 4):
+            raise ValueError(f"The solver plays four in a row on {self.rows}x{self.cols} boards only.")
+
+        scores = [None] * self.cols
+        if game.is_terminal:
+            return scores
+
+        position, mask, moves = game.bitboards[game.turn], game.mask, game.move_count
+        possible = (mask + self.bottom_mask) & self.board_mask
+        winning = self.winning_cells(position, mask) & possible
+        symmetric = game.is_symmetric
+        for col in self.column_order:
+            move = possible & self.column_masks[col]
+            if not move or (symmetric and col > self.cols - 1 - col):
+                continue
+            if winning & move:
+                scores[col] = (self.cells + 1 - moves) // 2
+            else:
+                scores[col] = -self.solve(position ^ mask, mask | move, moves + 1)
+            if symmetric:
+                scores[self.cols - 1 - col] = scores[col]
+        return scores
+
+
+class OpeningBook:
+    """
+    Exact scores of opening positions, stored in a compact sorted binary file.
+
+    The file starts with a header (magic, version, board size and the deepest ply stored) followed by
+    one fixed-width `(key, score)` record per position, sorted by key. Keys are `Solver` position keys,
+    the discs of the player to move plus the mask of all discs. A position and its mirror image have the
+    same score, so only the smaller of their two keys is stored.
+
+    Parameters:
+        rows (int): The number of rows of the board the book is for.
+        cols (int): The number of columns of the board the book is for.
+        max_moves (int): Positions with up to this many discs are stored.
+        entries (dict): Scores by position key.
+
+    Methods:
+        get(key): Returns the stored score of a position.
+        load(path): Reads a book file.
+        save(path): Writes the book to a file.
+        build(max_moves, solver): Solves every position up to a number of discs.
+    """
+
+    def __init__(self, rows=ROWS, cols=COLS, max_moves=0, entries=None):
+        self.rows = rows
+        self.cols = cols
+        self.max_moves = max_moves
+        self.entries = entries if entries is not None else {}
+        self.geometry = get_geometry(rows, cols)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns the stored score of a position, looking it up by the smaller of its key and its mirror key.
+
+        Parameters:
+            key (int): The position key.
+
+        Returns:
+            int or None: The exact score, or None if the position is not in the book.
+        """
+        return self.entries.get(min(key, self.geometry.mirror(key)))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a book file.
+
+        Parameters:
+            path (str): The path of the book file.
+
+        Returns:
+            OpeningBook: The loaded book.
+        """
+        with open(path, 'rb') as book_file:
+            data = book_file.read()
+
+        magic, version, rows, cols, max_moves, count = BOOK_HEADER.unpack_from(data)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"{path} is not an opening book file.")
+
+        entries = dict(BOOK_RECORD.iter_unpack(data[BOOK_HEADER.size:BOOK_HEADER.size + count * BOOK_RECORD.size]))
+        return cls(rows, cols, max_moves, entries)
+
+    def save(self, path):
+        """
+        Writes the book to a file.
+
+        Parameters:
+            path (str): The path of the book file.
+        """
+        with open(path, 'wb') as book_file:
+            book_file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, self.rows, self.cols,
+                                             self.max_moves, len(self.entries)))
+            for key in sorted(self.entries):
+                book_file.write(BOOK_RECORD.pack(key, self.entries[key]))
+
+    @classmethod
+    def build(cls, max_moves, solver, progress=None):
+        """
+        Solves every position reachable with up to `max_moves` discs, skipping finished games and mirror images.
+
+        Parameters:
+            max_moves (int): The deepest ply to store.
+            solver (Solver): The solver used for every position.
+            progress (callable): Called with the number of positions solved so far and the total.
+
+        Returns:
+            OpeningBook: The new book.
+        """
+        book = cls(solver.rows, solver.cols, max_moves)
+        positions = {}
+        layer = {0: ConnectFour(solver.rows, solver.cols)}
+        for _ in range(max_moves + 1):
+            next_layer = {}
+            for game in layer.values():
+                key = game.bitboards[game.turn] + game.mask
+                positions[min(key, book.geometry.mirror(key))] = game
+                for col in range(game.cols):
+                    if game.is_valid_move(col):
+                        child = game.copy()
+                        child.play(col)
+                        if not child.is_terminal:
+                            next_layer[child.canonical_key] = child
+            layer = next_layer
+            if not layer:
+                break
+
+        # Deeper positions first, so earlier entries speed up the shallower ones
+        ordered = sorted(positions.items(), key=lambda item: -item[1].move_count)
+        for done, (key, game) in enumerate(ordered, 1):
+            book.entries[key] = solver.solve(game.bitboards[game.turn], game.mask, game.move_count)
+            if progress is not None:
+                progress(done, len(ordered))
+        return book
+
+
+class SolverAiBot:
+    """
+    AI bot playing perfectly by solving the position exactly.
+
+    Opening positions are taken from the opening book when one is given. Without a book, early positions
+    can take very long to solve in Python, so a time limit can hand them to a heuristic fallback bot.
+
+    The default book, `opening_book.bin` next to this file, is not shipped: `python solver.py book` builds it,
+    solving every position of the first plies, which takes hours in Python. Without it, most positions of the first
+    dozen moves of the standard board, and some later ones, take seconds to minutes to solve, so with a time limit they are
+    played by the fallback bot, `solved` being False and the depth 0 in `last_search`. Only the later moves
+    are then perfect; without a time limit every move is, however long it takes.
+
+    Parameters:
+        book (OpeningBook or str): The opening book or the path of a book file, ignored if the file does not exist.
+        time_limit_ms (float): Time budget per move before falling back, None to always solve.
+        fallback (object): The bot used when the budget runs out, an AlphaBetaAiBot if None.
+
+    Attributes:
+        solver (Solver): The solver, keeping its transposition table between moves.
+        book (OpeningBook or None): The opening book, None if the book file does not exist.
+        last_search (SearchInfo or None): Score, nodes and time of the last choose_move call.
+        solved (bool): Whether the last move came from the solver rather than the fallback bot.
+        stop_event (threading.Event or None): Set from another thread to stop the current search early.
+
+    Methods:
+        choose_move(game): Chooses the best move for the player to move.
+        analyze(game): Scores every column of a position.
+    """
+
+    def __init__(self, book=DEFAULT_BOOK_PATH, time_limit_ms=None, fallback=None):
+        """
+        Initialize the SolverAiBot.
+
+        Parameters:
+            book (OpeningBook or str): The opening book or the path of a book file, ignored if the file does not exist.
+            time_limit_ms (float): Time budget per move before falling back, None to always solve.
+            fallback (object): The bot used when the budget runs out, an AlphaBetaAiBot if None.
+        """
+        if isinstance(book, str):
+            book = OpeningBook.load(book) if os.path.exists(book) else None
+
+        if fallback is None and time_limit_ms is not None:
+            from alphabeta import AlphaBetaAiBot
+            fallback = AlphaBetaAiBot(max_depth=8)
+
+        self.book = book
+        self.solver = Solver(book=book)
+        self.time_limit_ms = time_limit_ms
+        self.fallback = fallback
+        self.last_search = None
+        self.solved = False
+        self.stop_event = None
+
+    @property
+    def nodes(self):
+        """
+        The number of positions searched by the current or last solve.
+        """
+        return self.solver.nodes
+
+    def choose_move(self, game):
+        """
+        Chooses the best move for the player to move.
+
+        Parameters:
+            game (ConnectFour): The current state of the Connect Four game.
+
+        Returns:
+            int or None: The chosen column, or None if the game is over or the search was stopped.
+        """
+        budget = SearchBudget(self.time_limit_ms, stop_event=self.stop_event)
+        self.solver.nodes = 0
+
+        if game.is_terminal:
+            self.last_search = SearchInfo(None, None, 0, 0, budget.elapsed_ms())
+            return None
+
+        self.solver.budget = budget if self.time_limit_ms is not None or self.stop_event is not None else None
+        try:
+            move, score = self.solver.best_move(game)
+            self.solved = True
+        except SearchTimeout:
+            if budget.stopped:
+                move = None
+            else:
+                self.fallback.stop_event = self.stop_event
+                try:
+                    move = self.fallback.choose_move(game)
+                finally:
+                    self.fallback.stop_event = None
+            score = None
+            self.solved = False
+        finally:
+            self.solver.budget = None
+
+        # Reported like the other bots: positive when good for 'O'
+        if score is not None and game.turn == 0:
+            score = -score
+        depth = game.rows * game.cols - game.move_count if self.solved else 0
+        self.last_search = SearchInfo(move, score, depth, self.solver.nodes, budget.elapsed_ms())
+        return move
+
+    def analyze(self, game):
+        """
+        Scores every column of a position, exactly when the solver finishes within the budget.
+
+        When the budget runs out, the columns are scored by the fallback bot instead if it can
+        analyze positions, see `AlphaBetaAiBot.analyze`. The best column is reported in `last_search`.
+
+        Parameters:
+            game (ConnectFour): The current state of the Connect Four game.
+
+        Returns:
+            list: The score of every column, positive when good for 'O' as with the other bots,
+            None for full columns or when no score is known.
+        """
+        budget = SearchBudget(self.time_limit_ms, stop_event=self.stop_event)
+        self.solver.nodes = 0
+        self.solver.budget = budget if self.time_limit_ms is not None or self.stop_event is not None else None
+        try:
+            scores = self.solver.analyze(game)
+            if game.turn == 0:
+                scores = [None if score is None else -score for score in scores]
+            self.solved = True
+        except SearchTimeout:
+            scores = [None] * game.cols
+            if not budget.stopped and hasattr(self.fallback, 'analyze'):
+                self.fallback.stop_event = self.stop_event
+                try:
+                    scores = self.fallback.analyze(game)
+                finally:
+                    self.fallback.stop_event = None
+            self.solved = False
+        finally:
+            self.solver.budget = None
+
+        move, score = None, None
+        for col in self.solver.column_order:
+            if scores[col] is not None and (score is None or (scores[col] > score if game.turn == 1 else scores[col] < score)):
+                move, score = col, scores[col]
+        depth = game.rows * game.cols - game.move_count if self.solved else 0
+        self.last_search = SearchInfo(move, score, depth, self.solver.nodes, budget.elapsed_ms())
+        return scores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve Connect Four positions or build an opening book.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    solve_parser = subparsers.add_parser('solve', help="Solve positions given as strings of 1-based columns.")
+    solve_parser.add_argument('positions', nargs='+')
+    solve_parser.add_argument('--book', help="Opening book file to use.")
+
+    book_parser = subparsers.add_parser('book', help="Build an opening book.")
+    book_parser.add_argument('output', nargs='?', default=DEFAULT_BOOK_PATH)
+    book_parser.add_argument('--max-moves', type=int, default=4)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'solve':
+        book = OpeningBook.load(args.book) if args.book else None
+        solver = Solver(book=book)
+        for moves in args.positions:
+            try:
+                game = ConnectFour.from_moves(from_digits(moves))
+            except ValueError as error:
+                parser.error(f"{moves}: {error}")
+            if game.is_terminal:
+                parser.error(f"{moves}: the game is already over.")
+            solver.nodes = 0
+            col, score = solver.best_move(game)
+            print(f"{moves or '-'}: score {score}, best column {col + 1}, {solver.nodes} nodes")
+    else:
+        def progress(done, total):
+            print(f"\rSolved {done}/{total} positions", end='', file=sys.stderr, flush=True)
+
+        book = OpeningBook.build(args.max_moves, Solver(), progress)
+        print(file=sys.stderr)
+        book.save(args.output)
+        print(f"Wrote {len(book)} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
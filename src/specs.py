@@ -1,5 +1,6 @@
 WIDTH, HEIGHT = 700, 800
 ROWS, COLS = 6, 7
+CONNECT = 4  # Discs in a row needed to win
 CELL_SIZE = 100
 PLAYER1_COLOR = (255, 69, 58) 
 PLAYER2_COLOR = (0, 122, 255)  
@@ -0,0 +1,648 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from specs import ROWS, COLS, CONNECT
+from game import ConnectFour
+from geometry import get_geometry
+from records import from_digits, read_games
+from search import WIN_SCORE
+from threats import line_cells
+
+
+TABLE_MAGIC = b'C4TB'
+TABLE_HEADER = struct.Struct('<4sBBBBB7xQ')  # magic, version, rows, cols, connect, max empty cells, padding, positions
+TABLE_SECTION = struct.Struct('<QQ')  # file offset and number of positions of one number of empty cells
+TABLE_VERSION = 2
+KEY_BITS = 64  # Width of the keys of the sorted index
+DEFAULT_MAX_EMPTY = 12
+DEFAULT_ROOTS = 1000
+DEFAULT_CHUNK_SIZE = 4096
+DEFAULT_TABLEBASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'endgame_table.bin')
+
+# Outcomes for the player to move, in the two low bits of an entry; the other six hold the distance
+UNKNOWN, DRAW, WIN, LOSS = 0, 1, 2, 3
+OUTCOME_NAMES = {DRAW: 'draw', WIN: 'win', LOSS: 'loss'}
+
+
+def check_key_bits(rows, cols):
+    """
+    Raises ValueError if the position keys of a board do not fit the keys of the index.
+
+    A key is the discs of the player to move plus the mask of all discs, with one bit per cell and one on top
+    of every column, see `Solver`.
+    """
+    bits = cols * (rows + 1)
+    if bits > KEY_BITS:
+        raise ValueError(f"Position keys of a {rows}x{cols} board take {bits} bits, a tablebase holds at most {KEY_BITS}.")
+
+
+def _read_keys(data, offset, count):
+    """
+    Returns the sorted keys of a section as a sequence `bisect` can search, without copying them if possible.
+    """
+    if sys.byteorder == 'little':
+        return memoryview(data)[offset:offset + 8 * count].cast('Q')
+    keys = array('Q', data[offset:offset + 8 * count])
+    keys.byteswap()
+    return keys
+
+
+class Tablebase:
+    """
+    Exact results of endgame positions, every position with at most `max_empty` empty cells reachable from
+    a set of root positions, built by `generate`.
+
+    The file starts with a header (magic, version, board size, max empty cells and number of positions) and
+    a table of sections, one per number of empty cells. A section holds the keys of its positions, sorted,
+    followed by one entry byte per key. A key is the discs of the player to move plus the mask of all discs,
+    as the solver keys positions, and a position and its mirror image share the smaller of their two keys.
+    The file is memory-mapped and a lookup is a binary search of the section of the position's number of
+    empty cells, so the table takes nine bytes per position and opening it costs nothing.
+
+    An entry holds the outcome for the player to move, WIN, DRAW or LOSS, in its two low bits, and the number
+    of plies left until the game ends with best play in the others: the winner wins as fast as they can and
+    the loser holds out as long as they can. Finished games are not stored.
+
+    Parameters:
+        path (str): The path of the tablebase file.
+
+    Attributes:
+        path (str): The path of the tablebase file.
+        rows (int): The number of rows of the board the table is for.
+        cols (int): The number of columns of the board the table is for.
+        connect (int): The number of discs in a row needed to win.
+        max_empty (int): The most empty cells of the positions stored.
+        count (int): The number of positions stored.
+
+    Methods:
+        probe(position, mask): Returns the outcome and distance of a position by bitboards.
+        lookup(game): Returns the outcome and distance of a game.
+        score(game): Returns the search score of a game, positive when good for 'O'.
+        section_size(empty): Returns the number of positions stored with a number of empty cells.
+        position(empty, index): Returns a position stored with a number of empty cells by its rank.
+        close(): Unmaps the file.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the Tablebase, mapping the file.
+
+        Parameters:
+            path (str): The path of the tablebase file.
+
+        Raises:
+            ValueError: If the file is not a tablebase file.
+        """
+        self.path = path
+        with open(path, 'rb') as table_file:
+            self._map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.rows, self.cols, self.connect, self.max_empty, self.count = \
+            TABLE_HEADER.unpack_from(self._map)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a tablebase file.")
+
+        # By number of empty cells: the sorted keys and the file offset of their entries
+        self._sections = []
+        for empty in range(self.max_empty + 1):
+            offset, count = TABLE_SECTION.unpack_from(self._map, TABLE_HEADER.size + empty * TABLE_SECTION.size)
+            self._sections.append((_read_keys(self._map, offset, count), offset + 8 * count))
+        self._cells = self.rows * self.cols
+        self._geometry = get_geometry(self.rows, self.cols)
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, empty, key):
+        keys, entries = self._sections[empty]
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return self._map[entries + index]
+        return UNKNOWN
+
+    def probe(self, position, mask):
+        """
+        Returns the outcome and distance of a position given by bitboards.
+
+        Parameters:
+            position (int): Bitboard of the discs of the player to move.
+            mask (int): Bitboard of all discs.
+
+        Returns:
+            tuple or None: The `(outcome, distance)` of the position for the player to move, or None if it is not stored.
+        """
+        empty = self._cells - bin(mask).count('1')
+        if empty > self.max_empty:
+            return None
+        key = position + mask
+        entry = self._entry(empty, min(key, self._geometry.mirror(key)))
+        if entry == UNKNOWN:
+            return None
+        return entry & 3, entry >> 2
+
+    def lookup(self, game):
+        """
+        Returns the outcome and distance of a game.
+
+        Parameters:
+            game (ConnectFour): The position to look up.
+
+        Returns:
+            tuple or None: The `(outcome, distance)` of the position for the player to move, or None if the game
+            is over, is not stored or is not played on the table's board.
+        """
+        if game.is_terminal or (game.rows, game.cols, game.connect) != (self.rows, self.cols, self.connect):
+            return None
+        empty = self._cells - game.move_count
+        if empty > self.max_empty:
+            return None
+        key = min(game.bitboards[game.turn] + game.mask, game.mirror_bitboards[game.turn] + game.mirror_mask)
+        entry = self._entry(empty, key)
+        if entry == UNKNOWN:
+            return None
+        return entry & 3, entry >> 2
+
+    def score(self, game):
+        """
+        Returns the search score of a game stored in the table, as the bots score positions.
+
+        Parameters:
+            game (ConnectFour): The position, not over.
+
+        Returns:
+            int or None: WIN_SCORE if 'O' wins with best play, -WIN_SCORE if 'X' does, 0 for a draw, None if not stored
+            or the game is not played on the table's board.
+        """
+        empty = self._cells - game.move_count
+        if empty > self.max_empty or game.geometry is not self._geometry or game.connect != self.connect:
+            return None
+        key = min(game.bitboards[game.turn] + game.mask, game.mirror_bitboards[game.turn] + game.mirror_mask)
+        outcome = self._entry(empty, key) & 3
+        if outcome == UNKNOWN:
+            return None
+        if outcome == DRAW:
+            return 0
+        return WIN_SCORE if (outcome == WIN) == (game.turn == 1) else -WIN_SCORE
+
+    def section_size(self, empty):
+        """
+        Returns the number of positions stored with a number of empty cells.
+
+        Parameters:
+            empty (int): The number of empty cells, at most `max_empty`.
+
+        Returns:
+            int: The number of positions.
+        """
+        return len(self._sections[empty][0])
+
+    def position(self, empty, index):
+        """
+        Returns a position stored with a number of empty cells, by its rank in key order.
+
+        Parameters:
+            empty (int): The number of empty cells, at most `max_empty`.
+            index (int): The rank of the position, below `section_size(empty)`.
+
+        Returns:
+            tuple: The `position` and `mask` bitboards of the position, the player to move's discs and all discs,
+            and its `(outcome, distance)`.
+        """
+        keys, entries = self._sections[empty]
+        key, col_height = keys[index], self._geometry.col_height
+        # Adding the bottom row turns every column into the mover's discs under a bit marking the height
+        marked, mask = key + self._geometry.bottom_mask, 0
+        for col in range(self.cols):
+            height = ((marked >> (col * col_height)) & ((1 << col_height) - 1)).bit_length() - 1
+            mask |= ((1 << height) - 1) << (col * col_height)
+        entry = self._map[entries + index]
+        return key - mask, mask, (entry & 3, entry >> 2)
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self._sections = []  # The key views hold on to the map
+        self._map.close()
+
+    def __getstate__(self):
+        # Other processes map the file themselves
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+
+_worker_size = None
+_worker_path = None
+_worker_map = None
+
+
+def _init_worker(path, size):
+    """
+    Remembers the tablebase file being generated in a worker process, mapped when it has sections to read.
+    """
+    global _worker_size, _worker_path, _worker_map
+    _worker_size, _worker_path, _worker_map = size, path, None
+
+
+def _worker_section(offset, count):
+    """
+    Returns the keys and the entries offset of a section written since the worker last mapped the file.
+    """
+    global _worker_map
+    if _worker_map is None or len(_worker_map) < offset + 9 * count:
+        with open(_worker_path, 'rb') as table_file:
+            _worker_map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return _read_keys(_worker_map, offset, count), offset + 8 * count
+
+
+def _expand_chunk(positions, masks):
+    """
+    Plays every move of positions inside a worker process, leaving out the moves that win.
+
+    Returns:
+        tuple: Arrays of the canonical key and the `position` bitboard, mirrored along with the key,
+        of every child not over, duplicates included.
+    """
+    rows, cols, connect = _worker_size
+    geometry = get_geometry(rows, cols)
+    board_mask, bottom_mask, mirror = geometry.board_mask, geometry.bottom_mask, geometry.mirror
+
+    keys, children = array('Q'), array('Q')
+    for position, mask in zip(positions, masks):
+        possible = (mask + bottom_mask) & board_mask
+        possible &= ~line_cells(position, board_mask ^ mask, geometry, connect)
+        child = position ^ mask
+        while possible:
+            move = possible & -possible
+            possible ^= move
+            key = child + (mask | move)
+            mirror_key = mirror(key)
+            if mirror_key < key:
+                keys.append(mirror_key)
+                children.append(mirror(child))
+            else:
+                keys.append(key)
+                children.append(child)
+    return keys, children
+
+
+def _solve_chunk(positions, masks, section):
+    """
+    Solves positions inside a worker process from the entries of their children, in the section written last.
+
+    Returns:
+        bytes: The entry of every position.
+    """
+    rows, cols, connect = _worker_size
+    geometry = get_geometry(rows, cols)
+    board_mask, bottom_mask, mirror = geometry.board_mask, geometry.bottom_mask, geometry.mirror
+    keys, entries_offset = _worker_section(*section) if section[1] else ((), 0)
+    data = _worker_map
+
+    entries = bytearray(len(positions))
+    for index, (position, mask) in enumerate(zip(positions, masks)):
+        possible = (mask + bottom_mask) & board_mask
+        if line_cells(position, board_mask ^ mask, geometry, connect) & possible:
+            entries[index] = WIN | 1 << 2
+            continue
+        win = loss = None
+        draw = False
+        child = position ^ mask
+        while possible:
+            move = possible & -possible
+            possible ^= move
+            if mask | move == board_mask:
+                draw = True  # The last cell, the game is over
+                continue
+            key = child + (mask | move)
+            key = min(key, mirror(key))
+            found = bisect_left(keys, key)
+            if found == len(keys) or keys[found] != key:
+                raise RuntimeError("A child position was not solved before its parent.")
+            entry = data[entries_offset + found]
+            outcome, distance = entry & 3, (entry >> 2) + 1
+            if outcome == LOSS:
+                win = distance if win is None else min(win, distance)
+            elif outcome == DRAW:
+                draw = True
+            else:
+                loss = distance if loss is None else max(loss, distance)
+
+        if win is not None:
+            entries[index] = WIN | win << 2
+        elif draw:
+            entries[index] = DRAW | (rows * cols - bin(mask).count('1')) << 2
+        else:
+            entries[index] = LOSS | loss << 2
+    return bytes(entries)
+
+
+def _chunks(positions, masks, chunk_size):
+    """
+    Splits the bitboards of a layer into chunks of `chunk_size` positions.
+
+    Returns:
+        tuple: The list of `positions` chunks and the list of `masks` chunks.
+    """
+    starts = range(0, len(positions), chunk_size)
+    return [positions[start:start + chunk_size] for start in starts], [masks[start:start + chunk_size] for start in starts]
+
+
+def random_roots(count, max_empty, size=(ROWS, COLS, CONNECT), seed=None):
+    """
+    Plays random games up to `max_empty` empty cells, like RandomAiBot, and returns the positions reached.
+
+    Parameters:
+        count (int): The number of positions.
+        max_empty (int): The number of empty cells of the positions.
+        size (tuple): The rows, columns and discs in a row needed to win.
+        seed (int): Seed of the random games.
+
+    Returns:
+        list: The positions, none of them over.
+    """
+    generator = random.Random(seed)
+    roots = []
+    while len(roots) < count:
+        game = ConnectFour(*size)
+        while game.rows * game.cols - game.move_count > max_empty and not game.is_terminal:
+            game.play(generator.choice([col for col in range(game.cols) if game.is_valid_move(col)]))
+        if not game.is_terminal:
+            roots.append(game)
+    return roots
+
+
+def archive_roots(path, max_empty, size=(ROWS, COLS, CONNECT)):
+    """
+    Returns the position of every game of an archive once it has `max_empty` empty cells, see `records.read_games`.
+    Games over or recorded on another board before that are left out.
+
+    Parameters:
+        path (str): The path of the archive.
+        max_empty (int): The number of empty cells of the positions.
+        size (tuple): The rows, columns and discs in a row needed to win, for text archives.
+
+    Returns:
+        list: The positions.
+    """
+    roots = []
+    for record in read_games(path, *size):
+        if (record.rows, record.cols, record.connect) != size:
+            continue
+        ply = record.rows * record.cols - max_empty
+        if len(record) >= ply:
+            game = record.game(ply)
+            if not game.is_terminal:
+                roots.append(game)
+    return roots
+
+
+def generate(path, max_empty=DEFAULT_MAX_EMPTY, size=(ROWS, COLS, CONNECT), roots=None, workers=1,
+             chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Builds a tablebase file by retrograde analysis.
+
+    Every position reachable from the roots is enumerated ply by ply, keeping those with at most `max_empty`
+    empty cells. Those are then solved from the fullest board back, each position from the entries of its
+    children in the section written just before: a position wins if a move wins at once or leads to a position
+    lost for the opponent, draws if a move leads to a draw, and loses otherwise. Both passes split every layer
+    into chunks searched by a pool of worker processes, which read the entries from the file being written.
+
+    From the empty board, the default root, every position of the board is stored, which is only feasible on
+    small boards: the standard board has billions of positions with a dozen empty cells. There, the roots are
+    positions of actual games with about `max_empty` empty cells, and the table holds all their endgames.
+
+    Parameters:
+        path (str): The path of the file, overwritten if it exists.
+        max_empty (int): The most empty cells of the positions to store.
+        size (tuple): The rows, columns and discs in a row needed to win.
+        roots (iterable): The positions, ConnectFour games on the same board, whose endgames are stored.
+        workers (int): The number of worker processes, 1 to generate in this process.
+        chunk_size (int): The number of positions sent to a worker at once.
+        progress (callable): Called with a message after every layer.
+
+    Returns:
+        list: The `{outcome: count}` of the positions stored, by number of empty cells.
+
+    Raises:
+        ValueError: If the keys of the board are too wide for the index.
+    """
+    rows, cols, connect = size
+    check_key_bits(rows, cols)
+    cells = rows * cols
+    max_empty = min(max_empty, cells)
+    geometry = get_geometry(rows, cols)
+
+    # Roots by number of discs, as (canonical key, position) like the expanded layers
+    pending = {}
+    for game in [ConnectFour(*size)] if roots is None else roots:
+        if not game.is_terminal:
+            position, key = game.bitboards[game.turn], game.bitboards[game.turn] + game.mask
+            if geometry.mirror(key) < key:
+                position, key = geometry.mirror(position), geometry.mirror(key)
+            pending.setdefault(game.move_count, {})[key] = position
+
+    section_table = TABLE_HEADER.size + (max_empty + 1) * TABLE_SECTION.size
+    with open(path, 'wb') as table_file:
+        table_file.write(bytes(section_table))
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(path, size))
+        run = executor.map
+    else:
+        _init_worker(path, size)
+        executor, run = None, map
+
+    try:
+        # Forward: every position not over, layer by layer of discs
+        layers = {}
+        layer = {}
+        for moves in range(min(pending, default=cells), cells):
+            layer.update(pending.pop(moves, {}))
+            keys = sorted(layer)  # Sections are searched by key
+            positions = array('Q', (layer[key] for key in keys))
+            masks = array('Q', (key - position for key, position in zip(keys, positions)))
+            if moves >= cells - max_empty:
+                layers[moves] = (positions, masks)
+                if progress is not None:
+                    progress(f"Enumerated {len(keys)} positions with {cells - moves} empty cells")
+            if moves == cells - 1 or not (keys or pending):
+                break  # Full boards are over
+            layer = {}
+            for children, child_positions in run(_expand_chunk, *_chunks(positions, masks, chunk_size)):
+                layer.update(zip(children, child_positions))
+
+        # Backward: the fullest positions first, each section appended to the file
+        counts = [{} for _ in range(max_empty + 1)]
+        sections = [(0, 0)] * (max_empty + 1)
+        section = (0, 0)
+        with open(path, 'r+b') as table_file:
+            for moves in sorted(layers, reverse=True):
+                positions, masks = layers.pop(moves)
+                entries = b''.join(run(_solve_chunk, *_chunks(positions, masks, chunk_size),
+                                       [section] * ((len(positions) + chunk_size - 1) // chunk_size)))
+                for entry in entries:
+                    counts[cells - moves][entry & 3] = counts[cells - moves].get(entry & 3, 0) + 1
+
+                keys = array('Q', (position + mask for position, mask in zip(positions, masks)))
+                if sys.byteorder != 'little':
+                    keys.byteswap()
+                table_file.seek(0, os.SEEK_END)
+                section = (table_file.tell(), len(keys))
+                table_file.write(keys.tobytes())
+                table_file.write(entries)
+                table_file.write(bytes(-len(entries) % 8))  # Keeps the next keys aligned
+                table_file.flush()
+                sections[cells - moves] = section
+                if progress is not None:
+                    progress(f"Solved {len(keys)} positions with {cells - moves} empty cells")
+
+            table_file.seek(0)
+            count = sum(count for _, count in sections)
+            table_file.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, rows, cols, connect, max_empty, count))
+            for section in sections:
+                table_file.write(TABLE_SECTION.pack(*section))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return counts
+
+
+def check(table, samples=1000, seed=None):
+    """
+    Checks a tablebase against the exact solver on positions drawn from it, and times its lookups.
+
+    The outcome and distance of every position drawn are compared with the score of `Solver.solve`.
+    The solver only plays Connect Four, so other tables are only timed.
+
+    Parameters:
+        table (Tablebase): The tablebase.
+        samples (int): The number of positions to check, drawn at random among all of them.
+        seed (int): Seed of the draw.
+
+    Returns:
+        dict: The positions `checked`, the `wrong` ones and the mean `lookup_us`, the time of a lookup in microseconds.
+    """
+    from solver import Solver
+
+    generator = random.Random(seed)
+    games = []
+    for index in sorted(generator.sample(range(len(table)), min(samples, len(table)))):
+        empty = 0
+        while index >= table.section_size(empty):
+            index -= table.section_size(empty)
+            empty += 1
+        position, mask, result = table.position(empty, index)
+        turn = bin(mask).count('1') % 2
+        bitboards = (position, position ^ mask) if turn == 0 else (position ^ mask, position)
+        games.append((ConnectFour.from_bitboards(bitboards, turn, table.rows, table.cols, table.connect), result))
+
+    start = time.perf_counter()
+    for game, _ in games:
+        table.lookup(game)
+    lookup_us = (time.perf_counter() - start) * 1e6 / max(1, len(games))
+
+    wrong = sum(table.lookup(game) != result for game, result in games)
+    if table.connect == 4:
+        solver = Solver(table.rows, table.cols)
+        cells = table.rows * table.cols
+        for game, (outcome, distance) in games:
+            score = solver.solve(game.bitboards[game.turn], game.mask, game.move_count)
+            if score == 0:
+                wrong += outcome != DRAW
+            else:
+                # A win of `distance` plies scores `(cells + 2 - moves - distance) // 2`, see `Solver.solve`
+                expected = WIN if score > 0 else LOSS
+                wrong += outcome != expected or (cells + 2 - game.move_count - distance) // 2 != abs(score)
+    return {'checked': len(games), 'wrong': wrong, 'lookup_us': lookup_us}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, check and query an endgame tablebase.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Solve the endgames of root positions and write a new table.")
+    build_parser.add_argument('output', nargs='?', default=DEFAULT_TABLEBASE_PATH)
+    build_parser.add_argument('--max-empty', type=int, default=DEFAULT_MAX_EMPTY, help="Most empty cells of the positions stored.")
+    build_parser.add_argument('--roots', type=int, default=DEFAULT_ROOTS,
+                              help="Random games whose endgames are stored, 0 for every position of the board.")
+    build_parser.add_argument('--archive', help="Game archive whose endgames are stored instead, see records.py.")
+    build_parser.add_argument('--seed', type=int, default=None)
+    build_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    build_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    build_parser.add_argument('--rows', type=int, default=ROWS)
+    build_parser.add_argument('--cols', type=int, default=COLS)
+    build_parser.add_argument('--connect', type=int, default=CONNECT)
+    build_parser.add_argument('--check', type=int, default=1000, help="Positions checked against the solver, 0 for none.")
+
+    check_parser = subparsers.add_parser('check', help="Check a table against the solver on stored positions.")
+    check_parser.add_argument('table', nargs='?', default=DEFAULT_TABLEBASE_PATH)
+    check_parser.add_argument('--samples', type=int, default=1000)
+    check_parser.add_argument('--seed', type=int, default=None)
+
+    lookup_parser = subparsers.add_parser('lookup', help="Show the results of positions given as 1-based columns.")
+    lookup_parser.add_argument('table')
+    lookup_parser.add_argument('positions', nargs='+')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        size = (args.rows, args.cols, args.connect)
+        try:
+            ConnectFour(*size)
+            check_key_bits(args.rows, args.cols)
+            if args.archive:
+                roots = archive_roots(args.archive, args.max_empty, size)
+            elif args.roots:
+                roots = random_roots(args.roots, args.max_empty, size, args.seed)
+            else:
+                roots = None
+            start = time.perf_counter()
+            counts = generate(args.output, args.max_empty, size, roots, args.workers, args.chunk_size,
+                              lambda message: print(message, file=sys.stderr))
+        except ValueError as error:
+            parser.error(str(error))
+        elapsed = time.perf_counter() - start
+
+        print(f"{'empty':>5} {'wins':>10} {'draws':>10} {'losses':>10}")
+        for empty, layer in enumerate(counts):
+            print(f"{empty:>5} {layer.get(WIN, 0):>10} {layer.get(DRAW, 0):>10} {layer.get(LOSS, 0):>10}")
+        stored = sum(sum(layer.values()) for layer in counts)
+        file_size = os.path.getsize(args.output)
+        print(f"Wrote {stored} positions to {args.output} in {elapsed:.1f} s: {file_size / 2 ** 20:.1f} MB, "
+              f"{file_size / max(1, stored):.1f} bytes per position")
+        args.table, args.samples = args.output, args.check
+
+    if args.command in ('build', 'check') and args.samples:
+        table = Tablebase(args.table)
+        result = check(table, args.samples, args.seed)
+        solved = "not checked, the solver only plays Connect Four" if table.connect != 4 else f"{result['wrong']} wrong"
+        print(f"Checked {result['checked']} positions ({solved}), {result['lookup_us']:.2f} us per lookup")
+    elif args.command == 'lookup':
+        table = Tablebase(args.table)
+        for moves in args.positions:
+            try:
+                game = ConnectFour.from_moves(from_digits(moves), table.rows, table.cols, table.connect)
+            except ValueError as error:
+                parser.error(f"{moves}: {error}")
+            result = table.lookup(game)
+            if result is None:
+                print(f"{moves or '-'}: not stored")
+            else:
+                outcome, distance = result
+                print(f"{moves or '-'}: {OUTCOME_NAMES[outcome]} for the player to move, game over in {distance} plies")
+
+
+if __name__ == "__main__":
+    main()
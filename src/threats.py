@@ -0,0 +1,107 @@
+WIN = 1  # The first column returned wins at once
+LOSS = -1  # Every column loses to the opponent's next move
+
+
+def line_cells(bits, empty, geometry, connect):
+    """
+    Returns the cells among `empty` that would connect `connect` discs with those of `bits`, playable now or not.
+
+    Parameters:
+        bits (int): Bitboard of the player's discs.
+        empty (int): Bitboard of the empty cells.
+        geometry (BoardGeometry): The geometry of the board.
+        connect (int): The number of discs in a row needed to win.
+
+    Returns:
+        int: Bitboard of the winning cells.
+    """
+    vertical, *steps = geometry.steps
+
+    if connect == 4:
+        # Unrolled version of the loops below, as in `Solver.winning_cells`
+        cells = (bits << 1) & (bits << 2) & (bits << 3)
+        for step in steps:
+            before_1, after_1 = bits << step, bits >> step
+            before_2 = before_1 & (bits << 2 * step)
+            after_2 = after_1 & (bits >> 2 * step)
+            cells |= (before_2 & ((bits << 3 * step) | after_1)) | (after_2 & ((bits >> 3 * step) | before_1))
+        return cells & empty
+
+    # Vertical: `connect - 1` discs right below, lines only fill from the bottom
+    length = connect - 1
+    cells = bits << vertical
+    for n in range(2, length + 1):
+        cells &= bits << (vertical * n)
+
+    # Horizontal and diagonals: `before[n]` has discs in the n cells before, `after[n]` in the n cells after
+    for step in steps:
+        before, after = [-1], [-1]  # Every bit set, narrowed down cell by cell
+        for n in range(1, length + 1):
+            before.append(before[-1] & (bits << (step * n)))
+            after.append(after[-1] & (bits >> (step * n)))
+        for gap in range(length + 1):
+            cells |= before[gap] & after[length - gap]
+    return cells & empty
+
+
+def winning_cells(game, player):
+    """
+    Returns the empty cells where a player would connect `connect` discs, playable now or not.
+
+    Parameters:
+        game (ConnectFour): The position.
+        player (int): The player. 0 for Player 1 (X), 1 for Player 2 (O).
+
+    Returns:
+        int: Bitboard of the winning cells.
+    """
+    return line_cells(game.bitboards[player], game.geometry.board_mask ^ game.mask, game.geometry, game.connect)
+
+
+def threat_moves(game, columns, replies=True):
+    """
+    Narrows the columns of a position down to those worth searching, from the immediate threats of both players.
+
+    A column winning at once is played alone. Otherwise, when the opponent threatens to win in a playable
+    cell, only the column blocking it is kept, and a column whose disc would let the opponent win in the cell
+    right above it is dropped. Scores searched over the remaining columns are the same as over all of them,
+    as long as the opponent's replies are searched too, that is at depths of two or more: the columns dropped
+    all lose to the opponent's next move. At depth one, call with `replies` False to only look for a win.
+
+    Parameters:
+        game (ConnectFour): The position, not over.
+        columns (list): The legal columns in search order.
+        replies (bool): Whether the opponent's replies are searched, so that blocks and losing columns count.
+
+    Returns:
+        tuple: The columns to search, in the same order, and WIN if the first one wins at once, LOSS if every
+        column loses to the opponent's next move (the first column being kept to play anyway), None otherwise.
+    """
+    if not columns:
+        return columns, None
+
+    geometry = game.geometry
+    col_height, heights = geometry.col_height, game.heights
+    playable = (game.mask + geometry.bottom_mask) & geometry.board_mask
+
+    wins = winning_cells(game, game.turn) & playable
+    if wins:
+        for col in columns:
+            if wins >> (col * col_height + heights[col]) & 1:
+                return [col], WIN
+
+    if not replies:
+        return columns, None
+
+    threats = winning_cells(game, 1 - game.turn)
+    blocks = threats & playable
+    if blocks:
+        if blocks & (blocks - 1):
+            return columns[:1], LOSS  # Two threats cannot both be blocked
+        playable = blocks
+    playable &= ~(threats >> 1)
+
+    kept = [col for col in columns if playable >> (col * col_height + heights[col]) & 1]
+    if not kept:
+        return columns[:1], LOSS
+    return kept, None
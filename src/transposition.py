@@ -0,0 +1,144 @@
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+DEFAULT_SIZE = 1 << 16
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # 2^64 divided by the golden ratio, odd
+HASH_SHIFT = 32
+ENTRY_BYTES = 128  # Rough size of one stored entry: the tuple, its key and the list slot
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table used by the search to reuse the results of positions it has already seen.
+
+    The table is two-tier: every slot holds a depth-preferred entry, which is only replaced by a search
+    that went at least as deep, and an always-replace entry that takes whatever the first tier rejected.
+    Entries are `(key, depth, score, flag, move)` tuples, where `flag` tells whether `score` is exact,
+    a lower bound or an upper bound.
+
+    Keys are mixed before picking a slot: their low bits only hold the first columns of the board,
+    so `key % size` would crowd every position into a few slots when the size is a power of two.
+
+    Parameters:
+        size (int): The number of slots in the table.
+        size_mb (float): Memory budget in megabytes, used instead of `size` when given.
+
+    Attributes:
+        size (int): The number of slots in the table.
+        hits (int): Probes that found the position.
+        misses (int): Probes that did not find the position.
+        collisions (int): Misses where the slot was taken by another position.
+        stores (int): Entries written to the table.
+
+    Methods:
+        slot(key): Returns the slot of a position key.
+        probe(key): Looks up the entry of a position.
+        store(key, depth, score, flag, move): Saves the result of a search.
+        clear(): Empties the table and resets the counters.
+        stats(): Returns the counters as a dictionary.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, size_mb=None):
+        """
+        Initialize the TranspositionTable.
+
+        Parameters:
+            size (int): The number of slots in the table.
+            size_mb (float): Memory budget in megabytes, used instead of `size` when given.
+        """
+        if size_mb is not None:
+            size = int(size_mb * 2 ** 20) // (2 * ENTRY_BYTES)
+        if size < 1:
+            raise ValueError("The transposition table needs at least one slot.")
+
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        """
+        Empties the table and resets the counters.
+        """
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def slot(self, key):
+        """
+        Returns the slot of a position key, spreading keys that only differ in a few bits over the whole table.
+
+        Parameters:
+            key (int): The position key, see `ConnectFour.key`.
+
+        Returns:
+            int: The index of the slot.
+        """
+        return (key * HASH_MULTIPLIER >> HASH_SHIFT) % self.size
+
+    def probe(self, key):
+        """
+        Looks up the entry of a position.
+
+        Parameters:
+            key (int): The position key, see `ConnectFour.key`.
+
+        Returns:
+            tuple or None: The `(key, depth, score, flag, move)` entry, or None if the position is not stored.
+        """
+        index = self.slot(key)
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+
+        other = self.recent[index]
+        if other is not None and other[0] == key:
+            self.hits += 1
+            return other
+
+        self.misses += 1
+        if entry is not None or other is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        """
+        Saves the result of a search.
+
+        Parameters:
+            key (int): The position key, see `ConnectFour.key`.
+            depth (int): The depth the position was searched to.
+            score (int): The score found by the search.
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND.
+            move (int or None): The best move found, if any.
+        """
+        index = self.slot(key)
+        entry = (key, depth, score, flag, move)
+        self.stores += 1
+
+        current = self.deep[index]
+        if current is None or current[0] == key or depth >= current[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
+    def stats(self):
+        """
+        Returns the counters of the table.
+
+        Returns:
+            dict: Hits, misses, collisions, stores, the number of filled entries and the hit rate.
+        """
+        probes = self.hits + self.misses
+        filled = sum(entry is not None for entry in self.deep) + sum(entry is not None for entry in self.recent)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'filled': filled,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,33 @@
+import pytest
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from benchmark import CORPUS
+
+POSITIONS = ('empty', 'opening-4', 'midgame-10', 'midgame-15', 'endgame-34a', 'win-in-3', 'win-in-4')
+
+
+def full_window_scores(game, depth):
+    """The score of every column from its own full-window search, without a transposition table."""
+    bot = AlphaBetaAiBot(max_depth=depth, tt_size=0)
+    bot.current_depth = depth
+    scores = [None] * game.cols
+    for col in range(game.cols):
+        if game.is_valid_move(col):
+            child = game.copy()
+            child.play(col)
+            scores[col], _ = bot.alphabeta(child, depth - 1, float('-inf'), float('inf'), child.turn == 1)
+    return scores
+
+
+@pytest.mark.parametrize('name', POSITIONS)
+def test_every_column_score_is_exact(name):
+    moves = dict((entry[0], entry[2]) for entry in CORPUS)[name]
+    game = ConnectFour.from_moves([int(col) - 1 for col in moves])
+    for depth in (1, 3, 4, 6):
+        expected = full_window_scores(game, depth)
+        assert AlphaBetaAiBot(max_depth=depth).analyze(game) == expected, (name, depth)
+
+        deepening = AlphaBetaAiBot(max_depth=depth, node_limit=10 ** 9)
+        assert deepening.analyze(game) == expected, (name, depth)
+        assert deepening.last_search.depth == depth
@@ -0,0 +1,58 @@
+import math
+
+from arena import wilson_interval, elo_difference, summarize, run_arena
+
+
+def record(winner, first=0):
+    return {'first': first, 'winner': winner, 'latency_ms': [1.0, 2.0, 3.0]}
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high and math.isclose(low + high, 1.0)
+    assert wilson_interval(0, 10)[0] == 0.0 and 0 < wilson_interval(0, 10)[1] < 1
+    assert 0 < wilson_interval(10, 10)[0] < 1 and math.isclose(wilson_interval(10, 10)[1], 1.0)
+
+
+def test_elo_difference():
+    assert elo_difference(0.5) == 0
+    assert math.isclose(elo_difference(10 / 11), 400)
+    assert math.isclose(elo_difference(1 / 11), -400)
+    assert elo_difference(0) == -math.inf and elo_difference(1) == math.inf
+
+
+def test_summarize_even_match():
+    summary = summarize([record(0), record(1), record(None), record(None)], 2.0)
+    assert (summary['wins'], summary['draws'], summary['losses']) == (1, 2, 1)
+    assert summary['score'] == 0.5 and summary['elo'] == 0
+    low, high = summary['elo_ci']
+    assert -math.inf < low < 0 < high < math.inf
+    assert summary['games_per_sec'] == 2.0
+
+
+def test_summarize_sweep_has_a_finite_bound():
+    for winner, sign in ((0, 1), (1, -1)):
+        summary = summarize([record(winner, first=index % 2) for index in range(4)], 1.0)
+        assert summary['elo'] == sign * math.inf
+        low, high = summary['elo_ci']
+        # The score interval is the Wilson interval of the loss or win rate
+        bound = high if sign < 0 else low
+        rate_ci = summary['loss_rate_ci'] if sign < 0 else summary['win_rate_ci']
+        expected = rate_ci[0] if sign > 0 else 1 - rate_ci[0]
+        assert math.isfinite(bound) and math.isclose(bound, elo_difference(expected))
+        assert low < high
+
+
+def test_latency_is_split_by_mover():
+    summary = summarize([record(0, first=0), record(0, first=1)], 1.0)
+    first, second = summary['latency']
+    assert first['max_ms'] == 3.0 and second['max_ms'] == 3.0
+    assert first['mean_ms'] == 2.0 and second['mean_ms'] == 2.0
+
+
+def test_a_sweep_from_play():
+    records = list(run_arena(('random', 'alphabeta:max_depth=2'), 4, seed=1))
+    summary = summarize(records, 1.0)
+    assert summary['losses'] == 4
+    assert math.isfinite(summary['elo_ci'][1])
@@ -0,0 +1,44 @@
+import time
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from mcts import MctsAiBot
+from background import BackgroundSearch
+
+
+def test_pondered_move_is_returned_at_once():
+    search = BackgroundSearch()
+    bot = AlphaBetaAiBot(max_depth=4)
+    game = ConnectFour.from_moves([3, 3])
+    try:
+        search.ponder(bot, game)
+        while not search.done():
+            time.sleep(0.01)
+        search.result()
+
+        game.play(3)
+        search.start(bot, game)
+        assert search.result() == search.pondered[game.key]
+        assert search.ponder_hits == 1
+    finally:
+        search.shutdown()
+
+
+def test_mcts_ponders_by_growing_its_tree():
+    search = BackgroundSearch()
+    bot = MctsAiBot(time_limit_ms=None, playout_limit=200)
+    game = ConnectFour.from_moves([3])
+    try:
+        search.ponder(bot, game)
+        time.sleep(0.3)
+        search.cancel()
+        pondered = bot.visits[0]
+        assert pondered > 200 and not search.pondered
+
+        reply = max(range(bot.child_counts[0]), key=lambda index: bot.visits[bot.first_child[0] + index])
+        game.play(bot.columns[bot.first_child[0] + reply])
+        bot.choose_move(game)
+        # The reply's subtree was kept: the root has its pondered playouts plus the new ones
+        assert bot.visits[0] > 200
+    finally:
+        search.shutdown()
@@ -0,0 +1,59 @@
+import copy
+
+import pytest
+
+from benchmark import run_benchmark, compare, MIN_COMPARED_MS, CORPUS_VERSION
+
+
+@pytest.fixture(scope='module')
+def report():
+    return run_benchmark({'alphabeta': (2, 4), 'minimax': (2,)}, ['center', 'win-in-4'], memory=False)
+
+
+def test_pruning_does_not_depend_on_the_bot_order(report):
+    for case in report['results']:
+        if case['bot'] == 'minimax':
+            assert case['pruning'] == 0.0
+        elif case['depth'] == 2:
+            assert 0 < case['pruning'] < 1
+        else:
+            assert case['pruning'] is None
+    assert list(report['totals']) == ['alphabeta', 'minimax']
+
+
+def with_times(report, time_ms):
+    report = copy.deepcopy(report)
+    for case in report['results']:
+        case['time_ms'] = time_ms
+    return report
+
+
+def test_a_report_does_not_regress_against_itself(report):
+    assert compare(report, report) == []
+
+
+def test_node_regressions_above_the_threshold_are_flagged(report):
+    slower = copy.deepcopy(report)
+    case = slower['results'][-1]
+    case['nodes'] = int(case['nodes'] * 1.5) + 1
+    regressions = compare(slower, report, threshold=0.1)
+    assert len(regressions) == 1 and f"depth {case['depth']}" in regressions[0]
+
+    case['nodes'] = report['results'][-1]['nodes'] + 1
+    assert compare(slower, report, threshold=1.0) == []
+
+
+def test_times_are_only_compared_on_long_totals(report):
+    cases = len(report['results'])
+    short = (MIN_COMPARED_MS - 1) / cases
+    assert compare(with_times(report, short * 5), with_times(report, short)) == []
+
+    long = MIN_COMPARED_MS
+    regressions = compare(with_times(report, long * 2), with_times(report, long))
+    assert sorted(regression.split(':')[0] for regression in regressions) == ['alphabeta', 'minimax']
+
+
+def test_corpus_versions_must_match(report):
+    baseline = dict(report, corpus_version=CORPUS_VERSION + 1)
+    with pytest.raises(ValueError):
+        compare(report, baseline)
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from evaluation import WINDOW_SCORE
+
+
+def recount(game, open_only):
+    """
+    Scores every window from scratch with `AlphaBetaAiBot.evaluate_window` rules, for any window length.
+    """
+    x_bits, o_bits = game.bitboards
+    length = game.window_length
+    score = 0
+    for cells, _ in game.geometry.windows(length):
+        window = ['X' if x_bits >> cell & 1 else 'O' if o_bits >> cell & 1 else ' ' for cell in cells]
+        for player, sign in (('O', 1), ('X', -1)):
+            if window.count(player) == length - 1 and (not open_only or ' ' in window):
+                score += sign * WINDOW_SCORE
+    return score
+
+
+def random_walk(game, steps, seed):
+    """
+    Plays random moves, taking some back, and yields the game after every move or undo.
+    """
+    generator = random.Random(seed)
+    played = []
+    for _ in range(steps):
+        columns = [col for col in range(game.cols) if game.is_valid_move(col)]
+        if played and (game.is_terminal or generator.random() < 0.3):
+            game.undo(played.pop())
+        elif columns:
+            col = generator.choice(columns)
+            game.play(col)
+            played.append(col)
+        yield game
+
+
+@pytest.mark.parametrize('size', [(6, 7, 4), (5, 6, 4), (7, 8, 5), (4, 4, 3)])
+def test_incremental_window_scores_match_a_recount(size):
+    for seed in range(5):
+        for game in random_walk(ConnectFour(*size), 200, seed):
+            assert game.window_score == recount(game, False)
+            assert game.open_window_score == recount(game, True)
+
+
+def test_window_score_matches_evaluate_window():
+    bot = AlphaBetaAiBot()
+    for game in random_walk(ConnectFour(), 300, 7):
+        if game.winner is None:
+            expected = 0
+            for cells, _ in game.geometry.windows(3):
+                window = ['X' if game.bitboards[0] >> cell & 1 else 'O' if game.bitboards[1] >> cell & 1 else ' '
+                          for cell in cells]
+                expected += bot.evaluate_window(window)
+            assert bot.evaluate(game) == expected
+
+
+@pytest.mark.parametrize('size', [(6, 7, 4), (7, 8, 5)])
+def test_undo_restores_keys_and_winner(size):
+    generator = random.Random(3)
+    game = ConnectFour(*size)
+    for _ in range(300):
+        columns = [col for col in range(game.cols) if game.is_valid_move(col)]
+        if game.is_terminal or not columns:
+            game = ConnectFour(*size)
+            continue
+        before = (game.key, game.mirror_key, game.winner, game.window_score, game.open_window_score)
+        col = generator.choice(columns)
+        game.play(col)
+
+        replayed = ConnectFour.from_moves(game.moves, *size)
+        assert (game.key, game.mirror_key, game.winner) == (replayed.key, replayed.mirror_key, replayed.winner)
+
+        game.undo(col)
+        assert (game.key, game.mirror_key, game.winner, game.window_score, game.open_window_score) == before
+        game.play(col)
@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from parallel import ParallelAlphaBetaAiBot
+from benchmark import CORPUS
+
+
+@pytest.mark.parametrize('options', [{}, {'threats': True, 'search_mode': 'pvs'}])
+def test_parallel_search_scores_as_the_serial_one(options):
+    bot = ParallelAlphaBetaAiBot(workers=2, max_depth=5, **options)
+    try:
+        assert bot.worker_options == dict(options, max_depth=5)
+        for _, _, moves in CORPUS[:6]:
+            game = ConnectFour.from_moves([int(col) - 1 for col in moves])
+            serial = AlphaBetaAiBot(max_depth=5, **options)
+            serial.choose_move(game)
+            bot.choose_move(game)
+            assert bot.last_search.score == serial.last_search.score
+    finally:
+        bot.close()
+
+
+def test_stop_event_stops_the_workers():
+    bot = ParallelAlphaBetaAiBot(workers=2, max_depth=14)
+    bot.stop_event = threading.Event()
+    timer = threading.Timer(0.2, bot.stop_event.set)
+    timer.start()
+    try:
+        move = bot.choose_move(ConnectFour())
+        assert move is not None and bot.last_search.depth == 0
+        assert bot.last_search.elapsed_ms < 5000
+    finally:
+        timer.cancel()
+        bot.close()
@@ -0,0 +1,42 @@
+import pytest
+
+from game import ConnectFour
+from position_store import PositionStore
+from alphabeta import AlphaBetaAiBot
+from parallel import ParallelAlphaBetaAiBot
+
+
+def test_record_and_lookup(tmp_path):
+    store = PositionStore(str(tmp_path / 'store.bin'))
+    game = ConnectFour.from_moves([3, 3, 2])
+    assert store.record(game, 12, 6, 4)
+    store.compact()
+    assert store.lookup(game) == (12, 6, 4)
+    store.close()
+
+
+def test_boards_with_keys_wider_than_a_record_are_refused(tmp_path):
+    path = tmp_path / 'store.bin'
+    with pytest.raises(ValueError):
+        PositionStore(str(path), 8, 9, 5)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('bot_class', [AlphaBetaAiBot, ParallelAlphaBetaAiBot])
+def test_a_store_hit_leaves_no_stale_statistics(tmp_path, bot_class):
+    store = PositionStore(str(tmp_path / 'store.bin'))
+    stored = ConnectFour.from_moves([3, 3, 2])
+    store.record(stored, 12, 6, 4)
+    bot = bot_class(max_depth=4, collect_stats=True, position_store=store)
+    try:
+        searched = AlphaBetaAiBot(max_depth=4, collect_stats=True)
+        searched.choose_move(ConnectFour.from_moves([3]))
+        bot.stats = searched.stats  # Statistics of an earlier move
+        assert bot.stats.nodes > 0
+
+        assert bot.choose_move(stored) == 4
+        assert bot.last_search.nodes == 0 and bot.stats.nodes == 0
+    finally:
+        if bot_class is ParallelAlphaBetaAiBot:
+            bot.close()
+        store.close()
@@ -0,0 +1,47 @@
+import pytest
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from search import SearchInfo, ASPIRATION_WINDOW
+from benchmark import CORPUS
+
+
+def corpus_games():
+    for name, _, moves in CORPUS:
+        yield name, ConnectFour.from_moves([int(col) - 1 for col in moves])
+
+
+@pytest.mark.parametrize('depth', (1, 2, 4, 6, 7))
+def test_pvs_agrees_with_alphabeta(depth):
+    for name, game in corpus_games():
+        plain = AlphaBetaAiBot(max_depth=depth)
+        move = plain.choose_move(game)
+        score = plain.last_search.score
+
+        exact = AlphaBetaAiBot(max_depth=depth).analyze(game)
+
+        # No carried score, then scores within the aspiration window around the right one and outside it
+        for expected in (None, score, score - 1, score + ASPIRATION_WINDOW // 2,
+                         score + 3 * ASPIRATION_WINDOW, score - 3 * ASPIRATION_WINDOW):
+            pvs = AlphaBetaAiBot(max_depth=depth, search_mode='pvs')
+            if expected is not None:
+                pvs.last_search = SearchInfo(None, expected, depth, 0, 0.0)
+            pvs_move = pvs.choose_move(game)
+            assert pvs.last_search.score == score, (name, depth, expected)
+            assert pvs.last_search.depth == depth and pvs.last_search.nodes > 0, (name, depth, expected)
+            if expected is None or abs(expected - score) < ASPIRATION_WINDOW:
+                assert pvs_move == move, (name, depth, expected)
+            else:
+                # The failed first search reorders the moves, so the re-search may pick another column as good
+                assert exact[pvs_move] == score, (name, depth, expected)
+
+
+@pytest.mark.parametrize('depth', (3, 6))
+def test_iterative_pvs_agrees_with_alphabeta(depth):
+    for name, game in corpus_games():
+        plain = AlphaBetaAiBot(max_depth=depth, node_limit=10 ** 9)
+        pvs = AlphaBetaAiBot(max_depth=depth, node_limit=10 ** 9, search_mode='pvs')
+        assert pvs.choose_move(game) == plain.choose_move(game), (name, depth)
+        assert pvs.last_search.score == plain.last_search.score, (name, depth)
+        assert pvs.last_search.depth == plain.last_search.depth, (name, depth)
+        assert pvs.last_search.nodes > 0, (name, depth)
@@ -0,0 +1,147 @@
+import random
+
+import pytest
+
+from game import ConnectFour
+from records import (GameRecord, GameWriter, read_games, move_bits, pack_moves, unpack_moves, main,
+                     ARCHIVE_HEADER, RECORD_HEADER)
+
+
+def random_record(rng, rows=6, cols=7, connect=4, first=0):
+    game = ConnectFour(rows, cols, connect)
+    moves = []
+    while not game.is_terminal:
+        col = rng.choice([col for col in range(cols) if game.is_valid_move(col)])
+        game.play(col)
+        moves.append(col)
+    return GameRecord(moves, first, rows, cols, connect)
+
+
+def test_move_bits():
+    assert [move_bits(cols) for cols in (1, 2, 4, 7, 8, 9, 16, 17)] == [1, 1, 2, 3, 3, 4, 4, 5]
+
+
+@pytest.mark.parametrize('cols', (4, 7, 8, 9, 12, 16))
+def test_pack_round_trip(cols):
+    rng = random.Random(cols)
+    bits = move_bits(cols)
+    for count in range(40):
+        moves = [rng.randrange(cols) for _ in range(count)]
+        data = pack_moves(moves, bits)
+        assert len(data) == (count * bits + 7) // 8
+        assert unpack_moves(data, count, bits) == moves
+
+
+@pytest.mark.parametrize('size', [(6, 7, 4), (4, 4, 3), (7, 9, 4), (6, 12, 5)])
+def test_binary_round_trip(tmp_path, size):
+    rng = random.Random(1)
+    records = [random_record(rng, *size, first=index % 2) for index in range(30)]
+    records.append(GameRecord([], 0, *size))
+    path = str(tmp_path / 'games.c4')
+    with GameWriter(path, *size) as writer:
+        for record in records:
+            writer.write(record)
+    assert writer.count == len(records)
+    # The board size comes from the header, not from the arguments
+    assert list(read_games(path, 5, 5, 3)) == records
+    assert [record.game().move_count for record in records] == [len(record) for record in records]
+
+
+def test_o_first_records_rebuild_their_games(tmp_path):
+    record = random_record(random.Random(2), first=1)
+    path = str(tmp_path / 'games.c4')
+    with GameWriter(path) as writer:
+        writer.write(record.game())
+    read, = read_games(path)
+    assert read.first == 1 and read.game().first_turn == 1
+    assert read.game(3).board == record.game(3).board
+
+
+def test_text_round_trip(tmp_path):
+    rng = random.Random(3)
+    records = [random_record(rng) for _ in range(10)] + [GameRecord([])]
+    path = str(tmp_path / 'games.txt')
+    with GameWriter(path, binary=False) as writer:
+        for record in records:
+            writer.write(record)
+    assert list(read_games(path)) == records
+
+    # Text holds neither games where O moves first nor columns beyond the ninth
+    with GameWriter(path, binary=False) as writer:
+        with pytest.raises(ValueError):
+            writer.write(GameRecord([0], first=1))
+    with GameWriter(path, 6, 12, 4, binary=False) as writer:
+        with pytest.raises(ValueError):
+            writer.write(GameRecord([9], rows=6, cols=12))
+
+
+@pytest.mark.parametrize('binary', (True, False))
+def test_append(tmp_path, binary):
+    rng = random.Random(4)
+    records = [random_record(rng) for _ in range(6)]
+    path = str(tmp_path / 'games')
+    with GameWriter(path, binary=binary, append=True) as writer:  # Creates the archive
+        for record in records[:3]:
+            writer.write(record)
+    with GameWriter(path, binary=binary, append=True) as writer:
+        for record in records[3:]:
+            writer.write(record)
+    assert list(read_games(path)) == records
+
+    if binary:
+        with pytest.raises(ValueError):
+            GameWriter(path, 6, 8, 4, append=True)
+
+
+def test_a_game_of_another_board_is_refused(tmp_path):
+    with GameWriter(str(tmp_path / 'games.c4')) as writer:
+        with pytest.raises(ValueError):
+            writer.write(GameRecord([0, 1], rows=4, cols=4, connect=3))
+
+
+def test_truncated_archives(tmp_path):
+    rng = random.Random(5)
+    records = [random_record(rng) for _ in range(2)]
+    path = tmp_path / 'games.c4'
+    with GameWriter(str(path)) as writer:
+        for record in records:
+            writer.write(record)
+    data = path.read_bytes()
+
+    # Cut in the middle of the last record's moves, then of its header
+    second = len(data) - RECORD_HEADER.size - (len(records[1]) * 3 + 7) // 8
+    for end in (len(data) - 1, second + 1):
+        path.write_bytes(data[:end])
+        games = read_games(str(path))
+        assert next(games) == records[0]
+        with pytest.raises(ValueError):
+            next(games)
+
+    path.write_bytes(data[:ARCHIVE_HEADER.size])
+    assert list(read_games(str(path))) == []
+
+    path.write_bytes(data[:4] + b'\x09' + data[5:])
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
+
+
+def test_bad_text_line(tmp_path):
+    path = tmp_path / 'games.txt'
+    path.write_text('4453\n\n-\n44x3\n')
+    games = read_games(str(path))
+    assert next(games).moves == [3, 3, 4, 2]
+    assert next(games).moves == []
+    with pytest.raises(ValueError, match='line 4'):
+        next(games)
+
+
+def test_convert(tmp_path, capsys):
+    rng = random.Random(6)
+    records = [random_record(rng) for _ in range(5)]
+    binary, text = str(tmp_path / 'games.c4'), str(tmp_path / 'games.txt')
+    with GameWriter(binary) as writer:
+        for record in records:
+            writer.write(record)
+    main(['convert', binary, text, '--text'])
+    assert list(read_games(text)) == records
+    assert 'Wrote 5 games' in capsys.readouterr().out
@@ -0,0 +1,50 @@
+import pytest
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from solver import Solver
+from tablebase import Tablebase, generate, check, random_roots, WIN, DRAW
+
+
+@pytest.fixture(scope='module')
+def small_table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tablebase') / 'table.bin')
+    generate(path, 16, (4, 4, 4))
+    table = Tablebase(path)
+    yield table
+    table.close()
+
+
+def test_every_position_of_a_small_board_is_exact(small_table):
+    result = check(small_table, samples=2000, seed=1)
+    assert result['checked'] == 2000 and result['wrong'] == 0
+    assert small_table.lookup(ConnectFour(4, 4, 4)) == (DRAW, 16)
+
+
+def test_mirror_positions_share_an_entry(small_table):
+    game = ConnectFour.from_moves([0, 1, 1], 4, 4, 4)
+    mirrored = ConnectFour.from_moves([3, 2, 2], 4, 4, 4)
+    assert small_table.lookup(game) == small_table.lookup(mirrored) is not None
+
+
+def test_endgames_of_the_standard_board(tmp_path):
+    path = str(tmp_path / 'table.bin')
+    roots = random_roots(20, 10, seed=2)
+    generate(path, 10, roots=roots, workers=2)
+    table = Tablebase(path)
+    solver = Solver()
+    try:
+        assert check(table, samples=300, seed=3)['wrong'] == 0
+        for game in roots:
+            outcome, _ = table.lookup(game)
+            score = solver.solve(game.bitboards[game.turn], game.mask, game.move_count)
+            assert (outcome == WIN) == (score > 0) and (outcome == DRAW) == (score == 0)
+
+            bot = AlphaBetaAiBot(max_depth=4, tablebase=table)
+            child = game.copy()
+            child.play(bot.choose_move(game))
+            if child.winner is None and not child.is_terminal:
+                child_score = solver.solve(child.bitboards[child.turn], child.mask, child.move_count)
+                assert (child_score < 0) == (score > 0)  # A won position is not thrown away
+    finally:
+        table.close()
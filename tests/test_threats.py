@@ -0,0 +1,24 @@
+import pytest
+
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from minmax import MinMaxAiBot
+from benchmark import CORPUS
+
+
+@pytest.mark.parametrize('bot_class, options, depths', [
+    (AlphaBetaAiBot, {}, (2, 4, 6, 8)),
+    (AlphaBetaAiBot, {'search_mode': 'pvs'}, (2, 4, 6, 8)),
+    (MinMaxAiBot, {}, (2, 4)),
+])
+def test_threats_keep_root_decisions_with_fewer_nodes(bot_class, options, depths):
+    for depth in depths:
+        for name, _, moves in CORPUS:
+            game = ConnectFour.from_moves([int(col) - 1 for col in moves])
+            plain = bot_class(max_depth=depth, **options)
+            narrowed = bot_class(max_depth=depth, threats=True, **options)
+            move = plain.choose_move(game)
+
+            assert narrowed.choose_move(game) == move, (name, depth)
+            assert narrowed.last_search.score == plain.last_search.score, (name, depth)
+            assert narrowed.last_search.nodes <= plain.last_search.nodes, (name, depth)
@@ -0,0 +1,20 @@
+from game import ConnectFour
+from alphabeta import AlphaBetaAiBot
+from transposition import TranspositionTable, DEFAULT_SIZE
+
+
+def test_slots_spread_keys_differing_in_high_bits():
+    table = TranspositionTable(DEFAULT_SIZE)
+    # Keys only differing above the first two columns all fell in one slot with `key % size`
+    keys = [key << 16 for key in range(1000)]
+    assert len({table.slot(key) for key in keys}) > 900
+
+
+def test_search_fills_and_hits_the_table():
+    bot = AlphaBetaAiBot(max_depth=8)
+    bot.choose_move(ConnectFour.from_moves([2, 2, 1, 3]))
+    stats = bot.transposition_table.stats()
+
+    assert stats['filled'] > stats['stores'] // 2
+    assert stats['collisions'] < stats['misses'] // 10
+    assert stats['hit_rate'] > 0.1